@@ -1,3 +1,4 @@
+import argparse
 import os
 import sys
 
@@ -6,29 +7,44 @@ from dotenv import load_dotenv
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from llama_index.core import Settings, SimpleDirectoryReader
-from llama_index.embeddings.openai import OpenAIEmbedding
+from llama_index.core import Settings
 from llama_index.llms.openai import OpenAI
 
 from insurance_system.src.indices.hierarchical import (
+    HierarchicalIndexBuilder,
     HierarchicalIndexError,
-    create_hierarchical_index,
 )
-from insurance_system.src.indices.summary import SummaryIndexError, create_summary_index
+from insurance_system.src.indices.ingestion import iter_split_batches, prefetch
+from insurance_system.src.indices.manifest import format_changes, load_manifest
+from insurance_system.src.indices.parse_cache import ParseCache
+from insurance_system.src.indices.summary import SummaryIndexBuilder, SummaryIndexError
 from insurance_system.src.utils.config import (
     EMBEDDING_MODEL,
     HIERARCHICAL_STORAGE_DIR,
+    INGEST_WORKERS,
     LLM_MODEL,
+    PARSE_CACHE_ENABLED,
     PROJECT_ROOT,
     SUMMARY_STORAGE_DIR,
 )
+from insurance_system.src.utils.embedding_cache import get_cache_stats, get_embed_model
 
 load_dotenv()
 
 
-def build_indices() -> None:
+def build_indices(
+    incremental: bool = False, workers: int = INGEST_WORKERS, reparse: bool = False
+) -> None:
     """
     Builds the hierarchical and summary indices from the claim documents in the 'data' folder.
+
+    Args:
+        incremental: If True, only re-embed pages whose content changed since the
+            last hierarchical build (see the manifest in the storage directory).
+        workers: Number of processes parsing files and splitting nodes. The
+            resulting index does not depend on this number.
+        reparse: If True, ignore the parse cache and parse every file again
+            (the cache is refreshed with the new results).
     """
     print("🚀 Starting Data Indexing Process...")
 
@@ -48,13 +64,15 @@ def build_indices() -> None:
     # 2. Configure Settings (OpenAI)
     print("⚙️  Configuring OpenAI Embeddings...")
     Settings.llm = OpenAI(model=LLM_MODEL)
-    Settings.embed_model = OpenAIEmbedding(model=EMBEDDING_MODEL)
+    Settings.embed_model = get_embed_model(EMBEDDING_MODEL)
 
-    # 3. Load Documents
-    print(f"📂 Loading Documents from {data_dir}...")
+    # 3. Configure Document Loading
+    print(f"📂 Streaming Documents from {data_dir}...")
 
     # Check for LlamaCloud API Key for enhanced parsing (Tables)
     llama_cloud_key = os.getenv("LLAMA_CLOUD_API_KEY")
+    file_extractor = None
+    inject_page_labels = False
     if llama_cloud_key:
         print(
             "🦙 LlamaCloud API Key found! Using LlamaParse for enhanced table extraction."
@@ -66,67 +84,122 @@ def build_indices() -> None:
             result_type="markdown",  # Markdown is best for retaining table structure
             split_by_page=True,  # Split into page-level documents
             premium_mode=True,  # Force Premium Mode for table extraction
-            invalidate_cache=True,  # Force re-parsing to clear bad cache
+            # Unchanged files are served from the local parse cache; --reparse
+            # also bypasses LlamaCloud's cache
+            invalidate_cache=reparse,
             verbose=True,
         )
         file_extractor = {".pdf": parser}
-        documents = SimpleDirectoryReader(
-            data_dir, file_extractor=file_extractor
-        ).load_data()
-
         # Manually Inject Page Numbers (since LlamaParse metadata varies).
-        current_file = ""
-        page_count = 1
-
-        for doc in documents:
-            f_name = doc.metadata.get("file_name", "")
-            if f_name != current_file:
-                current_file = f_name
-                page_count = 1
-
-            # Inject standardized page label
-            doc.metadata["page_label"] = str(page_count)
-            page_count += 1
-
-        print(f"✅ Injected page numbers for {len(documents)} pages.")
+        inject_page_labels = True
     else:
         print(
             "⚠️  LLAMA_CLOUD_API_KEY not found. Using standard PDF loader (tables may be messy)."
         )
-        documents = SimpleDirectoryReader(data_dir).load_data()
 
-    print(f"✅ Loaded {len(documents)} document(s).")
+    parse_cache = None
+    if PARSE_CACHE_ENABLED:
+        parse_cache = ParseCache(refresh=reparse)
 
-    # 4. Build Hierarchical Index
-    print("\n🏗️  Building Hierarchical Index (Fact Retrieval)...")
+    # 4. Stream batches through both indices:
+    # load -> parse -> HierarchicalNodeParser -> embed -> upsert (+ summary map phase).
+    # The next batch is loaded in the background while the current one is embedded;
+    # with --workers N, files are parsed and split in N processes.
+    print("\n🏗️  Building Hierarchical Index (Fact Retrieval)")
+    print("🏗️  Building Summary Index (High-level Retrieval with MapReduce)...")
     try:
-        create_hierarchical_index(documents, persist_dir=HIERARCHICAL_STORAGE_DIR)
-        print(f"✅ Hierarchical Index saved to {HIERARCHICAL_STORAGE_DIR}")
+        hierarchical_builder = HierarchicalIndexBuilder(
+            HIERARCHICAL_STORAGE_DIR, incremental=incremental
+        )
+        summary_builder = None
+
+        try:
+            summary_builder = SummaryIndexBuilder(
+                SUMMARY_STORAGE_DIR, llm=Settings.llm, use_mapreduce=True
+            )
+            if workers > 1:
+                print(f"  🧵 Parsing and splitting files in {workers} worker processes")
+            page_count = 0
+            for documents, nodes_by_doc in prefetch(
+                iter_split_batches(
+                    data_dir,
+                    file_extractor,
+                    inject_page_labels,
+                    workers=workers,
+                    parse_cache=parse_cache,
+                )
+            ):
+                hierarchical_builder.add_documents(documents, nodes_by_doc)
+                summary_builder.add_documents(documents)
+                page_count += len(documents)
+                print(f"  📄 Indexed {page_count} page(s)...")
+            print(f"✅ Loaded {page_count} document(s).")
+            if parse_cache is not None:
+                print(
+                    f"🗄️  Parse cache: {parse_cache.hits} file(s) reused, "
+                    f"{parse_cache.misses} parsed"
+                )
+
+            # Both snapshots are staged first and only published once both are
+            # complete, so readers never pair a new index with an old one
+            hierarchical_builder.finish(publish=False)
+            manifest = load_manifest(hierarchical_builder.persist_dir)
+            if manifest:
+                for line in format_changes(manifest):
+                    print(f"   {line}")
+            summary_builder.finish(publish=False)
+
+            hierarchical_builder.publish()
+            print(f"✅ Hierarchical Index published to {hierarchical_builder.persist_dir}")
+            summary_builder.publish()
+            print(f"✅ Summary Index published to {summary_builder.persist_dir}")
+        except BaseException:
+            # Unpublished snapshots are dropped; readers keep the previous build
+            hierarchical_builder.abort()
+            if summary_builder is not None:
+                summary_builder.abort()
+            raise
     except HierarchicalIndexError as e:
         print(f"❌ Failed to build hierarchical index: {e}")
         sys.exit(1)
-    except Exception as e:
-        print(f"❌ Unexpected error building hierarchical index: {e}")
-        sys.exit(1)
-
-    # 5. Build Summary Index with MapReduce pre-computation
-    print("\n🏗️  Building Summary Index (High-level Retrieval with MapReduce)...")
-    try:
-        create_summary_index(
-            documents, persist_dir=SUMMARY_STORAGE_DIR, llm=Settings.llm, use_mapreduce=True
-        )
-        print(f"✅ Summary Index saved to {SUMMARY_STORAGE_DIR}")
     except SummaryIndexError as e:
         print(f"❌ Failed to build summary index: {e}")
         sys.exit(1)
     except Exception as e:
-        print(f"❌ Unexpected error building summary index: {e}")
+        print(f"❌ Unexpected error building indices: {e}")
         sys.exit(1)
 
+    cache_stats = get_cache_stats(Settings.embed_model)
+    if cache_stats:
+        print(
+            f"\n🗄️  Embedding cache hit rate: {cache_stats['hit_rate']:.1%} "
+            f"({cache_stats['hits']} hits / {cache_stats['misses']} misses)"
+        )
+
     print(
         "\n✨ Indexing Complete! You can now run the retrieval system using 'main.py'."
     )
 
 
 if __name__ == "__main__":
-    build_indices()
+    parser = argparse.ArgumentParser(description="Build the claim indices")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only re-embed pages that changed since the last build",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=INGEST_WORKERS,
+        help="Processes used to parse files and split nodes",
+    )
+    parser.add_argument(
+        "--reparse",
+        action="store_true",
+        help="Ignore the parse cache and parse every file again",
+    )
+    args = parser.parse_args()
+    build_indices(
+        incremental=args.incremental, workers=args.workers, reparse=args.reparse
+    )
@@ -1,6 +1,7 @@
 import asyncio
 import os
 import sys
+import uuid
 
 # Suppress tokenizers warning
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
@@ -21,6 +22,7 @@ from rich.panel import Panel
 load_dotenv()
 
 from insurance_system.src.agents.manager import build_graph
+from insurance_system.src.agents.tools import start_session
 
 # Initialize Rich Console
 CONSOLE = Console()
@@ -37,6 +39,9 @@ async def main():
         CONSOLE.print(f"[bold red]❌ Error initializing graph:[/bold red] {e}")
         return
 
+    # One conversation per CLI run; claims mentioned in it stay scoped to it
+    session_config = start_session(uuid.uuid4().hex)
+
     CONSOLE.print(
         "[green]✅ System Ready![/green] Type [bold red]'exit'[/bold red] to quit."
     )
@@ -117,7 +122,7 @@ async def main():
 
                 # Stream events with FULL history
                 async for event in app.astream_events(
-                    {"messages": chat_history}, version="v2"
+                    {"messages": chat_history}, config=session_config, version="v2"
                 ):
                     kind = event["event"]
                     kind = event["event"]
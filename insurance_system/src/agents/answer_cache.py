@@ -0,0 +1,292 @@
+"""
+Semantic cache of tool answers.
+
+Adjusters ask the same question in many words ("what's the deductible",
+"deductible amount?"), and each paraphrase would run retrieval, reranking and
+LLM synthesis again. Answers are kept with the embedding of the query they
+answered, scoped to the tool, the claim and the index snapshot. A new query is
+answered from the cache when its cosine similarity to an answered query of the
+same scope reaches the tool's threshold (ANSWER_CACHE_THRESHOLDS) and both
+mention the same numbers and identifiers.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+import numpy as np
+from llama_index.core import Settings
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.schema import NodeWithScore
+
+from insurance_system.src.indices.lexical import tokenize
+from insurance_system.src.indices.rerank_cache import normalize_query
+from insurance_system.src.utils.config import (
+    ANSWER_CACHE_SIZE,
+    ANSWER_CACHE_THRESHOLDS,
+    ANSWER_CACHE_TTL_SECONDS,
+    VERBOSE,
+)
+
+# (tool name, claim ID or "" for all claims, index version)
+Scope = Tuple[str, str, str]
+
+_shared_cache: Optional["SemanticAnswerCache"] = None
+_shared_lock = threading.Lock()
+
+
+class CachedAnswer(NamedTuple):
+    """An answer with the sources it was synthesized from."""
+
+    query: str
+    answer: str
+    source_nodes: List[NodeWithScore]
+    similarity: float
+
+
+class _Entry(NamedTuple):
+    query: str
+    answer: str
+    source_nodes: List[NodeWithScore]
+    embedding: np.ndarray
+    key_terms: FrozenSet[str]
+    created: float
+
+
+def _key_terms(query: str) -> FrozenSet[str]:
+    """Numbers, amounts, dates and identifiers, which must match exactly."""
+    return frozenset(t for t in tokenize(query, parts=False) if any(c.isdigit() for c in t))
+
+
+def _unit(embedding: List[float]) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class SemanticAnswerCache:
+    """Bounded, per-scope store of answers, looked up by query similarity."""
+
+    def __init__(
+        self,
+        max_entries: int = ANSWER_CACHE_SIZE,
+        ttl_seconds: float = ANSWER_CACHE_TTL_SECONDS,
+        thresholds: Optional[Dict[str, float]] = None,
+        embed_model: Optional[BaseEmbedding] = None,
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Answers kept before the least recently used is evicted.
+            ttl_seconds: Age after which an answer is no longer served (0 = never).
+            thresholds: Minimum cosine similarity per tool name.
+            embed_model: Query embedding model (`Settings.embed_model` if None).
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.thresholds = dict(ANSWER_CACHE_THRESHOLDS if thresholds is None else thresholds)
+        self._embed_model = embed_model
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        # LRU order over all scopes; the per-scope dicts share the entries
+        self._order: "OrderedDict[Tuple[Scope, str], None]" = OrderedDict()
+        self._scopes: Dict[Scope, Dict[str, _Entry]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def embed_model(self) -> BaseEmbedding:
+        return self._embed_model or Settings.embed_model
+
+    def _expired(self, entry: _Entry) -> bool:
+        return bool(self.ttl_seconds) and time.monotonic() - entry.created > self.ttl_seconds
+
+    def _drop(self, scope: Scope, normalized: str) -> None:
+        self._order.pop((scope, normalized), None)
+        entries = self._scopes.get(scope)
+        if entries is not None:
+            entries.pop(normalized, None)
+            if not entries:
+                del self._scopes[scope]
+
+    def _find(
+        self,
+        scope: Scope,
+        normalized: str,
+        embedding: Optional[np.ndarray],
+        terms: FrozenSet[str],
+    ) -> Optional[Tuple[_Entry, float]]:
+        """Returns the most similar live entry of a scope above the tool's threshold."""
+        entries = self._scopes.get(scope, {})
+        for key in [k for k, e in entries.items() if self._expired(e)]:
+            self._drop(scope, key)
+        entries = self._scopes.get(scope, {})
+        if normalized in entries:
+            return entries[normalized], 1.0
+        if embedding is None:
+            return None
+        candidates = [e for e in entries.values() if e.key_terms == terms]
+        if not candidates:
+            return None
+        similarities = np.stack([e.embedding for e in candidates]) @ embedding
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.thresholds.get(scope[0], 1.0):
+            return None
+        return candidates[best], float(similarities[best])
+
+    def _needs_embedding(self, query: str, scope: Scope) -> bool:
+        """False if the scope is empty or holds the query itself."""
+        with self._lock:
+            entries = self._scopes.get(scope, {})
+            return bool(entries) and normalize_query(query) not in entries
+
+    def _lookup(
+        self, query: str, scope: Scope, embedding: Optional[np.ndarray]
+    ) -> Optional[CachedAnswer]:
+        with self._lock:
+            found = self._find(scope, normalize_query(query), embedding, _key_terms(query))
+            if found is None:
+                self.misses += 1
+                return None
+            entry, similarity = found
+            key = (scope, normalize_query(entry.query))
+            if key in self._order:
+                self._order.move_to_end(key)
+            self.hits += 1
+        if VERBOSE:
+            print(f"  💾 Answer cache hit for {scope[0]} ({similarity:.3f}): {query!r}")
+        return CachedAnswer(query, entry.answer, entry.source_nodes, similarity)
+
+    def lookup(self, query: str, scope: Scope) -> Optional[CachedAnswer]:
+        """Returns the cached answer of a query, or None on a miss."""
+        embedding = None
+        if self._needs_embedding(query, scope):
+            embedding = _unit(self.embed_model.get_query_embedding(query))
+        return self._lookup(query, scope, embedding)
+
+    async def alookup(self, query: str, scope: Scope) -> Optional[CachedAnswer]:
+        """Async version of `lookup`."""
+        embedding = None
+        if self._needs_embedding(query, scope):
+            embedding = _unit(await self.embed_model.aget_query_embedding(query))
+        return self._lookup(query, scope, embedding)
+
+    def store(
+        self,
+        query: str,
+        scope: Scope,
+        answer: str,
+        source_nodes: List[NodeWithScore],
+        embedding: Optional[np.ndarray] = None,
+    ) -> None:
+        """Caches the answer of a query (embedding the query unless given)."""
+        if embedding is None:
+            embedding = _unit(self.embed_model.get_query_embedding(query))
+        normalized = normalize_query(query)
+        entry = _Entry(
+            query, answer, source_nodes, embedding, _key_terms(query), time.monotonic()
+        )
+        with self._lock:
+            self._scopes.setdefault(scope, {})[normalized] = entry
+            self._order[(scope, normalized)] = None
+            self._order.move_to_end((scope, normalized))
+            while len(self._order) > self.max_entries:
+                oldest_scope, oldest = next(iter(self._order))
+                self._drop(oldest_scope, oldest)
+
+    def _count_bypass(self) -> None:
+        with self._lock:
+            self.bypassed += 1
+
+    def answer(
+        self,
+        query: str,
+        scope: Scope,
+        compute: Callable[[str], Tuple[str, List[NodeWithScore]]],
+        bypass: bool = False,
+    ) -> CachedAnswer:
+        """
+        Returns the cached answer of a query, or computes and caches it.
+
+        Answers without source nodes (nothing found) are not cached.
+
+        Args:
+            query: The tool query.
+            scope: (tool name, claim ID, index version) the answer belongs to.
+            compute: Returns (answer, source nodes) of a query.
+            bypass: Skip the lookup (the fresh answer is still cached).
+        """
+        if bypass:
+            self._count_bypass()
+        else:
+            cached = self.lookup(query, scope)
+            if cached is not None:
+                return cached
+
+        answer, source_nodes = compute(query)
+        if source_nodes:
+            self.store(query, scope, answer, source_nodes)
+        return CachedAnswer(query, answer, source_nodes, 0.0)
+
+    async def aanswer(
+        self,
+        query: str,
+        scope: Scope,
+        compute: Callable[[str], Awaitable[Tuple[str, List[NodeWithScore]]]],
+        bypass: bool = False,
+    ) -> CachedAnswer:
+        """Async version of `answer`, awaiting `compute` and the query embedding."""
+        if bypass:
+            self._count_bypass()
+        else:
+            cached = await self.alookup(query, scope)
+            if cached is not None:
+                return cached
+
+        answer, source_nodes = await compute(query)
+        if source_nodes:
+            embedding = _unit(await self.embed_model.aget_query_embedding(query))
+            self.store(query, scope, answer, source_nodes, embedding=embedding)
+        return CachedAnswer(query, answer, source_nodes, 0.0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._order.clear()
+            self._scopes.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters and the number of cached answers."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": round(self.hit_rate, 4),
+            "entries": len(self._order),
+            "max_entries": self.max_entries,
+        }
+
+
+def get_answer_cache() -> SemanticAnswerCache:
+    """Returns the process-wide answer cache."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = SemanticAnswerCache()
+        return _shared_cache
@@ -0,0 +1,119 @@
+import asyncio
+from typing import Awaitable, Callable, Optional
+
+from insurance_system.src.indices.facts import FactMatch, FactStore, fact_name
+from insurance_system.src.indices.sharding import DEFAULT_SHARD, ClaimRouter
+from insurance_system.src.utils.config import HIERARCHICAL_STORAGE_DIR
+
+
+class FactAgentError(Exception):
+    """Base exception for FactAgent errors."""
+
+    pass
+
+
+class FactAgent:
+    """
+    Agent answering single-field questions from the build-time fact sheet.
+
+    Lookups are dictionary hits (no retrieval, reranking or LLM call). Queries
+    the fact sheet cannot answer unambiguously go to the fallback, normally
+    the Needle Agent.
+    """
+
+    def __init__(
+        self,
+        persist_dir: str = HIERARCHICAL_STORAGE_DIR,
+        router: Optional[ClaimRouter] = None,
+        fallback: Optional[Callable[[str], str]] = None,
+        afallback: Optional[Callable[[str], Awaitable[str]]] = None,
+    ) -> None:
+        """
+        Initialize the Fact Agent.
+
+        Args:
+            persist_dir: Index root of the hierarchical index (holding `facts.json`).
+            router: ClaimRouter shared with the other agents, so follow-up
+                questions stay on the session claim.
+            fallback: Called with the query when no fact matches.
+            afallback: Awaited with the query when no fact matches in `aquery`
+                (if None, `fallback` runs in a worker thread).
+
+        Raises:
+            FactAgentError: If the fact sheet cannot be loaded.
+        """
+        self.persist_dir = persist_dir
+        self.router = router or ClaimRouter()
+        self.fallback = fallback
+        self.afallback = afallback
+        self.hits = 0
+        self.misses = 0
+        self.fact_store = self._load()
+
+    def _load(self, persist_dir: Optional[str] = None) -> FactStore:
+        try:
+            return FactStore.load(persist_dir or self.persist_dir)
+        except Exception as e:
+            raise FactAgentError(f"Fact sheet loading failed: {e}") from e
+
+    def reload(self, snapshot_dir: Optional[str] = None) -> None:
+        """
+        Loads the fact sheet of the live snapshot (e.g. after a new build).
+
+        Args:
+            snapshot_dir: Snapshot to load instead of the live one (e.g. the
+                one the Needle Agent was just switched to).
+
+        Raises:
+            FactAgentError: If the fact sheet cannot be loaded.
+        """
+        self.fact_store = self._load(snapshot_dir)
+
+    @staticmethod
+    def _format(match: FactMatch) -> str:
+        fact = match.fact
+        source = [f"claim {match.claim_id}"] if match.claim_id != DEFAULT_SHARD else []
+        if fact.get("file_name"):
+            source.append(str(fact["file_name"]))
+        if fact.get("page"):
+            source.append(f"page {fact['page']}")
+        return f"{fact_name(fact)}: {fact['value']} ({', '.join(source)})"
+
+    def lookup(self, query_str: str) -> Optional[str]:
+        """Returns the matching facts as text, or None if no fact matches."""
+        fact_store = self.fact_store
+        claim_id = self.router.resolve(query_str, fact_store.claim_ids)
+        matches = fact_store.lookup(query_str, [claim_id] if claim_id else None)
+        if not matches:
+            return None
+        return "\n".join(self._format(match) for match in matches)
+
+    def _count(self, answer: Optional[str]) -> Optional[str]:
+        if answer is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return answer
+
+    def query(self, query_str: str) -> str:
+        """Answers from the fact sheet, falling back to retrieval on a miss."""
+        answer = self._count(self.lookup(query_str))
+        if answer is not None:
+            return answer
+        if self.fallback is None:
+            return f"No specific information found in documents for: {query_str}"
+        return self.fallback(query_str)
+
+    async def aquery(self, query_str: str) -> str:
+        """
+        Async version of `query`. The lookup itself is a dictionary hit; only
+        the fallback is awaited.
+        """
+        answer = self._count(self.lookup(query_str))
+        if answer is not None:
+            return answer
+        if self.afallback is not None:
+            return await self.afallback(query_str)
+        if self.fallback is None:
+            return f"No specific information found in documents for: {query_str}"
+        return await asyncio.to_thread(self.fallback, query_str)
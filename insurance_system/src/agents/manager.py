@@ -9,7 +9,7 @@ It orchestrates the conversation, routing user queries to the appropriate specia
 import operator
 from typing import Annotated, Sequence, TypedDict
 
-from langchain_core.messages import BaseMessage, HumanMessage
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
 from langgraph.graph import END, StateGraph
 from langgraph.prebuilt import ToolNode
@@ -24,30 +24,7 @@ class AgentState(TypedDict):
     messages: Annotated[Sequence[BaseMessage], operator.add]
 
 
-# 2. Initialize Model & Tools
-tools = get_langchain_tools()
-tool_node = ToolNode(tools)
-
-# Use OpenAI for the router/supervisor
-model = ChatOpenAI(model=LLM_MODEL)
-model = model.bind_tools(tools)
-
-
-# 3. Define Nodes
-from langchain_core.messages import SystemMessage
-
-
-# 3. Define Nodes
-def supervisor_node(state: AgentState):
-    messages = state["messages"]
-
-    # Define the system prompt for smart routing
-    system_prompt = SystemMessage(content=str(MANAGER_SYSTEM_PROMPT))
-
-    response = model.invoke([system_prompt] + list(messages))
-    return {"messages": [response]}
-
-
+# 2. Define Nodes
 def should_continue(state: AgentState):
     messages = state["messages"]
     last_message = messages[-1]
@@ -59,8 +36,34 @@ def should_continue(state: AgentState):
     return END
 
 
-# 4. Build Graph
+# 3. Build Graph
 def build_graph():
+    """
+    Builds the supervisor graph.
+
+    Nothing is loaded when this module is imported. The agents' indices,
+    reranker and MCP tools load in the background (see `AgentStartup`); the
+    graph is returned as soon as the tools are known, so the supervisor can
+    route while the indices are still loading.
+    """
+    # Indices and the reranker keep loading in the background; the first
+    # question that needs one waits for it
+    tools = get_langchain_tools()
+    tool_node = ToolNode(tools)
+
+    # Use OpenAI for the router/supervisor
+    model = ChatOpenAI(model=LLM_MODEL)
+    model = model.bind_tools(tools)
+
+    def supervisor_node(state: AgentState):
+        messages = state["messages"]
+
+        # Define the system prompt for smart routing
+        system_prompt = SystemMessage(content=str(MANAGER_SYSTEM_PROMPT))
+
+        response = model.invoke([system_prompt] + list(messages))
+        return {"messages": [response]}
+
     workflow = StateGraph(AgentState)
 
     workflow.add_node("supervisor", supervisor_node)
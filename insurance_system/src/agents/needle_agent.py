@@ -1,10 +1,12 @@
-from typing import Any, Optional
+from typing import Any, List, Optional, Tuple
 
+from llama_index.core.query_engine import RetrieverQueryEngine
 from llama_index.core.retrievers import AutoMergingRetriever
+from llama_index.core.schema import NodeWithScore
 from llama_index.core.tools import QueryEngineTool, ToolMetadata
 
-from insurance_system.src.indices.hierarchical import \
-    get_hierarchical_query_engine
+from insurance_system.src.indices.hierarchical import (
+    get_hierarchical_query_engine, get_node_postprocessors)
 
 
 class NeedleAgentError(Exception):
@@ -21,7 +23,11 @@ class NeedleAgent:
     """
 
     def __init__(
-        self, retriever: AutoMergingRetriever, llm: Optional[Any] = None
+        self,
+        retriever: AutoMergingRetriever,
+        llm: Optional[Any] = None,
+        node_postprocessors: Optional[List[Any]] = None,
+        index_version: Optional[str] = None,
     ) -> None:
         """
         Initialize the Needle Agent.
@@ -29,35 +35,90 @@ class NeedleAgent:
         Args:
             retriever: AutoMergingRetriever instance for hierarchical retrieval.
             llm: Optional LLM instance for query engine.
+            node_postprocessors: Already created postprocessors (e.g. loaded in
+                parallel at startup). Created from the config if None.
+            index_version: Snapshot version the retriever was loaded from.
 
         Raises:
             NeedleAgentError: If agent initialization fails.
         """
         try:
-            self.query_engine = get_hierarchical_query_engine(retriever, llm=llm)
+            self.llm = llm
+            # Loaded once and shared by every engine this agent builds
+            self.node_postprocessors = (
+                node_postprocessors
+                if node_postprocessors is not None
+                else get_node_postprocessors()
+            )
+            self.query_engine = self._build_query_engine(retriever)
+            self.index_version = index_version
+        except Exception as e:
+            raise NeedleAgentError(f"Agent initialization failed: {e}") from e
 
-            # Inject strict prompt for precision
-            from insurance_system.src.utils.prompts import NEEDLE_AGENT_QA_PROMPT
+    def _build_query_engine(self, retriever: AutoMergingRetriever) -> RetrieverQueryEngine:
+        query_engine = get_hierarchical_query_engine(
+            retriever, llm=self.llm, node_postprocessors=self.node_postprocessors
+        )
 
-            self.query_engine.update_prompts(
-                {"response_synthesizer:text_qa_template": NEEDLE_AGENT_QA_PROMPT}
-            )
+        # Inject strict prompt for precision
+        from insurance_system.src.utils.prompts import NEEDLE_AGENT_QA_PROMPT
+
+        query_engine.update_prompts(
+            {"response_synthesizer:text_qa_template": NEEDLE_AGENT_QA_PROMPT}
+        )
+        return query_engine
+
+    def swap_retriever(
+        self, retriever: AutoMergingRetriever, index_version: Optional[str] = None
+    ) -> None:
+        """
+        Switches to a new retriever (e.g. of a newly published index snapshot).
+
+        The reranker and other postprocessors of the current engine are reused.
+        Queries already running keep the engine they started with.
+
+        Args:
+            retriever: The new retriever.
+            index_version: Snapshot version the new retriever was loaded from.
 
+        Raises:
+            NeedleAgentError: If the new query engine cannot be created.
+        """
+        try:
+            query_engine = self._build_query_engine(retriever)
         except Exception as e:
-            raise NeedleAgentError(f"Agent initialization failed: {e}") from e
+            raise NeedleAgentError(f"Retriever swap failed: {e}") from e
+        self.query_engine = query_engine
+        # Set after the engine, so a reader never pairs the new version with the old engine
+        self.index_version = index_version
 
     def robust_query(self, query_str: str) -> str:
         """
         Query with validation.
         """
-        response = self.query_engine.query(query_str)
+        return self.query_with_sources(query_str)[0]
+
+    def query_with_sources(self, query_str: str) -> Tuple[str, List[NodeWithScore]]:
+        """
+        Query with validation, also returning the source nodes of the answer.
+        """
+        return self._validate(query_str, self.query_engine.query(query_str))
+
+    async def aquery_with_sources(self, query_str: str) -> Tuple[str, List[NodeWithScore]]:
+        """
+        Async version of `query_with_sources`: embedding, search and synthesis
+        are awaited, and reranking runs on the reranker's worker thread.
+        """
+        return self._validate(query_str, await self.query_engine.aquery(query_str))
 
+    @staticmethod
+    def _validate(query_str: str, response: Any) -> Tuple[str, List[NodeWithScore]]:
         # Simple check: if no source nodes, we might want to inform the user
         if not response.source_nodes:
             if "not found" not in str(response).lower():
-                return f"No specific information found in documents for: {query_str}"
+                return f"No specific information found in documents for: {query_str}", []
 
-        return str(response)
+        return str(response), response.source_nodes
 
     def get_tool(self) -> QueryEngineTool:
         """
@@ -0,0 +1,129 @@
+"""
+Hot reload of the agents' indices inside a running process.
+
+A background thread watches the `CURRENT` pointers of the index roots (see
+`indices.snapshots`). When a build publishes a new snapshot, the new retriever
+and fact sheet or summary engine are loaded off the request path and swapped
+into the agents.
+Everything unaffected by the index stays loaded: the reranker, the LLM and
+embedding clients, and the MCP tools.
+"""
+
+import threading
+from typing import Callable, Dict, Optional
+
+from insurance_system.src.agents.fact_agent import FactAgent
+from insurance_system.src.agents.needle_agent import NeedleAgent
+from insurance_system.src.agents.summary_agent import SummaryAgent
+from insurance_system.src.indices.hierarchical import load_hierarchical_retriever
+from insurance_system.src.indices.sharding import ClaimRouter
+from insurance_system.src.indices.snapshots import current_version, live_snapshot
+from insurance_system.src.utils.config import (
+    HIERARCHICAL_STORAGE_DIR,
+    INDEX_RELOAD_INTERVAL,
+    SUMMARY_STORAGE_DIR,
+)
+
+
+class IndexReloader:
+    """Polls the index roots and swaps newly published snapshots into the agents."""
+
+    def __init__(
+        self,
+        needle_agent: NeedleAgent,
+        summary_agent: SummaryAgent,
+        router: Optional[ClaimRouter] = None,
+        hierarchical_dir: str = HIERARCHICAL_STORAGE_DIR,
+        summary_dir: str = SUMMARY_STORAGE_DIR,
+        interval: float = INDEX_RELOAD_INTERVAL,
+        fact_agent: Optional[FactAgent] = None,
+    ) -> None:
+        """
+        Initialize the reloader. The versions the agents serve count as loaded.
+
+        Args:
+            needle_agent: Agent whose retriever is swapped.
+            summary_agent: Agent whose summary engine is reloaded.
+            router: ClaimRouter shared with the current retriever, so the
+                session claim survives a reload.
+            hierarchical_dir: Root of the hierarchical index snapshots.
+            summary_dir: Root of the summary index snapshots.
+            interval: Seconds between checks.
+            fact_agent: Optional agent whose fact sheet is reloaded with the
+                hierarchical index.
+        """
+        self.needle_agent = needle_agent
+        self.summary_agent = summary_agent
+        self.router = router
+        self.hierarchical_dir = hierarchical_dir
+        self.summary_dir = summary_dir
+        self.interval = interval
+        self.fact_agent = fact_agent
+        self.loaded_versions: Dict[str, Optional[str]] = {
+            hierarchical_dir: needle_agent.index_version,
+            summary_dir: summary_agent.index_version,
+        }
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _reload_needle(self) -> Optional[str]:
+        index_version, snapshot_dir = live_snapshot(self.hierarchical_dir)
+        retriever = load_hierarchical_retriever(snapshot_dir, router=self.router)
+        self.needle_agent.swap_retriever(retriever, index_version)
+        if self.fact_agent is not None:
+            self.fact_agent.reload(snapshot_dir)
+        return index_version
+
+    def _reload_summary(self) -> Optional[str]:
+        self.summary_agent.reload()
+        return self.summary_agent.index_version
+
+    def check(self) -> bool:
+        """
+        Reloads every index whose live snapshot changed since the last load.
+
+        Failures are reported and retried on the next check; the agents keep
+        serving the previous snapshot meanwhile.
+
+        Returns:
+            True if anything was reloaded.
+        """
+        reloaders: Dict[str, Callable[[], Optional[str]]] = {
+            self.hierarchical_dir: self._reload_needle,
+            self.summary_dir: self._reload_summary,
+        }
+        reloaded = False
+        for root, reload in reloaders.items():
+            version = current_version(root)
+            if version is None or version == self.loaded_versions.get(root):
+                continue
+            try:
+                # A build may have published again meanwhile; record what was loaded
+                version = reload()
+            except Exception as e:
+                print(f"⚠️  Failed to load index snapshot {version} from {root}: {e}")
+                continue
+            self.loaded_versions[root] = version
+            print(f"🔄 Loaded index snapshot {version} from {root}")
+            reloaded = True
+        return reloaded
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self) -> "IndexReloader":
+        """Starts watching in a daemon thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="index-reloader", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stops watching."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
@@ -0,0 +1,209 @@
+"""
+Parallel, background startup of the agents.
+
+Loading the hierarchical index, the summary index, the cross-encoder and
+discovering the MCP tools are independent and each takes seconds. They run
+concurrently on a thread pool once `AgentStartup.start` is called (nothing
+happens at import time). The supervisor only needs the tool schemas to route,
+so the CLI is ready as soon as MCP discovery is done; a tool call waits for
+the component it needs. Each phase's duration and completion time are kept in
+`timings`.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from insurance_system.src.agents.fact_agent import FactAgent
+from insurance_system.src.agents.mcp_tools import get_langchain_time_tools
+from insurance_system.src.agents.needle_agent import NeedleAgent
+from insurance_system.src.agents.reloader import IndexReloader
+from insurance_system.src.agents.summary_agent import SummaryAgent
+from insurance_system.src.indices.hierarchical import (
+    get_node_postprocessors,
+    load_hierarchical_retriever,
+)
+from insurance_system.src.indices.sharding import ClaimRouter
+from insurance_system.src.indices.snapshots import live_snapshot
+from insurance_system.src.utils.config import (
+    FACT_LOOKUP,
+    HIERARCHICAL_STORAGE_DIR,
+    INDEX_HOT_RELOAD,
+    STARTUP_PARALLEL,
+    SUMMARY_STORAGE_DIR,
+    VERBOSE,
+)
+
+
+class StartupError(Exception):
+    """Base exception for agent startup errors."""
+
+    pass
+
+
+class AgentStartup:
+    """Loads the agents' indices, reranker and MCP tools, in parallel by default."""
+
+    def __init__(
+        self,
+        router: Optional[ClaimRouter] = None,
+        parallel: bool = STARTUP_PARALLEL,
+        hierarchical_dir: str = HIERARCHICAL_STORAGE_DIR,
+        summary_dir: str = SUMMARY_STORAGE_DIR,
+        fact_fallback: Optional[Callable[[str], str]] = None,
+        afact_fallback: Optional[Callable[[str], Awaitable[str]]] = None,
+    ) -> None:
+        """
+        Initialize the startup (nothing is loaded before `start`).
+
+        Args:
+            router: ClaimRouter shared by the agents.
+            parallel: Load independent phases concurrently in the background.
+                If False, `start` loads every phase in turn before returning.
+            hierarchical_dir: Root of the hierarchical index snapshots.
+            summary_dir: Root of the summary index snapshots.
+            fact_fallback: Answers the queries the fact sheet cannot (defaults
+                to the Needle Agent).
+            afact_fallback: Async version of `fact_fallback` (defaults to the
+                Needle Agent's async query).
+        """
+        self.router = router or ClaimRouter()
+        self.parallel = parallel
+        self.hierarchical_dir = hierarchical_dir
+        self.summary_dir = summary_dir
+        self.fact_fallback = fact_fallback or self._needle_fallback
+        self.afact_fallback = afact_fallback or self._aneedle_fallback
+        # Phase name -> {"seconds": duration, "done_at": seconds since start};
+        # the duration of a dependent phase includes waiting for its inputs
+        self.timings: Dict[str, Dict[str, float]] = {}
+        self.index_reloader: Optional[IndexReloader] = None
+        # Futures of the loaded components (set by `start`)
+        self.mcp_tools: Optional[Future] = None
+        self.needle_agent: Optional[Future] = None
+        self.summary_agent: Optional[Future] = None
+        self.fact_agent: Optional[Future] = None
+        self._futures: Dict[str, Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._started_at = 0.0
+        self._lock = threading.Lock()
+
+    def _phase(self, name: str, fn: Callable[[], Any]) -> Future:
+        """Runs one phase (in the pool if parallel) and records its timing."""
+
+        def timed() -> Any:
+            start = time.perf_counter()
+            try:
+                return fn()
+            except Exception as e:
+                print(f"❌ Startup phase '{name}' failed: {e}")
+                raise
+            finally:
+                end = time.perf_counter()
+                with self._lock:
+                    self.timings[name] = {
+                        "seconds": end - start,
+                        "done_at": end - self._started_at,
+                    }
+                if VERBOSE:
+                    print(f"  ⏱️  {name}: {end - start:.2f}s")
+
+        if self._executor is not None:
+            future = self._executor.submit(timed)
+        else:
+            future = Future()
+            try:
+                future.set_result(timed())
+            except Exception as e:
+                future.set_exception(e)
+        self._futures[name] = future
+        return future
+
+    def start(self) -> "AgentStartup":
+        """Starts loading every phase; returns at once unless not parallel."""
+        self._started_at = time.perf_counter()
+        if self.parallel:
+            # One worker per phase: the dependent phases wait inside the pool
+            self._executor = ThreadPoolExecutor(max_workers=7, thread_name_prefix="startup")
+
+        retriever = self._phase("hierarchical index", self._load_retriever)
+        postprocessors = self._phase("reranker", get_node_postprocessors)
+        self.mcp_tools = self._phase("mcp discovery", get_langchain_time_tools)
+        self.summary_agent = self._phase(
+            "summary index",
+            lambda: SummaryAgent(persist_dir=self.summary_dir, router=self.router),
+        )
+        self.needle_agent = self._phase(
+            "needle agent",
+            lambda: NeedleAgent(
+                retriever.result()[0],
+                node_postprocessors=postprocessors.result(),
+                index_version=retriever.result()[1],
+            ),
+        )
+        self.fact_agent = self._phase("fact sheet", self._load_fact_agent)
+        if INDEX_HOT_RELOAD:
+            self._phase("hot reload", self._start_reloader)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        return self
+
+    def _load_retriever(self) -> Tuple[Any, Optional[str]]:
+        """Loads the live hierarchical snapshot; returns the retriever and its version."""
+        index_version, snapshot_dir = live_snapshot(self.hierarchical_dir)
+        return load_hierarchical_retriever(snapshot_dir, router=self.router), index_version
+
+    def _load_fact_agent(self) -> Optional[FactAgent]:
+        if not FACT_LOOKUP:
+            return None
+        return FactAgent(
+            persist_dir=self.hierarchical_dir,
+            router=self.router,
+            fallback=self.fact_fallback,
+            afallback=self.afact_fallback,
+        )
+
+    def _needle_fallback(self, query: str) -> str:
+        return self.needle_agent.result().robust_query(query)
+
+    async def _aneedle_fallback(self, query: str) -> str:
+        needle_agent = await asyncio.wrap_future(self.needle_agent)
+        return (await needle_agent.aquery_with_sources(query))[0]
+
+    def _start_reloader(self) -> IndexReloader:
+        # Swap in new index snapshots without restarting (reranker and MCP tools stay loaded)
+        self.index_reloader = IndexReloader(
+            self.needle_agent.result(),
+            self.summary_agent.result(),
+            router=self.router,
+            hierarchical_dir=self.hierarchical_dir,
+            summary_dir=self.summary_dir,
+            fact_agent=self.fact_agent.result(),
+        ).start()
+        return self.index_reloader
+
+    def wait(self, timeout: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Waits until every phase is done and returns the timings.
+
+        Raises:
+            StartupError: If a phase failed.
+        """
+        errors: List[str] = []
+        for name, future in self._futures.items():
+            try:
+                future.result(timeout=timeout)
+            except Exception as e:
+                errors.append(f"{name}: {e}")
+        if errors:
+            raise StartupError(f"Startup failed ({'; '.join(errors)})")
+        return dict(self.timings)
+
+    def stop(self) -> None:
+        """Stops the index reloader (once started, if it is still starting)."""
+        future = self._futures.get("hot reload")
+        if future is not None:
+            future.add_done_callback(
+                lambda f: f.exception() is None and f.result().stop()
+            )
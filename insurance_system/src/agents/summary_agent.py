@@ -1,9 +1,17 @@
-from typing import Any, Optional
+import asyncio
+import threading
+from typing import Any, Dict, Optional
 
+from llama_index.core.base.base_query_engine import BaseQueryEngine
 from llama_index.core.tools import QueryEngineTool, ToolMetadata
 
-from insurance_system.src.indices.summary import get_summary_query_engine
-from insurance_system.src.utils.config import SUMMARY_STORAGE_DIR
+from insurance_system.src.indices.sharding import ClaimRouter
+from insurance_system.src.indices.snapshots import live_snapshot
+from insurance_system.src.indices.summary import (
+    get_summary_query_engine,
+    list_summary_claims,
+)
+from insurance_system.src.utils.config import SUMMARY_LEVEL, SUMMARY_STORAGE_DIR
 
 
 class SummaryAgentError(Exception):
@@ -17,10 +25,16 @@ class SummaryAgent:
     Agent specialized for generating high-level summaries and timelines.
 
     Uses summary indexing with tree summarization for document-wide synthesis.
+    Queries that name a claim (or follow up on one) are answered from that
+    claim's summaries only.
     """
 
     def __init__(
-        self, persist_dir: str = SUMMARY_STORAGE_DIR, llm: Optional[Any] = None
+        self,
+        persist_dir: str = SUMMARY_STORAGE_DIR,
+        llm: Optional[Any] = None,
+        router: Optional[ClaimRouter] = None,
+        summary_level: Optional[int] = SUMMARY_LEVEL,
     ) -> None:
         """
         Initialize the Summary Agent.
@@ -28,15 +42,81 @@ class SummaryAgent:
         Args:
             persist_dir: Directory path for summary index storage.
             llm: Optional LLM instance for query engine.
+            router: ClaimRouter resolving the claim a query is about.
+            summary_level: Reduce level of the pre-computed summaries to answer
+                from (see `get_summary_query_engine`); None for the top summary.
 
         Raises:
             SummaryAgentError: If agent initialization fails.
         """
         try:
-            self.query_engine = get_summary_query_engine(persist_dir, llm=llm)
+            self.persist_dir = persist_dir
+            self.llm = llm
+            self.router = router or ClaimRouter()
+            self.summary_level = summary_level
+            # Claim engines are loaded later from the same snapshot as the global one
+            self.index_version, self.snapshot_dir = live_snapshot(persist_dir)
+            self.claim_ids = list_summary_claims(self.snapshot_dir)
+            self.query_engine = get_summary_query_engine(
+                self.snapshot_dir, llm=llm, summary_level=summary_level
+            )
+            self._claim_engines: Dict[str, BaseQueryEngine] = {}
+            self._lock = threading.Lock()
         except Exception as e:
             raise SummaryAgentError(f"Agent initialization failed: {e}") from e
 
+    def reload(self) -> None:
+        """
+        Switches to the live summary snapshot (e.g. after a rebuild).
+
+        The new engine is loaded before the swap; queries already running keep
+        the engine they started with.
+
+        Raises:
+            SummaryAgentError: If the new snapshot cannot be loaded.
+        """
+        try:
+            index_version, snapshot_dir = live_snapshot(self.persist_dir)
+            claim_ids = list_summary_claims(snapshot_dir)
+            query_engine = get_summary_query_engine(
+                snapshot_dir, llm=self.llm, summary_level=self.summary_level
+            )
+        except Exception as e:
+            raise SummaryAgentError(f"Reload failed: {e}") from e
+        with self._lock:
+            self.snapshot_dir = snapshot_dir
+            self.claim_ids = claim_ids
+            self.query_engine = query_engine
+            self._claim_engines = {}
+            self.index_version = index_version
+
+    def get_query_engine(self, query_str: str) -> BaseQueryEngine:
+        """Returns the engine of the claim a query is about, or the global one."""
+        if len(self.claim_ids) < 2:
+            return self.query_engine
+        claim_id = self.router.resolve(query_str, self.claim_ids)
+        if claim_id is None:
+            return self.query_engine
+        with self._lock:
+            if claim_id not in self._claim_engines:
+                self._claim_engines[claim_id] = get_summary_query_engine(
+                    self.snapshot_dir,
+                    llm=self.llm,
+                    summary_level=self.summary_level,
+                    claim_id=claim_id,
+                )
+            return self._claim_engines[claim_id]
+
+    def query(self, query_str: str) -> Any:
+        """Answers a summary query, routed to the claim it is about."""
+        return self.get_query_engine(query_str).query(query_str)
+
+    async def aquery(self, query_str: str) -> Any:
+        """Answers a summary query without blocking the event loop."""
+        # A claim's engine is loaded from disk on its first query
+        query_engine = await asyncio.to_thread(self.get_query_engine, query_str)
+        return await query_engine.aquery(query_str)
+
     def get_tool(self) -> QueryEngineTool:
         """
         Get the QueryEngineTool for this agent.
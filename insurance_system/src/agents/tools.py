@@ -1,42 +1,145 @@
-from typing import List
+import asyncio
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
 
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import Tool
+from llama_index.core import Settings
 
-from insurance_system.src.agents.mcp_tools import (get_langchain_time_tools,
-                                                   get_langchain_weather_tools)
-from insurance_system.src.agents.needle_agent import NeedleAgent
-from insurance_system.src.agents.summary_agent import SummaryAgent
-from insurance_system.src.indices.hierarchical import \
-    load_hierarchical_retriever
-from insurance_system.src.utils.config import (HIERARCHICAL_STORAGE_DIR,
-                                               SUMMARY_STORAGE_DIR)
+from insurance_system.src.agents.answer_cache import get_answer_cache
+from insurance_system.src.agents.mcp_tools import get_langchain_weather_tools
+from insurance_system.src.agents.startup import AgentStartup
+from insurance_system.src.indices.sharding import (ClaimRouter, claim_session,
+                                                   detect_claim_id)
+from insurance_system.src.utils.config import (ANSWER_CACHE_ENABLED,
+                                               FACT_LOOKUP)
+from insurance_system.src.utils.embedding_cache import get_embed_model
+
+
+# Background loading of the agents (see get_langchain_tools)
+agent_startup: Optional[AgentStartup] = None
+# Remembers the claim of each conversation for all agents (see get_langchain_tools)
+claim_router: Optional[ClaimRouter] = None
+
+
+def start_session(session_id: str) -> Dict[str, Any]:
+    """
+    Starts a conversation: forgets any claim remembered under its ID.
+
+    Returns:
+        The graph config carrying the conversation's thread ID; pass it to
+        `invoke` / `astream_events` so the tools route follow-ups per conversation.
+    """
+    if claim_router is not None:
+        claim_router.reset(session_id)
+    return {"configurable": {"thread_id": session_id}}
+
+
+def _in_session(fn: Callable[[str], Any]) -> Callable[..., Any]:
+    """Runs a tool function in the claim session of the calling conversation."""
+
+    def session_id(config: RunnableConfig) -> Optional[str]:
+        return (config or {}).get("configurable", {}).get("thread_id")
+
+    if asyncio.iscoroutinefunction(fn):
+
+        async def arun(query: str, config: RunnableConfig) -> Any:
+            with claim_session(session_id(config)):
+                return await fn(query)
+
+        return arun
+
+    def run(query: str, config: RunnableConfig) -> Any:
+        with claim_session(session_id(config)):
+            return fn(query)
+
+    return run
 
 
 def get_langchain_tools() -> List[Tool]:
     """
     Initialize LlamaIndex agents and wrap them as LangChain tools.
+
+    The indices, reranker and MCP tools load in parallel in the background
+    (see `AgentStartup`). This returns once the tool schemas are known, so the
+    supervisor can route; each tool waits for its agent on first use.
     """
     # 1. Initialize LlamaIndex Components
-    hierarchical_retriever = load_hierarchical_retriever(
-        persist_dir=HIERARCHICAL_STORAGE_DIR
-    )
+    # Query embeddings must come from the same (cached) model used at build time
+    Settings.embed_model = get_embed_model()
+    # Every agent follows the claim mentioned in the calling conversation
+    global agent_startup, claim_router
+    claim_router = router = ClaimRouter()
 
-    # 2. Initialize Agents
-    needle_agent = NeedleAgent(hierarchical_retriever)
-    summary_agent = SummaryAgent(persist_dir=SUMMARY_STORAGE_DIR)
+    # 2. Initialize Agents (in the background)
+    if agent_startup is not None:
+        agent_startup.stop()
+    startup = agent_startup = AgentStartup(
+        router=router,
+        # A fact-sheet miss is answered like a needle_expert call, answer cache included
+        fact_fallback=lambda query: run_needle(query),
+        afact_fallback=lambda query: arun_needle(query),
+    ).start()
 
     # 3. Wrap as LangChain Tools
 
+    # Paraphrases of answered questions are served from the semantic answer cache
+    answer_cache = get_answer_cache() if ANSWER_CACHE_ENABLED else None
+
+    def scope_of(tool_name: str, agent: Any, query: str):
+        claim_id = detect_claim_id(query) or router.active_claim_id or ""
+        # The snapshot the agent serves, swapped by the index reloader (not
+        # the pointer on disk, which a build may have moved already)
+        return (tool_name, claim_id, agent.index_version or "")
+
+    def cached(tool_name: str, agent: Future, query: str, compute) -> str:
+        if answer_cache is None:
+            return compute(query)[0]
+        scope = scope_of(tool_name, agent.result(), query)
+        return answer_cache.answer(query, scope, compute).answer
+
+    async def acached(tool_name: str, agent: Future, query: str, compute) -> str:
+        if answer_cache is None:
+            return (await compute(query))[0]
+        scope = scope_of(tool_name, await asyncio.wrap_future(agent), query)
+        return (await answer_cache.aanswer(query, scope, compute)).answer
+
+    def summarize(query: str):
+        response = startup.summary_agent.result().query(query)
+        return str(response), response.source_nodes
+
+    async def asummarize(query: str):
+        summary_agent = await asyncio.wrap_future(startup.summary_agent)
+        response = await summary_agent.aquery(query)
+        return str(response), response.source_nodes
+
+    def needle(query: str):
+        return startup.needle_agent.result().query_with_sources(query)
+
+    async def aneedle(query: str):
+        needle_agent = await asyncio.wrap_future(startup.needle_agent)
+        return await needle_agent.aquery_with_sources(query)
+
     def run_needle(query: str) -> str:
-        return needle_agent.robust_query(query)
+        return cached("needle_expert", startup.needle_agent, query, needle)
 
     def run_summary(query: str) -> str:
-        return str(summary_agent.query_engine.query(query))
+        return cached("summary_expert", startup.summary_agent, query, summarize)
+
+    # Async sessions (astream_events / ainvoke) await retrieval and the LLM
+    # instead of holding a worker thread for the whole round-trip, so tool
+    # calls of one turn (e.g. needle plus weather) run concurrently in ToolNode
+    async def arun_needle(query: str) -> str:
+        return await acached("needle_expert", startup.needle_agent, query, aneedle)
+
+    async def arun_summary(query: str) -> str:
+        return await acached("summary_expert", startup.summary_agent, query, asummarize)
 
     tools = [
         Tool(
             name="needle_expert",
-            func=run_needle,
+            func=_in_session(run_needle),
+            coroutine=_in_session(arun_needle),
             description=(
                 "The DEFAULT tool. Use this for retrieving specific facts, numbers, dates, costs, names, "
                 "or any precise details from the claim documents. "
@@ -45,7 +148,8 @@ def get_langchain_tools() -> List[Tool]:
         ),
         Tool(
             name="summary_expert",
-            func=run_summary,
+            func=_in_session(run_summary),
+            coroutine=_in_session(arun_summary),
             description=(
                 "Use this ONLY for broad, high-level summaries of the entire claim case. "
                 "Do not use this for specific questions like costs or dates. "
@@ -54,7 +158,33 @@ def get_langchain_tools() -> List[Tool]:
         ),
     ]
 
-    tools.extend(get_langchain_time_tools())
+    def run_fact_lookup(query: str) -> str:
+        return startup.fact_agent.result().query(query)
+
+    async def arun_fact_lookup(query: str) -> str:
+        fact_agent = await asyncio.wrap_future(startup.fact_agent)
+        return await fact_agent.aquery(query)
+
+    # Single-field questions are answered from the build-time fact sheet
+    if FACT_LOOKUP:
+        tools.insert(
+            0,
+            Tool(
+                name="fact_lookup",
+                func=_in_session(run_fact_lookup),
+                coroutine=_in_session(arun_fact_lookup),
+                description=(
+                    "Instant lookup of a single field of the claim file: claim ID, policy number, "
+                    "insured, risk address, date of loss, cause of loss, adjuster, total payout, "
+                    "deductible, status, or one value from a table (ledger amounts, sensor readings). "
+                    "Use this FIRST for direct 'what is the X' / 'who is the X' questions. "
+                    "Falls back to needle_expert automatically if the field is not on file."
+                ),
+            ),
+        )
+
+    # Routing needs the tool schemas, so this is the one phase waited for here
+    tools.extend(startup.mcp_tools.result())
     # tools.extend(get_langchain_weather_tools())
 
     # Add our custom robust weather tool
@@ -0,0 +1,904 @@
+"""
+Microbenchmarks for retrieval-path components.
+
+Each benchmark builds its own synthetic data in a temporary directory, so it
+runs offline and without an OpenAI key (except `adaptive-top-k`, which runs the
+evaluation queries against the built claim index, and `concurrent-tools` and
+`startup`, which load the agent tools). `fact-sheet` reads the sample claim
+in `data/` and checks the fact sheet's answers against it. `adaptive-top-k`
+and `reranker` load the cross-encoder:
+
+    python -m insurance_system.src.evaluation.benchmarks --mode automerge
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+sys.path.append(
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+)
+
+import numpy as np  # noqa: E402
+from llama_index.core import Document  # noqa: E402
+from llama_index.core.base.base_retriever import BaseRetriever  # noqa: E402
+from llama_index.core.node_parser import get_leaf_nodes  # noqa: E402
+from llama_index.core.schema import NodeWithScore, QueryBundle, TextNode  # noqa: E402
+from rich.console import Console  # noqa: E402
+from rich.table import Table  # noqa: E402
+
+console = Console()
+
+
+class _FixedRetriever(BaseRetriever):
+    """Returns the same nodes for every query (isolates post-retrieval work)."""
+
+    def __init__(self, nodes: List[NodeWithScore]) -> None:
+        self._nodes = nodes
+        super().__init__()
+
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        return [NodeWithScore(node=n.node, score=n.score) for n in self._nodes]
+
+
+def _synthetic_documents(pages: int, words_per_page: int = 1500) -> List[Document]:
+    """Claim-like pages with enough text to fill every level of the hierarchy."""
+    rng = random.Random(0)
+    vocabulary = [
+        "claim", "policy", "deductible", "adjuster", "invoice", "water", "damage",
+        "roof", "inspection", "payment", "contractor", "estimate", "coverage",
+    ]
+    return [
+        Document(
+            text=" ".join(
+                f"{rng.choice(vocabulary)}{'.' if i % 12 == 11 else ''}"
+                for i in range(words_per_page)
+            ),
+            metadata={"file_name": "benchmark.pdf", "page_label": str(page + 1)},
+        )
+        for page in range(pages)
+    ]
+
+
+def _time(fn: Callable[[], Any], repeats: int) -> Dict[str, float]:
+    """Runs fn `repeats` times and returns mean / p50 / p95 / p99 in milliseconds."""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "mean_ms": statistics.mean(samples),
+        "p50_ms": samples[len(samples) // 2],
+        "p95_ms": samples[min(int(len(samples) * 0.95), len(samples) - 1)],
+        "p99_ms": samples[min(int(len(samples) * 0.99), len(samples) - 1)],
+    }
+
+
+def _print_results(
+    title: str,
+    results: Dict[str, Dict[str, float]],
+    columns: Sequence[str] = ("mean_ms", "p50_ms", "p95_ms"),
+) -> None:
+    table = Table(title=title)
+    table.add_column("Variant", style="cyan")
+    for column in columns:
+        table.add_column(column, justify="right")
+    for variant, numbers in results.items():
+        table.add_row(variant, *(f"{numbers[c]:.3f}" for c in columns))
+    console.print(table)
+
+
+def benchmark_automerge(
+    num_leaves: int = 80, pages: int = 60, repeats: int = 200
+) -> Dict[str, Dict[str, float]]:
+    """
+    Compares docstore-walking auto-merging with the precomputed hierarchy table.
+
+    Retrieves the same `num_leaves` leaves (in sibling clusters, so merges
+    happen) through AutoMergingRetriever and ArrayAutoMergingRetriever, both
+    backed by the SQLite docstore, and checks that they merge identically.
+    """
+    from llama_index.core import StorageContext
+    from llama_index.core.retrievers import AutoMergingRetriever
+
+    from insurance_system.src.indices.hierarchical import _get_node_parser
+    from insurance_system.src.indices.hierarchy_table import (
+        ArrayAutoMergingRetriever,
+        HierarchyTable,
+    )
+    from insurance_system.src.indices.sqlite_docstore import SqliteDocumentStore
+
+    console.print(f"⚙️  Building synthetic hierarchy ({pages} pages)...")
+    nodes = _get_node_parser().get_nodes_from_documents(_synthetic_documents(pages))
+    leaves = get_leaf_nodes(nodes)
+
+    with tempfile.TemporaryDirectory() as persist_dir:
+        docstore = SqliteDocumentStore.from_persist_dir(persist_dir)
+        docstore.add_documents(nodes)
+        hierarchy = HierarchyTable.from_pairs(docstore.get_hierarchy())
+        hierarchy.save(persist_dir)
+        hierarchy = HierarchyTable.load(persist_dir)
+        storage_context = StorageContext.from_defaults(docstore=docstore)
+
+        # Runs of 3 consecutive siblings at random positions
+        rng = random.Random(0)
+        retrieved: Dict[str, NodeWithScore] = {}
+        while len(retrieved) < min(num_leaves, len(leaves)):
+            start = rng.randrange(len(leaves))
+            for leaf in leaves[start : start + 3]:
+                if len(retrieved) < num_leaves:
+                    retrieved[leaf.node_id] = NodeWithScore(node=leaf, score=rng.random())
+        vector_retriever = _FixedRetriever(list(retrieved.values()))
+
+        baseline = AutoMergingRetriever(vector_retriever, storage_context)
+        array_backed = ArrayAutoMergingRetriever(
+            vector_retriever, storage_context, hierarchy=hierarchy
+        )
+
+        query = QueryBundle("benchmark")
+        expected = sorted(n.node.node_id for n in baseline.retrieve(query))
+        actual = sorted(n.node.node_id for n in array_backed.retrieve(query))
+        if expected != actual:
+            raise AssertionError("Array-backed auto-merging diverged from baseline")
+
+        results = {
+            "docstore walk (AutoMergingRetriever)": _time(
+                lambda: baseline.retrieve(query), repeats
+            ),
+            "hierarchy table (ArrayAutoMergingRetriever)": _time(
+                lambda: array_backed.retrieve(query), repeats
+            ),
+        }
+        docstore.close()
+
+    console.print(
+        f"  {len(nodes)} nodes, {len(retrieved)} retrieved leaves -> "
+        f"{len(actual)} nodes after merging"
+    )
+    _print_results(f"Auto-merge at {len(retrieved)} leaves", results)
+    return results
+
+
+def _corpus_vectors(max_vectors: int, dim: int) -> Tuple[np.ndarray, str]:
+    """
+    Returns leaf embeddings of the live claim index if one is built, else
+    synthetic clustered unit vectors of the same shape as our embeddings.
+    """
+    from llama_index.vector_stores.chroma import ChromaVectorStore
+
+    from insurance_system.src.indices.hierarchical import _load_vector_stores
+    from insurance_system.src.indices.snapshots import resolve_snapshot_dir
+    from insurance_system.src.utils.config import HIERARCHICAL_STORAGE_DIR
+
+    if os.path.isdir(HIERARCHICAL_STORAGE_DIR):
+        try:
+            vectors = []
+            persist_dir = resolve_snapshot_dir(HIERARCHICAL_STORAGE_DIR)
+            for vector_store in _load_vector_stores(persist_dir).values():
+                # Chroma shards hold the original float32 embeddings
+                if isinstance(vector_store, ChromaVectorStore):
+                    data = vector_store.client.get(include=["embeddings"])
+                    vectors.extend(data["embeddings"])
+            if vectors:
+                return np.array(vectors[:max_vectors], dtype=np.float32), "claim index"
+        except Exception as e:
+            console.print(f"⚠️  Could not read the claim index ({e}), using synthetic vectors")
+
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((max(max_vectors // 50, 1), dim))
+    vectors = centers[rng.integers(len(centers), size=max_vectors)]
+    vectors = vectors + 0.6 * rng.standard_normal((max_vectors, dim))
+    return vectors.astype(np.float32), "synthetic"
+
+
+def _dir_bytes(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path)
+        for name in names
+    )
+
+
+def benchmark_quantization(
+    num_vectors: int = 20000,
+    dim: int = 1536,
+    num_queries: int = 50,
+    top_k: int = 10,
+    repeats: int = 200,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Reports recall@k loss against memory saved for quantized leaf vectors.
+
+    Recall is measured against exact float32 search. Queries are corpus
+    vectors with added noise (paraphrase-like neighbours), so the benchmark
+    runs offline; it uses the live index's embeddings when one is built.
+    """
+    from llama_index.core.vector_stores.types import VectorStoreQuery
+
+    from insurance_system.src.indices.numpy_store import NumpyVectorStore
+    from insurance_system.src.utils.config import VECTOR_RESCORE_FACTOR
+
+    vectors, source = _corpus_vectors(num_vectors, dim)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.integers(len(vectors), size=num_queries)]
+    queries = queries + 0.05 * rng.standard_normal(queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    exact = [set(np.argsort(-(vectors @ q))[:top_k].tolist()) for q in queries]
+    console.print(
+        f"⚙️  {len(vectors)} vectors x {vectors.shape[1]} dims ({source}), "
+        f"{num_queries} queries, k={top_k}"
+    )
+
+    nodes = [
+        TextNode(id_=str(i), text="", embedding=vector.tolist())
+        for i, vector in enumerate(vectors)
+    ]
+    float32_mb = vectors.nbytes / 1e6
+    results: Dict[str, Dict[str, float]] = {
+        "float32 (exact)": {
+            "recall@k": 1.0,
+            "ram_mb": float32_mb,
+            "disk_mb": float32_mb,
+            **_time(lambda: np.argpartition(-(vectors @ queries[0]), top_k), repeats),
+        }
+    }
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for dtype in ("float16", "int8"):
+            for rescore_factor in (0, VECTOR_RESCORE_FACTOR):
+                path = os.path.join(tmp_dir, f"{dtype}_{rescore_factor}")
+                store = NumpyVectorStore(path, dtype=dtype, rescore_factor=rescore_factor)
+                store.add(nodes)
+                store.persist()
+                store = NumpyVectorStore(path, rescore_factor=rescore_factor)
+
+                recall = 0.0
+                for q, expected in zip(queries, exact):
+                    result = store.query(
+                        VectorStoreQuery(query_embedding=q.tolist(), similarity_top_k=top_k)
+                    )
+                    recall += len(expected & {int(i) for i in result.ids}) / top_k
+                query = VectorStoreQuery(
+                    query_embedding=queries[0].tolist(), similarity_top_k=top_k
+                )
+                variant = dtype + (f" + rescore x{rescore_factor}" if rescore_factor else "")
+                results[variant] = {
+                    "recall@k": recall / num_queries,
+                    "ram_mb": store.memory_bytes() / 1e6,
+                    "disk_mb": _dir_bytes(path) / 1e6,
+                    **_time(lambda: store.query(query), repeats),
+                }
+
+    _print_results(
+        f"Quantized vectors: recall@{top_k} vs memory",
+        results,
+        columns=("recall@k", "ram_mb", "disk_mb", "mean_ms", "p50_ms"),
+    )
+    return results
+
+
+# Opens a snapshot's vector shards and runs one query, in a fresh interpreter
+_COLD_START_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+from llama_index.core.vector_stores.types import VectorStoreQuery
+from insurance_system.src.indices.hierarchical import _load_vector_stores
+stores = _load_vector_stores(sys.argv[1])
+query = VectorStoreQuery(query_embedding=[1.0] * int(sys.argv[2]), similarity_top_k=10)
+for store in stores.values():
+    store.query(query)
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def benchmark_vector_backends(
+    num_vectors: int = 10000, dim: int = 1536, repeats: int = 200
+) -> Dict[str, Dict[str, float]]:
+    """
+    Compares Chroma with the in-process NumPy backend.
+
+    Cold start is measured in a fresh interpreter (imports, opening the shard,
+    first query). Query latency is measured at SIMILARITY_TOP_K on warm stores.
+    """
+    import subprocess
+
+    import chromadb
+    from llama_index.core.vector_stores.types import VectorStoreQuery
+    from llama_index.vector_stores.chroma import ChromaVectorStore
+
+    from insurance_system.src.indices.numpy_store import NumpyVectorStore, numpy_shard_dir
+    from insurance_system.src.indices.sharding import DEFAULT_SHARD, shard_collection_name
+    from insurance_system.src.utils.config import SIMILARITY_TOP_K
+
+    vectors, source = _corpus_vectors(num_vectors, dim)
+    dim = vectors.shape[1]
+    console.print(f"⚙️  {len(vectors)} vectors x {dim} dims ({source}), top_k={SIMILARITY_TOP_K}")
+    nodes = [
+        TextNode(id_=str(i), text=f"leaf {i}", embedding=vector.tolist())
+        for i, vector in enumerate(vectors)
+    ]
+    rng = np.random.default_rng(1)
+    queries = [
+        VectorStoreQuery(query_embedding=q.tolist(), similarity_top_k=SIMILARITY_TOP_K)
+        for q in rng.standard_normal((32, dim))
+    ]
+
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        chroma_dir = os.path.join(tmp_dir, "chroma_snapshot")
+        client = chromadb.PersistentClient(path=os.path.join(chroma_dir, "chroma"))
+        collection = client.get_or_create_collection(shard_collection_name(DEFAULT_SHARD))
+        for start in range(0, len(nodes), 4096):  # Chroma's max batch size
+            ChromaVectorStore(chroma_collection=collection).add(nodes[start : start + 4096])
+
+        numpy_dir = os.path.join(tmp_dir, "numpy_snapshot")
+        numpy_store = NumpyVectorStore(numpy_shard_dir(numpy_dir, DEFAULT_SHARD), dtype="float32")
+        numpy_store.add(nodes)
+        numpy_store.persist()
+
+        backends = {
+            "chroma": (chroma_dir, ChromaVectorStore(chroma_collection=collection)),
+            "numpy (float32, mmap)": (
+                numpy_dir,
+                NumpyVectorStore(numpy_shard_dir(numpy_dir, DEFAULT_SHARD)),
+            ),
+        }
+        for variant, (persist_dir, store) in backends.items():
+            cold = []
+            for _ in range(3):
+                output = subprocess.run(
+                    [sys.executable, "-c", _COLD_START_SCRIPT, persist_dir, str(dim)],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                    cwd=os.path.abspath(
+                        os.path.join(os.path.dirname(__file__), "..", "..", "..")
+                    ),
+                )
+                cold.append(float(output.stdout.strip().splitlines()[-1]))
+            query_iter = iter(queries * (repeats // len(queries) + 1))
+            results[variant] = {
+                "cold_start_ms": statistics.median(cold),
+                **_time(lambda: store.query(next(query_iter)), repeats),
+            }
+
+    _print_results(
+        "Vector backends",
+        results,
+        columns=("cold_start_ms", "mean_ms", "p50_ms", "p99_ms"),
+    )
+    return results
+
+
+def _needle_eval_cases() -> List[Tuple[str, str, str]]:
+    """Returns (id, query, answer regex) for the needle cases of the eval dataset."""
+    data_path = os.path.join(
+        os.path.dirname(__file__), "data", "comprehensive_eval_dataset.json"
+    )
+    with open(data_path, "r") as f:
+        dataset = json.load(f)
+    cases = [
+        (case["id"], case["query"], case["expected_pattern"])
+        for case in dataset.get("hard_evals", [])
+        if case.get("type") == "regex" and case.get("expected_pattern")
+    ]
+    cases.extend(
+        (case["id"], case["query"], re.escape(case["expected"]))
+        for case in dataset.get("llm_evals", [])
+        if case.get("agent_type") == "needle"
+    )
+    return cases
+
+
+def benchmark_adaptive_top_k(repeats: int = 200) -> Dict[str, Dict[str, float]]:
+    """
+    Compares fixed and adaptive top-k reranking on the eval dataset's needle queries.
+
+    Candidates are retrieved once from the built claim index and shared by both
+    variants. A query counts as answered if its expected answer appears in
+    the nodes handed to the LLM (no LLM calls are made). Each query is timed
+    min(repeats, 5) times, since every run invokes the cross-encoder.
+    """
+    from llama_index.core import Settings
+
+    from insurance_system.src.indices.adaptive import AdaptiveTopK
+    from insurance_system.src.indices.hierarchical import load_hierarchical_retriever
+    from insurance_system.src.indices.reranker import SharedRerank
+    from insurance_system.src.utils.config import (
+        HIERARCHICAL_STORAGE_DIR,
+        RERANKER_TOP_N,
+    )
+    from insurance_system.src.utils.embedding_cache import get_embed_model
+
+    if not os.path.isdir(HIERARCHICAL_STORAGE_DIR):
+        console.print("⚠️  No claim index found. Run the indexing pipeline first.")
+        return {}
+    Settings.embed_model = get_embed_model()
+    retriever = load_hierarchical_retriever(HIERARCHICAL_STORAGE_DIR)
+    cases = _needle_eval_cases()
+    candidates = {query: retriever.retrieve(query) for _, query, _ in cases}
+
+    variants = {
+        "fixed": SharedRerank(top_n=RERANKER_TOP_N),
+        "adaptive": AdaptiveTopK(reranker=SharedRerank(), top_n=RERANKER_TOP_N),
+    }
+    answers: Dict[str, Dict[str, bool]] = {variant: {} for variant in variants}
+    telemetry: Dict[str, Any] = {}
+    results: Dict[str, Dict[str, float]] = {}
+    for variant, postprocessor in variants.items():
+        samples, reranked, kept, answered = [], [], [], 0
+        for case_id, query, pattern in cases:
+            stats = None
+            for _ in range(max(1, min(repeats, 5))):
+                nodes = [NodeWithScore(node=n.node, score=n.score) for n in candidates[query]]
+                start = time.perf_counter()
+                if isinstance(postprocessor, AdaptiveTopK):
+                    output, stats = postprocessor.rerank(nodes, QueryBundle(query))
+                else:
+                    output = postprocessor.postprocess_nodes(nodes, query_str=query)
+                samples.append((time.perf_counter() - start) * 1000)
+            reranked.append(stats.scored if stats else len(candidates[query]))
+            kept.append(len(output))
+            if stats:
+                telemetry[case_id] = stats
+            answers[variant][case_id] = any(
+                re.search(pattern, n.node.get_content(), re.IGNORECASE) for n in output
+            )
+            answered += answers[variant][case_id]
+        samples.sort()
+        results[variant] = {
+            "p50_ms": samples[len(samples) // 2],
+            "p99_ms": samples[min(int(len(samples) * 0.99), len(samples) - 1)],
+            "avg_reranked": statistics.mean(reranked),
+            "avg_kept": statistics.mean(kept),
+            "answer_recall": answered / len(cases),
+        }
+
+    # The k each query actually used
+    per_query = Table(title="Adaptive top-k per query")
+    per_query.add_column("Query", style="cyan")
+    for column in ("Candidates", "Reranked", "Kept", "Answered (fixed / adaptive)"):
+        per_query.add_column(column, justify="right")
+    for case_id, _, _ in cases:
+        stats = telemetry[case_id]
+        per_query.add_row(
+            case_id,
+            str(stats.candidates),
+            str(stats.scored),
+            str(stats.returned),
+            " / ".join("✅" if answers[v][case_id] else "❌" for v in variants),
+        )
+    console.print(per_query)
+    _print_results(
+        f"Fixed vs adaptive top-k ({len(cases)} eval queries)",
+        results,
+        columns=("p50_ms", "p99_ms", "avg_reranked", "avg_kept", "answer_recall"),
+    )
+    return results
+
+
+# Single-field questions about the sample claim and the value the fact sheet must return
+_SAMPLE_CLAIM_FILE = os.path.join(
+    os.path.dirname(__file__), "..", "..", "data", "RAG_Claim_HO-2024-8892.pdf"
+)
+_SAMPLE_CLAIM_FACTS: List[Tuple[str, Any]] = [
+    ("What is the claim ID?", "HO-2024-8892"),
+    ("What is the policy number?", "POL-TX-99824-HO3"),
+    ("Who is the insured?", "Alex Johnson"),
+    ("What is the date of loss?", "2024-11-16"),
+    ("Who is the adjuster?", "Mike Ross (License #TX-44921)"),
+    ("What was the total payout?", 19550.0),
+    ("What is the deductible?", -1000.0),
+    ("What is the cause of loss?", "Sudden & Accidental Discharge (Water)"),
+    ("What is the total estimate?", 12400.0),
+    ("What is the estimate ID?", "ES-2024-8892-REV2"),
+]
+
+
+def benchmark_fact_sheet(repeats: int = 200) -> Dict[str, Dict[str, float]]:
+    """
+    Checks and times fact-sheet lookups on the sample claim.
+
+    The sample PDF is read with the default file reader (the pages indexing
+    sees without LlamaParse), its facts are extracted, and each single-field
+    question must return its expected normalized value. Lists any question
+    answered wrongly or not at all.
+    """
+    from insurance_system.src.indices.facts import FactStore, extract_facts
+    from insurance_system.src.indices.ingestion import load_file
+
+    try:
+        from llama_index.readers.file import PDFReader  # noqa: F401
+    except ImportError:
+        console.print("⚠️  No PDF reader installed (llama-index-readers-file).")
+        return {}
+    documents = load_file(_SAMPLE_CLAIM_FILE)
+    start = time.perf_counter()
+    facts = [fact for doc in documents for fact in extract_facts(doc)]
+    extract_ms = (time.perf_counter() - start) * 1000
+    store = FactStore({"HO-2024-8892": facts})
+
+    failures = Table(title="Fact sheet: wrong or missing answers")
+    for column in ("Query", "Expected", "Got"):
+        failures.add_column(column)
+    correct = 0
+    for query, expected in _SAMPLE_CLAIM_FACTS:
+        matches = store.lookup(query)
+        got = matches[0].fact["normalized"] if matches else None
+        if got == expected:
+            correct += 1
+        else:
+            failures.add_row(query, str(expected), str(got))
+    if correct < len(_SAMPLE_CLAIM_FACTS):
+        console.print(failures)
+
+    timing = _time(
+        lambda: [store.lookup(query) for query, _ in _SAMPLE_CLAIM_FACTS], repeats
+    )
+    results = {
+        "sample claim": {
+            "pages": len(documents),
+            "facts": len(facts),
+            "extract_ms": extract_ms,
+            "lookup_us": timing["mean_ms"] * 1000 / len(_SAMPLE_CLAIM_FACTS),
+            "correct": correct / len(_SAMPLE_CLAIM_FACTS),
+        }
+    }
+    _print_results(
+        f"Fact sheet ({len(_SAMPLE_CLAIM_FACTS)} sample-claim questions)",
+        results,
+        columns=("pages", "facts", "extract_ms", "lookup_us", "correct"),
+    )
+    return results
+
+
+def benchmark_reranker(
+    repeats: int = 200, clients: int = 8
+) -> Dict[str, Dict[str, float]]:
+    """
+    Compares per-query cross-encoder scoring with the shared reranking service.
+
+    `clients` threads issue min(repeats, 64) eval queries concurrently, each
+    scoring RERANKER_TOP_N leaf-sized passages of mixed length. Per-query
+    scoring calls the model in each thread (like one SentenceTransformerRerank
+    per engine); the service batches pairs across threads and sorts them by
+    length. Backends that cannot be loaded are skipped.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from insurance_system.src.indices.reranker import (
+        RERANKER_BACKENDS,
+        CrossEncoderService,
+        RerankerError,
+        load_cross_encoder,
+    )
+    from insurance_system.src.utils.config import RERANKER_BATCH_SIZE, RERANKER_TOP_N
+
+    rng = random.Random(0)
+    words = " ".join(doc.text for doc in _synthetic_documents(4)).split()
+    passages = []
+    for _ in range(500):
+        length = rng.randint(20, 120)
+        start = rng.randrange(len(words) - length)
+        passages.append(" ".join(words[start : start + length]))
+    queries = [query for _, query, _ in _needle_eval_cases()]
+    jobs = [
+        (queries[i % len(queries)], rng.sample(passages, RERANKER_TOP_N))
+        for i in range(min(repeats, 64))
+    ]
+    console.print(
+        f"⚙️  {len(jobs)} queries x {RERANKER_TOP_N} passages from {clients} concurrent clients"
+    )
+
+    results: Dict[str, Dict[str, float]] = {}
+    for backend in RERANKER_BACKENDS:
+        try:
+            model = load_cross_encoder(backend=backend)
+        except RerankerError as e:
+            console.print(f"⚠️  Skipping {backend}: {e}")
+            continue
+        service = CrossEncoderService(backend=backend, model=model)
+
+        def per_query(query: str, texts: List[str]) -> Any:
+            pairs = [(query, text) for text in texts]
+            return model.predict(pairs, batch_size=RERANKER_BATCH_SIZE, show_progress_bar=False)
+
+        for variant, scorer in (("per query", per_query), ("shared service", service.score)):
+
+            def run(job: Tuple[str, List[str]]) -> float:
+                start = time.perf_counter()
+                scorer(*job)
+                return (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=clients) as pool:
+                latencies = sorted(pool.map(run, jobs))
+            elapsed = time.perf_counter() - start
+            results[f"{backend}, {variant}"] = {
+                "p50_ms": latencies[len(latencies) // 2],
+                "p99_ms": latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)],
+                "pairs_per_s": len(jobs) * RERANKER_TOP_N / elapsed,
+            }
+        stats = service.stats()
+        console.print(
+            f"  {backend}: {stats['batches']} service batches, "
+            f"{stats['mean_batch_pairs']:.0f} pairs per batch"
+        )
+
+    _print_results(
+        "Cross-encoder reranking", results, columns=("p50_ms", "p99_ms", "pairs_per_s")
+    )
+    return results
+
+
+class BenchmarkCheckError(Exception):
+    """Raised when a benchmark's correctness check fails."""
+
+    pass
+
+
+def _tool_turn(tools: Dict[str, Any], calls: List[Tuple[str, Dict[str, Any]]]) -> Tuple[Any, Any]:
+    """
+    Returns a one-node ToolNode graph over the called tools and the AI
+    message issuing all calls in one turn.
+    """
+    from langchain_core.messages import AIMessage
+    from langgraph.graph import END, MessagesState, StateGraph
+    from langgraph.prebuilt import ToolNode
+
+    # ToolNode needs the graph runtime, so it runs as a one-node graph
+    graph = StateGraph(MessagesState)
+    graph.add_node("tools", ToolNode([tools[name] for name, _ in calls]))
+    graph.set_entry_point("tools")
+    graph.add_edge("tools", END)
+    message = AIMessage(
+        content="",
+        tool_calls=[
+            {"name": name, "args": args, "id": f"call_{i}", "type": "tool_call"}
+            for i, (name, args) in enumerate(calls)
+        ],
+    )
+    return graph.compile(), message
+
+
+def benchmark_tool_overlap(repeats: int = 200) -> Dict[str, Dict[str, float]]:
+    """
+    Checks that ToolNode overlaps the async tool calls of one turn.
+
+    Offline counterpart of `concurrent-tools`: three tools wrapped like the
+    agent tools (claim session per thread ID) await `asyncio.sleep` with
+    fixed latencies. Each of min(repeats, 5) turns must take about the
+    slowest latency, not their sum.
+
+    Raises:
+        BenchmarkCheckError: If a turn takes longer than the slowest call
+            plus a quarter of the others.
+    """
+    import asyncio
+
+    from langchain_core.tools import Tool
+
+    from insurance_system.src.agents.tools import _in_session, start_session
+
+    latencies = {"fake_needle": 0.3, "fake_summary": 0.5, "fake_weather": 0.2}
+
+    def fake_tool(name: str, seconds: float) -> Tool:
+        async def arun(query: str) -> str:
+            await asyncio.sleep(seconds)
+            return f"{name}: {query}"
+
+        return Tool(name=name, func=None, coroutine=_in_session(arun), description=name)
+
+    tools = {name: fake_tool(name, seconds) for name, seconds in latencies.items()}
+    calls = [(name, {"query": "deductible"}) for name in latencies]
+    tool_graph, message = _tool_turn(tools, calls)
+    config = start_session("tool-overlap")
+
+    async def turn() -> float:
+        start = time.perf_counter()
+        output = await tool_graph.ainvoke({"messages": [message]}, config=config)
+        wall = (time.perf_counter() - start) * 1000
+        if len(output["messages"]) != len(calls) + 1:
+            raise BenchmarkCheckError(f"ToolNode returned {output['messages'][1:]}")
+        return wall
+
+    async def run() -> List[float]:
+        return [await turn() for _ in range(max(1, min(repeats, 5)))]
+
+    walls = asyncio.run(run())
+    slowest = max(latencies.values()) * 1000
+    total = sum(latencies.values()) * 1000
+    results = {
+        "slowest call": {"mean_ms": slowest},
+        "sequential (sum)": {"mean_ms": total},
+        "ToolNode (wall-clock)": {"mean_ms": statistics.mean(walls)},
+    }
+    _print_results("Fake tool calls of one turn", results, columns=("mean_ms",))
+    limit = slowest + (total - slowest) / 4
+    if max(walls) > limit:
+        raise BenchmarkCheckError(
+            f"ToolNode turn took {max(walls):.0f} ms; overlapping calls take "
+            f"~{slowest:.0f} ms (sum {total:.0f} ms)"
+        )
+    console.print(f"✅ Tool calls overlap: {max(walls):.0f} ms ≤ {limit:.0f} ms")
+    return results
+
+
+def benchmark_concurrent_tools(repeats: int = 200) -> Dict[str, Dict[str, float]]:
+    """
+    Measures how much the tool calls of one supervisor turn overlap in ToolNode.
+
+    One turn calls needle_expert, summary_expert and the weather tool. Each
+    round awaits the three calls one after another, then all three through
+    `ToolNode.ainvoke`. With non-blocking tools the ToolNode wall-clock
+    approaches the slowest call rather than the sum. A warm-up round fills
+    the retrieval and reranker caches for both variants. The answer cache is
+    cleared before every call. Runs min(repeats, 5) rounds against the built
+    claim index, OpenAI and the weather API.
+    """
+    import asyncio
+
+    from insurance_system.src.agents.answer_cache import get_answer_cache
+    from insurance_system.src.agents.tools import get_langchain_tools
+    from insurance_system.src.utils.config import HIERARCHICAL_STORAGE_DIR
+
+    if not os.path.isdir(HIERARCHICAL_STORAGE_DIR):
+        console.print("⚠️  No claim index found. Run the indexing pipeline first.")
+        return {}
+    tools = {tool.name: tool for tool in get_langchain_tools()}
+    needle_query = _needle_eval_cases()[0][1]
+    calls = [
+        ("needle_expert", {"query": needle_query}),
+        ("summary_expert", {"query": "Summarize the sequence of events of the claim."}),
+        ("get_historical_weather", {"city": "Austin", "date": "2024-11-16"}),
+    ]
+    tool_graph, message = _tool_turn(tools, calls)
+
+    async def sequential() -> Dict[str, float]:
+        durations = {}
+        for name, args in calls:
+            get_answer_cache().clear()
+            start = time.perf_counter()
+            await tools[name].ainvoke(args)
+            durations[name] = (time.perf_counter() - start) * 1000
+        return durations
+
+    async def concurrent() -> float:
+        get_answer_cache().clear()
+        start = time.perf_counter()
+        await tool_graph.ainvoke({"messages": [message]})
+        return (time.perf_counter() - start) * 1000
+
+    async def run() -> Dict[str, Dict[str, float]]:
+        await sequential()
+        rounds = []
+        for _ in range(max(1, min(repeats, 5))):
+            durations = await sequential()
+            rounds.append((durations, await concurrent()))
+        results = {
+            name: {"mean_ms": statistics.mean(d[name] for d, _ in rounds)}
+            for name, _ in calls
+        }
+        results["sequential (sum)"] = {
+            "mean_ms": statistics.mean(sum(d.values()) for d, _ in rounds)
+        }
+        results["ToolNode (wall-clock)"] = {
+            "mean_ms": statistics.mean(wall for _, wall in rounds)
+        }
+        return results
+
+    results = asyncio.run(run())
+    total = results["sequential (sum)"]["mean_ms"]
+    wall = results["ToolNode (wall-clock)"]["mean_ms"]
+    slowest = max(results[name]["mean_ms"] for name, _ in calls)
+    console.print(
+        f"⏱️  Overlap: {total - wall:.0f} ms saved of {total - slowest:.0f} ms possible "
+        f"({(total - wall) / max(total - slowest, 1e-9):.0%})"
+    )
+    _print_results("Tool calls of one turn", results, columns=("mean_ms",))
+    return results
+
+
+_STARTUP_SCRIPT = """
+import json, time
+start = time.perf_counter()
+from insurance_system.src.agents import manager, tools
+imported = time.perf_counter()
+manager.build_graph()
+ready = time.perf_counter()
+phases = tools.agent_startup.wait()
+loaded = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "ready_ms": (ready - start) * 1000,
+    "loaded_ms": (loaded - start) * 1000,
+    "phases": phases,
+}))
+"""
+
+
+def benchmark_startup(repeats: int = 200) -> Dict[str, Dict[str, float]]:
+    """
+    Compares parallel with sequential agent startup (STARTUP_PARALLEL).
+
+    Each run starts a fresh interpreter and times importing the manager,
+    building the graph (the CLI is ready to route) and waiting for every
+    startup phase (indices, reranker, MCP discovery) to finish. Runs
+    min(repeats, 3) times per variant against the built claim index.
+    """
+    import subprocess
+
+    from insurance_system.src.utils.config import HIERARCHICAL_STORAGE_DIR
+
+    if not os.path.isdir(HIERARCHICAL_STORAGE_DIR):
+        console.print("⚠️  No claim index found. Run the indexing pipeline first.")
+        return {}
+
+    results: Dict[str, Dict[str, float]] = {}
+    for variant, parallel in (("parallel", "true"), ("sequential", "false")):
+        runs = []
+        for _ in range(max(1, min(repeats, 3))):
+            output = subprocess.run(
+                [sys.executable, "-c", _STARTUP_SCRIPT],
+                capture_output=True,
+                text=True,
+                check=True,
+                cwd=os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")),
+                env={**os.environ, "STARTUP_PARALLEL": parallel},
+            )
+            runs.append(json.loads(output.stdout.strip().splitlines()[-1]))
+        results[variant] = {
+            key: statistics.median(run[key] for run in runs)
+            for key in ("import_ms", "ready_ms", "loaded_ms")
+        }
+        phases = {
+            phase: {
+                "seconds": statistics.median(run["phases"][phase]["seconds"] for run in runs),
+                "done_at": statistics.median(run["phases"][phase]["done_at"] for run in runs),
+            }
+            for phase in runs[0]["phases"]
+        }
+        _print_results(f"Startup phases ({variant})", phases, columns=("seconds", "done_at"))
+
+    _print_results("Startup", results, columns=("import_ms", "ready_ms", "loaded_ms"))
+    return results
+
+
+BENCHMARKS: Dict[str, Callable[..., Dict[str, Dict[str, float]]]] = {
+    "adaptive-top-k": benchmark_adaptive_top_k,
+    "automerge": benchmark_automerge,
+    "concurrent-tools": benchmark_concurrent_tools,
+    "fact-sheet": benchmark_fact_sheet,
+    "quantization": benchmark_quantization,
+    "reranker": benchmark_reranker,
+    "startup": benchmark_startup,
+    "tool-overlap": benchmark_tool_overlap,
+    "vector-backends": benchmark_vector_backends,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run retrieval microbenchmarks")
+    parser.add_argument(
+        "--mode", choices=sorted(BENCHMARKS) + ["all"], default="all", help="Benchmark"
+    )
+    parser.add_argument("--repeats", type=int, default=200, help="Timed repetitions")
+    args = parser.parse_args()
+
+    for name, benchmark in BENCHMARKS.items():
+        if args.mode in (name, "all"):
+            console.print(f"\n[bold purple]=== Benchmark: {name} ===[/bold purple]")
+            benchmark(repeats=args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import asyncio
 import json
 import os
 import sys
+import uuid
 
 # Suppress HuggingFace Tokenizer warnings
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
@@ -14,18 +15,19 @@ from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage
 from llama_index.core import Settings
 from llama_index.core.program import LLMTextCompletionProgram
-from llama_index.embeddings.openai import OpenAIEmbedding
 from llama_index.llms.openai import OpenAI
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 
 from insurance_system.src.agents.manager import build_graph
+from insurance_system.src.agents.tools import start_session
 from insurance_system.src.evaluation.models import EvaluationResult
 from insurance_system.src.utils.config import (
     EMBEDDING_MODEL,
     LLM_MODEL,
 )
+from insurance_system.src.utils.embedding_cache import get_embed_model
 from insurance_system.src.utils.prompts import (
     CONTEXT_RECALL_EVAL_PROMPT,
     CONTEXT_RELEVANCY_EVAL_PROMPT,
@@ -76,14 +78,17 @@ class LangGraphWrapper:
 
     async def aquery(self, query_str: str) -> str:
         messages = [HumanMessage(content=query_str)]
-        result = await self.app.ainvoke({"messages": messages})
+        # Every query is its own conversation: no claim carries over between cases
+        result = await self.app.ainvoke(
+            {"messages": messages}, config=start_session(uuid.uuid4().hex)
+        )
         self._extract_tool_usage(result["messages"])
         return result["messages"][-1].content
 
     def query(self, query_str: str) -> str:
         # Sync fallback
         messages = [HumanMessage(content=query_str)]
-        result = self.app.invoke({"messages": messages})
+        result = self.app.invoke({"messages": messages}, config=start_session(uuid.uuid4().hex))
         self._extract_tool_usage(result["messages"])
         return result["messages"][-1].content
 
@@ -91,7 +96,7 @@ class LangGraphWrapper:
 async def evaluate_query(query, expected, agent, evaluator_llm, console=None):
     # Use Global settings for embeddings just in case
     Settings.llm = OpenAI(model=LLM_MODEL)
-    Settings.embed_model = OpenAIEmbedding(model=EMBEDDING_MODEL)
+    Settings.embed_model = get_embed_model(EMBEDDING_MODEL)
 
     if console is None:
         console = Console()
@@ -201,7 +206,7 @@ async def run_eval():
 
     # Setup
     Settings.llm = OpenAI(model=LLM_MODEL)
-    Settings.embed_model = OpenAIEmbedding(model=EMBEDDING_MODEL)
+    Settings.embed_model = get_embed_model(EMBEDDING_MODEL)
 
     # Initialize Evaluator (Judge)
     from insurance_system.src.utils.config import EVALUATOR_MODEL
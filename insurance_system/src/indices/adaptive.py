@@ -0,0 +1,200 @@
+"""
+Adaptive top-k: rerank a few candidates first and widen only when unsure.
+
+With the fixed configuration every query reranks all retrieved candidates
+(SIMILARITY_TOP_K, or HYBRID_TOP_K) and hands RERANKER_TOP_N nodes to the LLM.
+Most needle questions are answered by the first few hits, so most of the
+cross-encoder work and LLM context goes to nodes that do not matter.
+
+`AdaptiveTopK` wraps the reranker. It scores the candidates in retrieval order
+in growing windows (ADAPTIVE_TOP_K_STEPS). After each window it looks for a
+clear gap in the reranker scores: a best node scoring at least
+ADAPTIVE_MIN_SCORE, and a drop between two neighbours of at least
+ADAPTIVE_SCORE_GAP times the best score. If there is one, the nodes above the
+gap are returned and the remaining candidates are never scored. Otherwise the
+window widens, up to all candidates, where the result is that of the fixed
+configuration (or shorter, if the full ranking has a gap).
+
+Only reranking adapts: the retriever still fetches its full top-k per claim
+shard, since vector search is cheap next to the cross-encoder.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.postprocessor.types import BaseNodePostprocessor
+from llama_index.core.schema import NodeWithScore, QueryBundle
+
+from insurance_system.src.utils.config import (
+    ADAPTIVE_MIN_SCORE,
+    ADAPTIVE_SCORE_GAP,
+    ADAPTIVE_TOP_K_STEPS,
+    RERANKER_TOP_N,
+    VERBOSE,
+)
+
+
+class AdaptiveTopKStats:
+    """How many candidates one query reranked and kept."""
+
+    def __init__(self, candidates: int = 0) -> None:
+        self.candidates = candidates
+        self.scored = 0
+        self.returned = 0
+        self.early_stop = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "candidates": self.candidates,
+            "scored": self.scored,
+            "returned": self.returned,
+            "early_stop": self.early_stop,
+        }
+
+    def __str__(self) -> str:
+        stop = " (early stop)" if self.early_stop else ""
+        return (
+            f"reranked {self.scored}/{self.candidates} candidates, "
+            f"kept {self.returned}{stop}"
+        )
+
+
+class AdaptiveTopK(BaseNodePostprocessor):
+    """
+    Reranks candidates in growing windows and stops at the first clear score gap.
+
+    The wrapped reranker scores each window with its `top_n` raised to the
+    window size, so no scored node is dropped however many candidates the
+    claim shards return.
+
+    One instance serves concurrent queries, so per-query telemetry is returned
+    by `rerank` / `arerank` rather than stored; `totals` aggregates all queries.
+    """
+
+    reranker: BaseNodePostprocessor = Field(description="Reranker scoring each window.")
+    steps: List[int] = Field(default_factory=lambda: list(ADAPTIVE_TOP_K_STEPS))
+    top_n: int = Field(default=RERANKER_TOP_N, description="Most nodes returned.")
+    min_score: float = Field(default=ADAPTIVE_MIN_SCORE)
+    score_gap: float = Field(default=ADAPTIVE_SCORE_GAP)
+
+    _totals: Dict[str, int] = PrivateAttr(default_factory=dict)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "AdaptiveTopK"
+
+    def totals(self) -> Dict[str, int]:
+        """Counters over all queries: queries, early stops, candidates, scored, returned."""
+        with self._lock:
+            return dict(self._totals)
+
+    def _gap_cut(self, ranked: List[NodeWithScore]) -> Optional[int]:
+        """Returns how many top nodes lie above the first clear score gap, if any."""
+        scores = [n.score or 0.0 for n in ranked]
+        if not scores or scores[0] < self.min_score:
+            return None
+        threshold = self.score_gap * abs(scores[0])
+        for i in range(min(len(scores) - 1, self.top_n)):
+            if scores[i] - scores[i + 1] >= threshold:
+                return i + 1
+        return None
+
+    def _window_reranker(self, window: List[NodeWithScore]) -> BaseNodePostprocessor:
+        """Returns the reranker, copied with a `top_n` keeping the whole window if needed."""
+        top_n = getattr(self.reranker, "top_n", None)
+        if top_n is None or top_n >= len(window):
+            return self.reranker
+        # A copy, as the reranker is shared by concurrent queries
+        return self.reranker.model_copy(update={"top_n": len(window)})
+
+    def _windows(self, candidates: List[NodeWithScore]) -> List[List[NodeWithScore]]:
+        """Splits the candidates into the windows scored one after another."""
+        windows = []
+        start = 0
+        for k in sorted(self.steps) + [len(candidates)]:
+            if candidates[start:k]:
+                windows.append(candidates[start:k])
+                start = k
+        return windows
+
+    def _finish(
+        self, candidates: int, scored: int, ranked: List[NodeWithScore], cut: Optional[int]
+    ) -> Tuple[List[NodeWithScore], AdaptiveTopKStats]:
+        """Returns the nodes above the cut and the query's telemetry, adding it to the totals."""
+        result = ranked[: min(cut or self.top_n, self.top_n)]
+        stats = AdaptiveTopKStats(candidates=candidates)
+        stats.scored = scored
+        stats.returned = len(result)
+        stats.early_stop = scored < candidates
+        with self._lock:
+            for key, value in (
+                ("queries", 1),
+                ("early_stops", int(stats.early_stop)),
+                ("candidates", stats.candidates),
+                ("scored", stats.scored),
+                ("returned", stats.returned),
+            ):
+                self._totals[key] = self._totals.get(key, 0) + value
+        if VERBOSE:
+            print(f"  🎯 Adaptive top-k: {stats}")
+        return result, stats
+
+    def rerank(
+        self,
+        nodes: List[NodeWithScore],
+        query_bundle: Optional[QueryBundle] = None,
+    ) -> Tuple[List[NodeWithScore], AdaptiveTopKStats]:
+        """Reranks the candidates adaptively, returning the kept nodes and this query's stats."""
+        candidates = sorted(nodes, key=lambda n: n.score or 0.0, reverse=True)
+        scored: List[NodeWithScore] = []
+        ranked: List[NodeWithScore] = []
+        cut = None
+        for window in self._windows(candidates):
+            scored.extend(
+                self._window_reranker(window).postprocess_nodes(
+                    window, query_bundle=query_bundle
+                )
+            )
+            ranked = sorted(scored, key=lambda n: n.score or 0.0, reverse=True)
+            cut = self._gap_cut(ranked)
+            if cut is not None:
+                break
+        return self._finish(len(candidates), len(scored), ranked, cut)
+
+    async def arerank(
+        self,
+        nodes: List[NodeWithScore],
+        query_bundle: Optional[QueryBundle] = None,
+    ) -> Tuple[List[NodeWithScore], AdaptiveTopKStats]:
+        """Async `rerank`."""
+        candidates = sorted(nodes, key=lambda n: n.score or 0.0, reverse=True)
+        scored: List[NodeWithScore] = []
+        ranked: List[NodeWithScore] = []
+        cut = None
+        for window in self._windows(candidates):
+            scored.extend(
+                await self._window_reranker(window).apostprocess_nodes(
+                    window, query_bundle=query_bundle
+                )
+            )
+            ranked = sorted(scored, key=lambda n: n.score or 0.0, reverse=True)
+            cut = self._gap_cut(ranked)
+            if cut is not None:
+                break
+        return self._finish(len(candidates), len(scored), ranked, cut)
+
+    def _postprocess_nodes(
+        self,
+        nodes: List[NodeWithScore],
+        query_bundle: Optional[QueryBundle] = None,
+    ) -> List[NodeWithScore]:
+        return self.rerank(nodes, query_bundle)[0]
+
+    async def _apostprocess_nodes(
+        self,
+        nodes: List[NodeWithScore],
+        query_bundle: Optional[QueryBundle] = None,
+    ) -> List[NodeWithScore]:
+        return (await self.arerank(nodes, query_bundle))[0]
@@ -0,0 +1,194 @@
+"""
+Batched, concurrent embedding stage for index construction.
+
+Leaf nodes are split into fixed-size batches, embedded by a bounded pool of
+concurrent requests (with retry and exponential backoff), and written back to
+the vector store strictly in input order.
+"""
+
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from llama_index.core.schema import BaseNode, MetadataMode
+from llama_index.core.utils import get_tokenizer
+
+from insurance_system.src.utils.config import (
+    EMBED_BATCH_SIZE,
+    EMBED_MAX_CONCURRENCY,
+    EMBED_MAX_RETRIES,
+    EMBED_RETRY_BACKOFF,
+)
+
+
+class EmbeddingPipelineError(Exception):
+    """Base exception for embedding pipeline errors."""
+
+    pass
+
+
+class EmbeddingStats:
+    """Throughput statistics of an embedding run."""
+
+    def __init__(self) -> None:
+        self.nodes = 0
+        self.tokens = 0
+        self.batches = 0
+        self.retries = 0
+        self.seconds = 0.0
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.tokens / self.seconds if self.seconds > 0 else 0.0
+
+    def merge(self, other: "EmbeddingStats") -> None:
+        """Adds the numbers of another run (e.g. the next streamed batch)."""
+        self.nodes += other.nodes
+        self.tokens += other.tokens
+        self.batches += other.batches
+        self.retries += other.retries
+        self.seconds += other.seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            "nodes": self.nodes,
+            "tokens": self.tokens,
+            "batches": self.batches,
+            "retries": self.retries,
+            "seconds": round(self.seconds, 3),
+            "nodes_per_second": round(self.nodes_per_second, 2),
+            "tokens_per_second": round(self.tokens_per_second, 2),
+        }
+
+    def __str__(self) -> str:
+        return (
+            f"{self.nodes} nodes / {self.tokens} tokens in {self.seconds:.2f}s "
+            f"({self.nodes_per_second:.1f} nodes/s, "
+            f"{self.tokens_per_second:.1f} tokens/s, {self.retries} retries)"
+        )
+
+
+class EmbeddingPipeline:
+    """
+    Embeds nodes in batches with a bounded number of in-flight requests.
+
+    Works with any LlamaIndex embedding model (e.g. OpenAIEmbedding or a local
+    MockEmbedding), since it only relies on `get_text_embedding_batch`.
+    """
+
+    def __init__(
+        self,
+        embed_model: Optional[Any] = None,
+        batch_size: int = EMBED_BATCH_SIZE,
+        max_concurrency: int = EMBED_MAX_CONCURRENCY,
+        max_retries: int = EMBED_MAX_RETRIES,
+        retry_backoff: float = EMBED_RETRY_BACKOFF,
+    ) -> None:
+        """
+        Initialize the embedding pipeline.
+
+        Args:
+            embed_model: Embedding model to use. Defaults to Settings.embed_model.
+            batch_size: Number of texts per embedding request.
+            max_concurrency: Maximum number of embedding requests in flight.
+            max_retries: Retries per batch before giving up.
+            retry_backoff: Base delay in seconds, doubled after every retry.
+        """
+        if batch_size < 1 or max_concurrency < 1:
+            raise ValueError("batch_size and max_concurrency must be positive")
+
+        if embed_model is None:
+            from llama_index.core import Settings
+
+            embed_model = Settings.embed_model
+
+        self.embed_model = embed_model
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._tokenizer = get_tokenizer()
+
+    def _embed_batch(self, texts: List[str]) -> Tuple[List[List[float]], int]:
+        """Embeds one batch, retrying with exponential backoff. Returns (embeddings, retries)."""
+        attempt = 0
+        while True:
+            try:
+                embeddings = self.embed_model.get_text_embedding_batch(texts)
+                if len(embeddings) != len(texts):
+                    raise EmbeddingPipelineError(
+                        f"Expected {len(texts)} embeddings, got {len(embeddings)}"
+                    )
+                return embeddings, attempt
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    raise EmbeddingPipelineError(
+                        f"Embedding batch failed after {attempt + 1} attempts: {e}"
+                    ) from e
+                time.sleep(self.retry_backoff * (2**attempt))
+                attempt += 1
+
+    def run(
+        self,
+        nodes: Sequence[BaseNode],
+        write_fn: Optional[Callable[[List[BaseNode]], Any]] = None,
+    ) -> EmbeddingStats:
+        """
+        Embeds the nodes in place and writes them back in input order.
+
+        Args:
+            nodes: Nodes to embed. Their `embedding` attribute is set.
+            write_fn: Optional callback receiving each embedded batch, in order
+                (e.g. `index.insert_nodes`). Writes overlap with later requests.
+
+        Returns:
+            EmbeddingStats with throughput numbers.
+        """
+        stats = EmbeddingStats()
+        start_time = time.perf_counter()
+
+        batches = [
+            list(nodes[i : i + self.batch_size])
+            for i in range(0, len(nodes), self.batch_size)
+        ]
+
+        pending: Deque[Tuple[List[BaseNode], Future]] = deque()
+
+        def drain_one() -> None:
+            batch, future = pending.popleft()
+            embeddings, retries = future.result()
+            for node, embedding in zip(batch, embeddings):
+                node.embedding = embedding
+            if write_fn is not None:
+                write_fn(batch)
+            stats.batches += 1
+            stats.retries += retries
+            stats.nodes += len(batch)
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            try:
+                for batch in batches:
+                    texts = [
+                        node.get_content(metadata_mode=MetadataMode.EMBED)
+                        for node in batch
+                    ]
+                    stats.tokens += sum(len(self._tokenizer(t)) for t in texts)
+                    pending.append((batch, executor.submit(self._embed_batch, texts)))
+                    # Bound in-flight requests; the oldest batch is written first
+                    if len(pending) >= self.max_concurrency:
+                        drain_one()
+                while pending:
+                    drain_one()
+            except Exception:
+                for _, future in pending:
+                    future.cancel()
+                raise
+
+        stats.seconds = time.perf_counter() - start_time
+        return stats
@@ -0,0 +1,419 @@
+"""
+Build-time fact sheet: typed key/value facts per claim with O(1) lookup.
+
+Many questions ("What is the deductible?", "Who is the adjuster?") ask for a
+single field that the parsed pages already state as a table cell or a
+"Key: Value" line. Tables are read both as markdown (LlamaParse) and in the
+one-cell-per-line layout that plain PDF text extraction produces. Those facts are extracted while indexing and written to
+`facts.json` in the snapshot, grouped by claim. At query time a dictionary
+keyed by label words finds the fact without embedding, retrieval, reranking or
+an LLM call; anything it cannot answer unambiguously is left to retrieval.
+
+A table cell becomes a fact labelled by the first cell of its row and named by
+its column header, e.g. ("NET PAYOUT", "AMOUNT") -> "$19,550.00". Values are
+typed: money and numbers are parsed to floats, dates to ISO format.
+"""
+
+import json
+import os
+import re
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from llama_index.core import Document
+
+from insurance_system.src.indices.lexical import tokenize
+from insurance_system.src.indices.sharding import DEFAULT_SHARD, detect_claim_id
+from insurance_system.src.indices.snapshots import resolve_snapshot_dir
+from insurance_system.src.utils.config import FACT_MIN_SCORE
+
+FACTS_FILENAME = "facts.json"
+
+_SEPARATOR_CELL_RE = re.compile(r"^:?-{2,}:?$")
+_MARKUP_RE = re.compile(r"<[^>]+>|\*\*|__|`")
+_EMPHASIS_RE = re.compile(r"^(?:<b>.*</b>|\*\*.*\*\*)$")
+# Numbered section heading, e.g. "2.1 Applicable Policy Forms" (not "8.5 GPM")
+_HEADING_RE = re.compile(r"^\d+(?:\.\d+)+\s+\S+\s+\S")
+_HEADER_PUNCTUATION_RE = re.compile(r"[\d:.,;!?|#$%]")
+_HEADER_SMALL_WORDS = frozenset("a an and by for in of on or per the to".split())
+# "Key: Value" with a short key, optionally as a list item
+_LINE_RE = re.compile(
+    r"^\s*(?:[-*]\s+)?([A-Za-z][A-Za-z0-9 /&().#'-]{1,40}?)\s*:\s+(\S.*)$"
+)
+_MONEY_RE = re.compile(r"^\(?-?\$\s?-?[\d,]*\d(?:\.\d+)?\)?$")
+_NUMBER_RE = re.compile(r"^-?[\d,]*\d(?:\.\d+)?%?$")
+_DATE_FORMATS = ("%B %d, %Y", "%b %d, %Y", "%m/%d/%Y", "%Y-%m-%d", "%d %B %Y")
+
+# Question and filler words that never name a field
+_GENERIC_WORDS = frozenset(
+    """
+    a amount an and are as at be been by can claim did do does document documents file for from
+    give how i in is it its listed me much number of on please recorded reported s say
+    show stated tell that the this to value was were what when where which who whom
+    """.split()
+)
+
+
+class FactStoreError(Exception):
+    """Base exception for fact store errors."""
+
+    pass
+
+
+class FactMatch(NamedTuple):
+    """A fact answering a query."""
+
+    claim_id: str
+    fact: Dict[str, Any]
+    score: float
+
+
+def _clean(cell: str) -> str:
+    return " ".join(_MARKUP_RE.sub("", cell).split())
+
+
+def _words(text: str) -> FrozenSet[str]:
+    """Returns the content words of a text, with a plural "s" stripped."""
+    words = set()
+    for token in tokenize(text, parts=False):
+        if token.isalpha() and len(token) > 3 and token[-1] == "s" and token[-2] != "s":
+            token = token[:-1]
+        if token not in _GENERIC_WORDS:
+            words.add(token)
+    return frozenset(words)
+
+
+def type_value(value: str) -> Tuple[str, Any]:
+    """
+    Returns the type ("money", "number", "percent", "date" or "text") and
+    normalized form of a raw value.
+    """
+    if _MONEY_RE.match(value):
+        amount = float(re.sub(r"[^\d.]", "", value))
+        negative = "-" in value or value.startswith("(")
+        return "money", -amount if negative else amount
+    if _NUMBER_RE.match(value):
+        number = float(value.replace(",", "").rstrip("%"))
+        return ("percent", number) if value.endswith("%") else ("number", number)
+    for date_format in _DATE_FORMATS:
+        try:
+            return "date", datetime.strptime(value, date_format).date().isoformat()
+        except ValueError:
+            continue
+    return "text", value
+
+
+def _fact(
+    label: str, column: str, value: str, kind: str, context: str, doc: Document
+) -> Dict[str, Any]:
+    value_type, normalized = type_value(value)
+    return {
+        "label": label,
+        "column": column,
+        "value": value,
+        "type": value_type,
+        "normalized": normalized,
+        "kind": kind,
+        "context": context,
+        "file_name": doc.metadata.get("file_name"),
+        "page": doc.metadata.get("page_label"),
+    }
+
+
+def _table_facts(rows: List[List[str]], doc: Document) -> List[Dict[str, Any]]:
+    """Turns a markdown table (header first) into one fact per labelled cell."""
+    header = rows[0]
+    facts = []
+    for row in rows[1:]:
+        filled = [i for i, cell in enumerate(row) if cell]
+        if len(filled) < 2 or type_value(row[filled[0]])[0] != "text":
+            continue
+        label = row[filled[0]]
+        context = " | ".join(header + row)
+        for i in filled[1:]:
+            column = header[i] if i < len(header) else ""
+            facts.append(_fact(label, column, row[i], "table", context, doc))
+    return facts
+
+
+def _is_header_cell(line: str) -> bool:
+    """Whether a line reads as a column name: a few capitalized words, no digits."""
+    words = line.split()
+    if not words or len(words) > 4 or _HEADER_PUNCTUATION_RE.search(line):
+        return False
+    if _EMPHASIS_RE.match(line):
+        return False
+    for word in words:
+        letters = re.sub(r"[^A-Za-z]", "", word)
+        if letters and not letters[0].isupper() and word not in _HEADER_SMALL_WORDS:
+            return False
+    return any(c.isalpha() for c in line)
+
+
+def _header_run(lines: List[str]) -> int:
+    """Number of leading lines that read as column names (all upper case if the first is)."""
+    upper = bool(lines) and lines[0].strip().isupper()
+    run = 0
+    for line in lines:
+        line = line.strip()
+        if not _is_header_cell(line) or upper and not line.isupper():
+            break
+        run += 1
+    return run
+
+
+def _ends_table(line: str) -> bool:
+    """Whether a line cannot be a cell: a numbered heading, a "Key: Value" line or a rule."""
+    line = line.strip()
+    match = _LINE_RE.match(_clean(line))
+    return (
+        bool(_HEADING_RE.match(line))
+        or bool(match and len(match.group(1).split()) <= 5)
+        or not re.search(r"[A-Za-z0-9]", line)
+    )
+
+
+def _is_money(cell: str) -> bool:
+    return type_value(_clean(cell))[0] == "money"
+
+
+def _line_table_rows(lines: List[str], width: int) -> Tuple[List[List[str]], int]:
+    """
+    Reads the rows of a table laid out one cell per line, as PDF text
+    extraction emits it, starting after its header.
+
+    Rows normally span `width` lines. Two kinds of short rows are recognized:
+    emphasized rows (group headings and totals such as "TOTAL ESTIMATE" /
+    "$12,400.00") and, in tables whose last column holds amounts, rows that
+    end at an amount (e.g. "(Less Deductible)" / "-$1,000.00"). Short rows are
+    right-aligned, since they only fill the label and the trailing columns.
+
+    Returns:
+        The rows and the number of lines they span. Reading stops at a line
+        that cannot be a cell or at an incomplete row.
+    """
+    rows: List[List[str]] = []
+    amounts_last = False
+    i = 0
+    while i < len(lines):
+        cells = []
+        for line in lines[i : i + width]:
+            if _ends_table(line):
+                break
+            cells.append(line.strip())
+        if not cells:
+            break
+        emphasized = bool(_EMPHASIS_RE.match(cells[0]))
+        if emphasized:
+            n = next((j for j, c in enumerate(cells) if not _EMPHASIS_RE.match(c)), len(cells))
+        elif amounts_last:
+            n = next(
+                (
+                    j + 1
+                    for j, c in enumerate(cells)
+                    if _is_money(c) and (j + 1 == len(cells) or not _is_money(cells[j + 1]))
+                ),
+                len(cells),
+            )
+        else:
+            n = len(cells)
+        row = [_clean(c) for c in cells[:n]]
+        if n == width:
+            rows.append(row)
+            amounts_last = _is_money(row[-1])
+        elif emphasized or n < len(cells):
+            # Short row; one holding only text is a group heading without facts
+            if n > 1 and any(type_value(c)[0] != "text" for c in row[1:]):
+                rows.append(row[:1] + [""] * (width - n) + row[1:])
+        else:
+            break
+        i += n
+    return rows, i
+
+
+def _line_table(lines: List[str]) -> Tuple[List[List[str]], int]:
+    """
+    Reads a one-cell-per-line table starting at its header.
+
+    The header is the run of column-name lines at the start. As data cells
+    can look like column names too ("Section I" under "Section"), the widest
+    header prefix whose rows run cleanly to the end of the table is used.
+
+    Returns:
+        The table (header first) and the number of lines it spans, or
+        ([], 0) if no table starts here.
+    """
+    for width in range(_header_run(lines), 1, -1):
+        rows, consumed = _line_table_rows(lines[width:], width)
+        end = width + consumed
+        if rows and (end == len(lines) or _ends_table(lines[end])):
+            return [[_clean(c) for c in lines[:width]]] + rows, end
+    return [], 0
+
+
+def extract_facts(doc: Document) -> List[Dict[str, Any]]:
+    """
+    Extracts the facts stated in a parsed page.
+
+    Reads markdown tables (as produced by LlamaParse), tables with one cell
+    per line under a header of column-name lines (as produced by PDF text
+    extraction) and "Key: Value" lines; other prose is left to retrieval.
+    """
+    facts: List[Dict[str, Any]] = []
+    table: List[List[str]] = []
+    lines = doc.text.splitlines() + [""]
+    i = 0
+    while i < len(lines):
+        stripped = lines[i].strip()
+        if stripped.startswith("|"):
+            cells = [_clean(c) for c in stripped.strip("|").split("|")]
+            if not all(_SEPARATOR_CELL_RE.match(c) for c in cells):
+                table.append(cells)
+            i += 1
+            continue
+        if len(table) > 1:
+            facts.extend(_table_facts(table, doc))
+        table = []
+
+        line_table, consumed = _line_table(lines[i:])
+        if line_table:
+            facts.extend(_table_facts(line_table, doc))
+            i += consumed
+            continue
+
+        match = _LINE_RE.match(_clean(stripped))
+        if match and len(match.group(1).split()) <= 5:
+            label, value = match.group(1).strip(), match.group(2).strip()
+            facts.append(_fact(label, "", value, "line", "", doc))
+        i += 1
+    return facts
+
+
+def fact_name(fact: Dict[str, Any]) -> str:
+    """Returns a display name for a fact: its label, plus a non-generic column."""
+    if _words(fact["column"]):
+        return f"{fact['label']} / {fact['column']}"
+    return fact["label"]
+
+
+def save_facts(persist_dir: str, documents: Dict[str, Any]) -> int:
+    """
+    Writes the facts of the manifest's page entries to `facts.json`, grouped by claim.
+
+    Returns:
+        Number of facts written.
+    """
+    facts_by_claim: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for source_key in sorted(documents):
+        entry = documents[source_key]
+        facts_by_claim[entry.get("claim_id", DEFAULT_SHARD)].extend(entry.get("facts", []))
+    path = os.path.join(persist_dir, FACTS_FILENAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"claims": facts_by_claim}, f)
+    os.replace(tmp_path, path)
+    return sum(len(facts) for facts in facts_by_claim.values())
+
+
+class FactStore:
+    """
+    Label-word dictionary over the facts of each claim.
+
+    A fact matches a query when the query names its row label, every other
+    content word of the query appears in the fact's label, column or row, and
+    at least `min_score` of the label and column words are in the query. A
+    lookup only touches the facts sharing a word with the query, so it does
+    not grow with the corpus.
+    """
+
+    def __init__(
+        self,
+        facts_by_claim: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+        min_score: float = FACT_MIN_SCORE,
+    ) -> None:
+        self.min_score = min_score
+        # Per claim: (fact, label words, label + column words, covered words)
+        self._entries: Dict[str, List[Tuple[Dict[str, Any], ...]]] = {}
+        self._postings: Dict[str, Dict[str, List[int]]] = {}
+        for claim_id, facts in (facts_by_claim or {}).items():
+            entries = []
+            postings: Dict[str, List[int]] = defaultdict(list)
+            for fact in facts:
+                label = _words(fact["label"])
+                key = label | _words(fact["column"])
+                if not label:
+                    continue
+                for word in key:
+                    postings[word].append(len(entries))
+                entries.append((fact, label, key, key | _words(fact["context"])))
+            self._entries[claim_id] = entries
+            self._postings[claim_id] = dict(postings)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    @property
+    def claim_ids(self) -> List[str]:
+        return sorted(self._entries)
+
+    def _best(self, claim_id: str, words: FrozenSet[str]) -> Optional[FactMatch]:
+        entries = self._entries.get(claim_id, [])
+        postings = self._postings.get(claim_id, {})
+        candidates = {i for word in words for i in postings.get(word, ())}
+        ranked = []
+        for i in candidates:
+            fact, label, key, covered = entries[i]
+            matched = key & words
+            score = len(matched) / len(key)
+            if not label & words or score < self.min_score or words - covered:
+                continue
+            ranked.append(((score, len(matched), fact["kind"] == "line"), fact))
+        if not ranked:
+            return None
+        ranked.sort(key=lambda r: r[0], reverse=True)
+        rank, fact = ranked[0]
+        # Equally good facts with different values: let retrieval decide
+        if any(r == rank and f["value"] != fact["value"] for r, f in ranked[1:]):
+            return None
+        return FactMatch(claim_id, fact, rank[0])
+
+    def lookup(self, query: str, claim_ids: Optional[List[str]] = None) -> List[FactMatch]:
+        """
+        Returns the fact answering a query for each claim, best first.
+
+        Args:
+            query: The user query.
+            claim_ids: Claims to search (all if None).
+        """
+        words = _words(query)
+        claim_id = detect_claim_id(query)
+        if claim_id:
+            words -= _words(claim_id)
+        if not words:
+            return []
+        matches = [
+            match
+            for match in (self._best(c, words) for c in claim_ids or self.claim_ids)
+            if match is not None
+        ]
+        return sorted(matches, key=lambda m: m.score, reverse=True)
+
+    @classmethod
+    def load(cls, persist_dir: str) -> "FactStore":
+        """
+        Loads the fact sheet of an index root's live snapshot.
+
+        Snapshots built before fact extraction load as an empty store.
+
+        Raises:
+            FactStoreError: If the fact sheet cannot be read.
+        """
+        path = os.path.join(resolve_snapshot_dir(persist_dir), FACTS_FILENAME)
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, "r") as f:
+                return cls(json.load(f)["claims"])
+        except (OSError, ValueError, KeyError) as e:
+            raise FactStoreError(f"Failed to load fact sheet {path}: {e}") from e
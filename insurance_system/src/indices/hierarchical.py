@@ -1,24 +1,90 @@
 import os
-from typing import Any, List, Optional
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set
 
-import chromadb
 from llama_index.core import (
     Document,
+    Settings,
     StorageContext,
     VectorStoreIndex,
     load_index_from_storage,
 )
-from llama_index.core.node_parser import HierarchicalNodeParser, get_leaf_nodes
+from llama_index.core.base.base_retriever import BaseRetriever
+from llama_index.core.node_parser import (
+    HierarchicalNodeParser,
+    SentenceSplitter,
+    get_leaf_nodes,
+)
 from llama_index.core.query_engine import RetrieverQueryEngine
 from llama_index.core.retrievers import AutoMergingRetriever
-from llama_index.core.storage.docstore import SimpleDocumentStore
-from llama_index.vector_stores.chroma import ChromaVectorStore
+from llama_index.core.schema import BaseNode
+from llama_index.core.vector_stores.types import BasePydanticVectorStore
 
+from insurance_system.src.indices.adaptive import AdaptiveTopK
+from insurance_system.src.indices.embedding_pipeline import (
+    EmbeddingPipeline,
+    EmbeddingStats,
+)
+from insurance_system.src.indices.facts import extract_facts, save_facts
+from insurance_system.src.indices.hierarchy_table import (
+    ArrayAutoMergingRetriever,
+    AsyncAutoMergingRetriever,
+    HierarchyTable,
+)
+from insurance_system.src.indices.lexical import (
+    LEXICAL_DIRNAME,
+    BM25Index,
+    HybridRetriever,
+    lexical_index_path,
+    list_lexical_indices,
+)
+from insurance_system.src.indices.manifest import (
+    assign_stable_document_ids,
+    hash_document,
+    hash_node,
+    load_manifest,
+    new_manifest,
+    save_manifest,
+    stable_node_id_func,
+    stamp_manifest,
+)
+from insurance_system.src.indices.numpy_store import (
+    NumpyVectorStore,
+    list_numpy_shards,
+    numpy_shard_dir,
+)
+from insurance_system.src.indices.rerank_cache import get_score_cache
+from insurance_system.src.indices.reranker import SharedRerank, get_reranker_service
+from insurance_system.src.indices.retrieval_cache import CachedVectorRetriever
+from insurance_system.src.indices.sharding import (
+    DEFAULT_SHARD,
+    ClaimRouter,
+    ShardedRetriever,
+    document_claim_id,
+    list_shard_collections,
+    shard_claim_id,
+    shard_collection_name,
+)
+from insurance_system.src.indices.snapshots import (
+    create_snapshot,
+    discard_snapshot,
+    gc_snapshots,
+    publish_snapshot,
+    resolve_snapshot_dir,
+)
+from insurance_system.src.indices.sqlite_docstore import (
+    DOCSTORE_FILENAME,
+    SqliteDocumentStore,
+    load_docstore,
+)
 from insurance_system.src.utils.config import (
     CHUNK_OVERLAP,
     CHUNK_SIZES,
     HIERARCHICAL_STORAGE_DIR,
     SIMILARITY_TOP_K,
+    VECTOR_DTYPE,
+    VECTOR_FLUSH_NODES,
+    VECTOR_STORE_BACKEND,
 )
 
 
@@ -28,105 +94,557 @@ class HierarchicalIndexError(Exception):
     pass
 
 
-def create_hierarchical_index(
-    documents: List[Document], persist_dir: str = HIERARCHICAL_STORAGE_DIR
-) -> VectorStoreIndex:
-    """Creates a hierarchical index using the HierarchicalNodeParser and ChromaDB."""
-    try:
-        # Define the chunk sizes for the hierarchy
-        node_parser = HierarchicalNodeParser.from_defaults(
-            chunk_sizes=CHUNK_SIZES, chunk_overlap=CHUNK_OVERLAP
+def _get_node_parser() -> HierarchicalNodeParser:
+    """Builds the hierarchical node parser with deterministic node IDs."""
+    node_parser_ids = [f"chunk_size_{chunk_size}" for chunk_size in CHUNK_SIZES]
+    node_parser_map = {
+        node_parser_id: SentenceSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=CHUNK_OVERLAP,
+            id_func=stable_node_id_func,
         )
+        for chunk_size, node_parser_id in zip(CHUNK_SIZES, node_parser_ids)
+    }
+    return HierarchicalNodeParser.from_defaults(
+        node_parser_ids=node_parser_ids, node_parser_map=node_parser_map
+    )
+
+
+def _vector_backend() -> str:
+    """Returns the configured vector backend, "chroma" or "numpy"."""
+    # Quantized vectors are only supported by the in-process store
+    if VECTOR_DTYPE != "float32":
+        return "numpy"
+    return VECTOR_STORE_BACKEND
 
-        nodes = node_parser.get_nodes_from_documents(documents)
-        leaf_nodes = get_leaf_nodes(nodes)
 
-        # Create storage context
-        # 1. Docstore (for hierarchy mapping)
-        docstore = SimpleDocumentStore()
-        docstore.add_documents(nodes)
+def _get_build_config() -> Dict[str, Any]:
+    """Settings that invalidate every stored node when they change."""
+    return {
+        "chunk_sizes": list(CHUNK_SIZES),
+        "chunk_overlap": CHUNK_OVERLAP,
+        "embedding_model": getattr(Settings.embed_model, "model_name", None),
+        "vector_backend": _vector_backend(),
+        "vector_dtype": VECTOR_DTYPE,
+    }
 
-        # 2. Vector Store (ChromaDB)
+
+class HierarchicalIndexBuilder:
+    """
+    Builds the hierarchical index batch by batch.
+
+    Documents can be streamed in with `add_documents`; each batch is parsed,
+    diffed against the previous manifest, embedded and upserted before the next
+    one arrives. Leaves are written to the vector shard of their claim (see
+    `sharding`) in Chroma or the NumPy store (see `numpy_store`), while a
+    single docstore keeps the full hierarchy. `finish`
+    removes nodes of pages that were not seen, persists the docstore and
+    writes the manifest.
+
+    Everything is written into a new snapshot of `persist_dir` (see
+    `snapshots`), which only becomes visible to readers when `finish`
+    publishes it.
+    """
+
+    def __init__(
+        self, persist_dir: str = HIERARCHICAL_STORAGE_DIR, incremental: bool = False
+    ) -> None:
+        """
+        Initialize the builder.
+
+        Args:
+            persist_dir: Index root holding the snapshots.
+            incremental: If True and a compatible build is live in persist_dir,
+                start from a copy of it and only re-embed leaves whose content
+                hash changed and delete nodes whose source page disappeared.
+                Otherwise rebuild from scratch.
+
+        Raises:
+            HierarchicalIndexError: If the vector store cannot be initialized.
+        """
+        self.root_dir = persist_dir
+        # Define the chunk sizes for the hierarchy
+        self.node_parser = _get_node_parser()
+
+        config = _get_build_config()
+        previous = None
+        base_dir = None
+        if incremental and os.path.isdir(persist_dir):
+            base_dir = resolve_snapshot_dir(persist_dir)
+            previous = load_manifest(base_dir)
+        if previous is not None and (
+            previous.get("config") != config
+            or not os.path.exists(os.path.join(base_dir, DOCSTORE_FILENAME))
+        ):
+            print("  ⚠️  Build configuration changed, falling back to full rebuild.")
+            previous = None
+        self._previous_docs: Dict[str, Any] = previous["documents"] if previous else {}
+
+        # Readers keep using the live snapshot until this one is published
+        self.persist_dir = create_snapshot(
+            persist_dir, base_dir if previous is not None else None
+        )
+        self._published = False
+        persist_dir = self.persist_dir
+
+        # 1. Vector Store (ChromaDB or NumPy), one collection per claim shard
         # Ensure persistent client
-        chroma_path = os.path.join(persist_dir, "chroma")
+        self._vector_stores: Dict[str, BasePydanticVectorStore] = {}
+        self.chroma_client = None
         try:
-            chroma_client = chromadb.PersistentClient(path=chroma_path)
+            if _vector_backend() == "chroma":
+                import chromadb
 
-            # Delete existing collection to prevent stale embeddings
-            try:
-                chroma_client.delete_collection("hierarchical_claims")
-            except Exception:
-                pass
+                chroma_path = os.path.join(persist_dir, "chroma")
+                self.chroma_client = chromadb.PersistentClient(path=chroma_path)
+            vector_store = self._vector_store(DEFAULT_SHARD)
+        except Exception as e:
+            discard_snapshot(self.persist_dir)
+            raise HierarchicalIndexError(f"Vector store initialization failed: {e}") from e
 
-            chroma_collection = chroma_client.get_or_create_collection(
-                "hierarchical_claims"
+        # 2. Docstore (for hierarchy mapping), written straight to SQLite
+        if previous is None:
+            storage_context = StorageContext.from_defaults(
+                docstore=SqliteDocumentStore.from_persist_dir(persist_dir),
+                vector_store=vector_store,
             )
-            vector_store = ChromaVectorStore(chroma_collection=chroma_collection)
-        except Exception as e:
-            raise HierarchicalIndexError(f"ChromaDB initialization failed: {e}") from e
+            self.index = VectorStoreIndex(nodes=[], storage_context=storage_context)
+        else:
+            storage_context = StorageContext.from_defaults(
+                persist_dir=persist_dir,
+                docstore=SqliteDocumentStore.from_persist_dir(persist_dir),
+                vector_store=vector_store,
+            )
+            self.index = load_index_from_storage(storage_context)
+        self.docstore = storage_context.docstore
 
-        storage_context = StorageContext.from_defaults(
-            docstore=docstore, vector_store=vector_store
-        )
+        # 3. Lexical (BM25) index per claim shard, updated with the vectors
+        self._lexical_indices: Dict[str, BM25Index] = {}
+        if previous is not None and not os.path.isdir(
+            os.path.join(persist_dir, LEXICAL_DIRNAME)
+        ):
+            # Snapshot built before lexical indexing: index its leaves once
+            for entry in self._previous_docs.values():
+                self._lexical_index(entry.get("claim_id", DEFAULT_SHARD)).add(
+                    self.docstore.get_nodes(entry["leaves"], raise_error=False)
+                )
+
+        self.manifest = new_manifest(config)
+        self.changes: Dict[str, Any] = {
+            "mode": "incremental" if previous is not None else "full",
+            "added_documents": [],
+            "changed_documents": [],
+            "removed_documents": [],
+            "unchanged_documents": 0,
+            "upserted_leaves": 0,
+            "deleted_nodes": 0,
+        }
+        self.embedding_stats = EmbeddingStats()
+        self._seen_keys: Set[str] = set()
+
+    def _vector_store(self, claim_id: str) -> BasePydanticVectorStore:
+        """Returns the vector store of a claim shard, creating it if needed."""
+        if claim_id in self._vector_stores:
+            return self._vector_stores[claim_id]
+        if self.chroma_client is None:
+            self._vector_stores[claim_id] = NumpyVectorStore(
+                numpy_shard_dir(self.persist_dir, claim_id),
+                dtype=VECTOR_DTYPE,
+                flush_every=VECTOR_FLUSH_NODES,
+            )
+        else:
+            from llama_index.vector_stores.chroma import ChromaVectorStore
+
+            collection = self.chroma_client.get_or_create_collection(
+                shard_collection_name(claim_id)
+            )
+            self._vector_stores[claim_id] = ChromaVectorStore(
+                chroma_collection=collection
+            )
+        return self._vector_stores[claim_id]
+
+    def _lexical_index(self, claim_id: str) -> BM25Index:
+        """Returns the lexical index of a claim shard, loading or creating it."""
+        if claim_id not in self._lexical_indices:
+            path = lexical_index_path(self.persist_dir, claim_id)
+            self._lexical_indices[claim_id] = (
+                BM25Index.load(path) if os.path.exists(path) else BM25Index()
+            )
+        return self._lexical_indices[claim_id]
+
+    def add_documents(
+        self,
+        documents: List[Document],
+        nodes_by_doc: Optional[Dict[str, List[BaseNode]]] = None,
+    ) -> None:
+        """
+        Parses, diffs, embeds and upserts one batch of documents (pages).
+
+        Args:
+            documents: The pages of the batch.
+            nodes_by_doc: Optional nodes already split per page ID (e.g. by a
+                worker process, see `ingestion.iter_split_batches`). Pages
+                without an entry are split here.
+        """
+        documents_by_key = assign_stable_document_ids(documents, self._seen_keys)
+
+        # 3. Diff documents and nodes against the previous manifest
+        nodes_to_store: List[BaseNode] = []
+        leaves_to_embed: Dict[str, List[BaseNode]] = defaultdict(list)
+        stale_node_ids: List[str] = []
+        stale_vector_ids: Dict[str, List[str]] = defaultdict(list)
+
+        for source_key, doc in documents_by_key.items():
+            claim_id = document_claim_id(doc)
+            doc_hash = hash_document(doc)
+            old_entry = self._previous_docs.get(source_key)
+            if old_entry is not None and old_entry["hash"] == doc_hash:
+                # Facts are cheap to extract; redo them so extractor fixes reach unchanged pages
+                old_entry = {**old_entry, "facts": extract_facts(doc)}
+                self.manifest["documents"][source_key] = old_entry
+                self.changes["unchanged_documents"] += 1
+                continue
 
-        # Index the LEAF nodes, but keep reference to parents via docstore
-        index = VectorStoreIndex(leaf_nodes, storage_context=storage_context)
+            if nodes_by_doc and doc.doc_id in nodes_by_doc:
+                nodes = nodes_by_doc[doc.doc_id]
+            else:
+                nodes = self.node_parser.get_nodes_from_documents([doc])
+            leaf_ids = {node.node_id for node in get_leaf_nodes(nodes)}
+            node_hashes = {node.node_id: hash_node(node) for node in nodes}
+            old_hashes: Dict[str, str] = old_entry["nodes"] if old_entry else {}
+            old_leaves = set(old_entry["leaves"]) if old_entry else set()
 
-        # Persist storage context (docstore mostly, vectors are already in chroma)
-        if not os.path.exists(persist_dir):
-            os.makedirs(persist_dir, exist_ok=True)
+            old_claim_id = (old_entry or {}).get("claim_id", DEFAULT_SHARD)
+            if old_entry is not None and old_claim_id != claim_id:
+                # Page moved to another claim: drop its old shard entries entirely
+                stale_vector_ids[old_claim_id].extend(old_leaves)
+                old_leaves = set()
 
+            nodes_to_store.extend(nodes)
+            for node in nodes:
+                if node.node_id not in leaf_ids:
+                    continue
+                if (
+                    node.node_id in old_leaves
+                    and old_hashes.get(node.node_id) == node_hashes[node.node_id]
+                ):
+                    continue
+                leaves_to_embed[claim_id].append(node)
+                if node.node_id in old_leaves:
+                    stale_vector_ids[claim_id].append(node.node_id)
+
+            stale_node_ids.extend(i for i in old_hashes if i not in node_hashes)
+            stale_vector_ids[claim_id].extend(i for i in old_leaves if i not in leaf_ids)
+
+            self.manifest["documents"][source_key] = {
+                "doc_id": doc.doc_id,
+                "claim_id": claim_id,
+                "hash": doc_hash,
+                "nodes": node_hashes,
+                "leaves": sorted(leaf_ids),
+                "facts": extract_facts(doc),
+            }
+            key = "changed_documents" if old_entry else "added_documents"
+            self.changes[key].append(source_key)
+
+        self._apply(nodes_to_store, leaves_to_embed, stale_node_ids, stale_vector_ids)
+
+    def _apply(
+        self,
+        nodes_to_store: List[BaseNode],
+        leaves_to_embed: Dict[str, List[BaseNode]],
+        stale_node_ids: List[str],
+        stale_vector_ids: Dict[str, List[str]],
+    ) -> None:
+        """4. Apply a diff: drop stale vectors/nodes, then upsert new ones."""
+        for claim_id, vector_ids in stale_vector_ids.items():
+            if vector_ids:
+                self._vector_store(claim_id).delete_nodes(node_ids=vector_ids)
+                self._lexical_index(claim_id).delete(vector_ids)
+        for node_id in stale_node_ids:
+            self.docstore.delete_document(node_id, raise_error=False)
+        if nodes_to_store:
+            self.docstore.add_documents(nodes_to_store, allow_update=True)
+
+        # Index the LEAF nodes, but keep reference to parents via docstore.
+        # Batches are embedded concurrently and written to the claim shard in order.
+        for claim_id, leaves in leaves_to_embed.items():
+            self._lexical_index(claim_id).add(leaves)
+            stats = EmbeddingPipeline().run(
+                leaves, write_fn=self._vector_store(claim_id).add
+            )
+            self.embedding_stats.merge(stats)
+            self.changes["upserted_leaves"] += len(leaves)
+
+        self.changes["deleted_nodes"] += len(stale_node_ids)
+
+    def finish(self, publish: bool = True) -> VectorStoreIndex:
+        """
+        Removes pages that were not seen, persists the index and the manifest,
+        then publishes the snapshot and garbage-collects old ones.
+
+        Args:
+            publish: If False, the snapshot is left staged until `publish` is
+                called (e.g. to publish it together with the summary index).
+
+        Returns:
+            VectorStoreIndex over the default shard; its storage context holds
+            the docstore with the nodes of every shard.
+        """
+        stale_node_ids: List[str] = []
+        stale_vector_ids: Dict[str, List[str]] = defaultdict(list)
+        for source_key, old_entry in self._previous_docs.items():
+            if source_key in self._seen_keys:
+                continue
+            self.changes["removed_documents"].append(source_key)
+            stale_node_ids.extend(old_entry["nodes"])
+            claim_id = old_entry.get("claim_id", DEFAULT_SHARD)
+            stale_vector_ids[claim_id].extend(old_entry["leaves"])
+        self._apply([], {}, stale_node_ids, stale_vector_ids)
+
+        if self.embedding_stats.nodes:
+            print(f"  ⚡ Embedded {self.embedding_stats}")
+            self.changes["embedding"] = self.embedding_stats.to_dict()
+        self.manifest["changes"] = self.changes
+        self.manifest["snapshot"] = os.path.basename(self.persist_dir)
+        self.manifest["counts"] = {
+            "documents": len(self.manifest["documents"]),
+            "nodes": sum(len(e["nodes"]) for e in self.manifest["documents"].values()),
+            "leaves": sum(len(e["leaves"]) for e in self.manifest["documents"].values()),
+            "facts": sum(len(e["facts"]) for e in self.manifest["documents"].values()),
+        }
+
+        # Persist storage context (index store; docstore and Chroma vectors are already on disk)
         try:
-            index.storage_context.persist(persist_dir=persist_dir)
+            for vector_store in self._vector_stores.values():
+                if isinstance(vector_store, NumpyVectorStore):
+                    vector_store.persist()
+            for claim_id, lexical_index in self._lexical_indices.items():
+                lexical_index.save(lexical_index_path(self.persist_dir, claim_id))
+            save_facts(self.persist_dir, self.manifest["documents"])
+            self.index.storage_context.persist(persist_dir=self.persist_dir)
+            # Precomputed parent/child arrays for auto-merge decisions
+            HierarchyTable.from_pairs(self.docstore.get_hierarchy()).save(
+                self.persist_dir
+            )
+            stamp_manifest(self.manifest)
+            save_manifest(self.persist_dir, self.manifest)
         except Exception as e:
             raise HierarchicalIndexError(f"Index persistence failed: {e}") from e
 
-        return index
+        if publish:
+            self.publish()
+        return self.index
+
+    def publish(self) -> None:
+        """Makes the finished snapshot live and garbage-collects old ones."""
+        try:
+            publish_snapshot(self.root_dir, self.persist_dir)
+        except Exception as e:
+            raise HierarchicalIndexError(f"Snapshot publication failed: {e}") from e
+        self._published = True
+        for version in gc_snapshots(self.root_dir):
+            print(f"  🧹 Removed old snapshot {version}")
+
+    def abort(self) -> None:
+        """Discards the unpublished snapshot of a failed build."""
+        if not self._published:
+            discard_snapshot(self.persist_dir)
+
+
+def create_hierarchical_index(
+    documents: List[Document],
+    persist_dir: str = HIERARCHICAL_STORAGE_DIR,
+    incremental: bool = False,
+) -> VectorStoreIndex:
+    """
+    Creates a hierarchical index using the HierarchicalNodeParser and the vector backend.
+
+    Args:
+        documents: List of documents (pages) to index.
+        persist_dir: Index root; the build is published as a new snapshot.
+        incremental: If True and a compatible build is live in persist_dir, only
+            re-embed leaves whose content hash changed and delete nodes whose
+            source page disappeared. Otherwise the index is rebuilt from scratch.
+
+    Returns:
+        VectorStoreIndex over the leaf nodes. A manifest describing the build
+        (including what changed) is persisted next to the index.
+    """
+    return build_hierarchical_index_streaming(
+        [documents], persist_dir=persist_dir, incremental=incremental
+    )
+
+
+def build_hierarchical_index_streaming(
+    document_batches: Iterable[List[Document]],
+    persist_dir: str = HIERARCHICAL_STORAGE_DIR,
+    incremental: bool = False,
+) -> VectorStoreIndex:
+    """
+    Creates the hierarchical index from a stream of document batches.
+
+    Only one batch of parsed pages, nodes and embeddings is held at a time.
+
+    Args:
+        document_batches: Iterable of document (page) batches.
+        persist_dir: Index root; the build is published as a new snapshot.
+        incremental: See `create_hierarchical_index`.
+
+    Returns:
+        VectorStoreIndex over the leaf nodes.
+    """
+    try:
+        builder = HierarchicalIndexBuilder(persist_dir, incremental=incremental)
+        try:
+            for documents in document_batches:
+                builder.add_documents(documents)
+            return builder.finish()
+        except BaseException:
+            builder.abort()
+            raise
     except ValueError:
         raise
     except Exception as e:
         raise HierarchicalIndexError(f"Index creation failed: {e}") from e
 
 
+def _load_vector_stores(persist_dir: str) -> Dict[str, BasePydanticVectorStore]:
+    """
+    Opens the non-empty vector shards of a snapshot, keyed by claim ID.
+
+    NumPy shards are used if the snapshot has them, Chroma otherwise.
+
+    Raises:
+        HierarchicalIndexError: If the vector store cannot be opened.
+    """
+    vector_stores: Dict[str, BasePydanticVectorStore] = {}
+    numpy_claims = list_numpy_shards(persist_dir)
+    if numpy_claims:
+        try:
+            opened = {
+                claim_id: NumpyVectorStore(numpy_shard_dir(persist_dir, claim_id))
+                for claim_id in numpy_claims
+            }
+        except Exception as e:
+            raise HierarchicalIndexError(f"NumPy vector loading failed: {e}") from e
+        vector_stores = {c: vs for c, vs in opened.items() if vs.count()}
+        # An empty index still needs one (empty) shard to query
+        return vector_stores or dict(list(opened.items())[:1])
+
+    # Initialize Chroma again for loading, one vector store per claim shard
+    chroma_path = os.path.join(persist_dir, "chroma")
+    try:
+        import chromadb
+        from llama_index.vector_stores.chroma import ChromaVectorStore
+
+        chroma_client = chromadb.PersistentClient(path=chroma_path)
+        for name in list_shard_collections(chroma_client):
+            chroma_collection = chroma_client.get_collection(name)
+            if chroma_collection.count() == 0:
+                continue
+            vector_stores[shard_claim_id(name)] = ChromaVectorStore(
+                chroma_collection=chroma_collection
+            )
+        if not vector_stores:
+            chroma_collection = chroma_client.get_or_create_collection(
+                shard_collection_name(DEFAULT_SHARD)
+            )
+            vector_stores[DEFAULT_SHARD] = ChromaVectorStore(
+                chroma_collection=chroma_collection
+            )
+    except Exception as e:
+        raise HierarchicalIndexError(f"ChromaDB connection failed: {e}") from e
+    return vector_stores
+
+
 def load_hierarchical_retriever(
     persist_dir: str = HIERARCHICAL_STORAGE_DIR,
+    router: Optional[ClaimRouter] = None,
 ) -> AutoMergingRetriever:
-    """Loads the hierarchical index and returns an AutoMergingRetriever."""
+    """
+    Loads the hierarchical index and returns an AutoMergingRetriever.
+
+    Args:
+        persist_dir: Index root (its live snapshot is loaded).
+        router: ClaimRouter deciding which claim shard a query searches. Share
+            it with the summary agent so both follow the same session claim.
+    """
     if not os.path.exists(persist_dir):
         error_msg = f"Index storage directory not found: {persist_dir}"
         raise FileNotFoundError(error_msg)
 
     try:
-        # Initialize Chroma again for loading
-        chroma_path = os.path.join(persist_dir, "chroma")
-        try:
-            chroma_client = chromadb.PersistentClient(path=chroma_path)
-            chroma_collection = chroma_client.get_or_create_collection(
-                "hierarchical_claims"
-            )
-            vector_store = ChromaVectorStore(chroma_collection=chroma_collection)
-        except Exception as e:
-            raise HierarchicalIndexError(f"ChromaDB connection failed: {e}") from e
+        # Read from the live snapshot; later builds publish new ones beside it
+        persist_dir = resolve_snapshot_dir(persist_dir)
+
+        vector_stores = _load_vector_stores(persist_dir)
 
-        # Load from storage (re-link vector store)
-        storage_context = StorageContext.from_defaults(
-            persist_dir=persist_dir, vector_store=vector_store
+        from insurance_system.src.utils.config import (
+            HYBRID_RETRIEVAL,
+            HYBRID_TOP_K,
+            RERANK_CACHE_ENABLED,
+            RETRIEVAL_CACHE_ENABLED,
+            SIMILARITY_TOP_K,
+            VERBOSE,
         )
 
+        # Cached reranker scores belong to the snapshot they were computed on
+        if RERANK_CACHE_ENABLED:
+            get_score_cache().set_snapshot(os.path.abspath(persist_dir))
+
+        # Open the docstore (shared by all shards) for the parent/child mapping.
+        # Nodes are read from SQLite on demand, so nothing is deserialized upfront.
         try:
-            index = load_index_from_storage(storage_context)
+            storage_context = StorageContext.from_defaults(
+                docstore=load_docstore(persist_dir)
+            )
         except Exception as e:
             raise HierarchicalIndexError(f"Index loading failed: {e}") from e
 
-        from insurance_system.src.utils.config import SIMILARITY_TOP_K, VERBOSE
+        # Exact identifiers and amounts come from the BM25 index, so hybrid
+        # retrieval needs far fewer vector candidates
+        lexical_paths = list_lexical_indices(persist_dir) if HYBRID_RETRIEVAL else {}
+        top_k = HYBRID_TOP_K if lexical_paths else SIMILARITY_TOP_K
+        shard_retrievers: Dict[str, BaseRetriever] = {}
+        for claim_id, vector_store in vector_stores.items():
+            shard_retriever = VectorStoreIndex.from_vector_store(vector_store).as_retriever(
+                similarity_top_k=top_k
+            )
+            if RETRIEVAL_CACHE_ENABLED:
+                shard_retriever = CachedVectorRetriever(
+                    shard_retriever,
+                    storage_context.docstore,
+                    index_version=f"{os.path.abspath(persist_dir)}#{claim_id}",
+                    similarity_top_k=top_k,
+                )
+            if claim_id in lexical_paths:
+                shard_retriever = HybridRetriever(
+                    shard_retriever,
+                    lexical_paths[claim_id],
+                    storage_context.docstore,
+                    similarity_top_k=top_k,
+                )
+            shard_retrievers[claim_id] = shard_retriever
 
         # The AutoMergingRetriever will retrieve leaf nodes and merge them into parent nodes
-        # if enough siblings are retrieved.
-        retriever = AutoMergingRetriever(
-            index.as_retriever(similarity_top_k=SIMILARITY_TOP_K),
-            storage_context=storage_context,
-            verbose=VERBOSE,
-        )
+        # if enough siblings are retrieved. Sibling counts come from the precomputed
+        # hierarchy arrays when the index has them.
+        vector_retriever = ShardedRetriever(shard_retrievers, router, top_k)
+        hierarchy = HierarchyTable.load(persist_dir)
+        if hierarchy is not None:
+            retriever = ArrayAutoMergingRetriever(
+                vector_retriever,
+                storage_context=storage_context,
+                verbose=VERBOSE,
+                hierarchy=hierarchy,
+            )
+        else:
+            retriever = AsyncAutoMergingRetriever(
+                vector_retriever,
+                storage_context=storage_context,
+                verbose=VERBOSE,
+            )
 
         return retriever
     except FileNotFoundError:
@@ -135,26 +653,53 @@ def load_hierarchical_retriever(
         raise HierarchicalIndexError(f"Retriever loading failed: {e}") from e
 
 
+def get_node_postprocessors() -> List[Any]:
+    """
+    Creates the postprocessors of the needle query engine (the reranker, if enabled).
+
+    Rerankers score through the process-wide reranking service, so the model
+    is loaded once however many engines are created.
+    """
+    from insurance_system.src.utils.config import (
+        ADAPTIVE_TOP_K,
+        RERANKER_TOP_N,
+        USE_RERANKER,
+    )
+
+    # Conditionally initialize Reranker
+    node_postprocessors = []
+    if USE_RERANKER:
+        # Load the shared model now rather than on the first query
+        get_reranker_service()
+    if USE_RERANKER and ADAPTIVE_TOP_K:
+        # AdaptiveTopK raises the reranker's top_n to each window it scores
+        node_postprocessors.append(
+            AdaptiveTopK(reranker=SharedRerank(), top_n=RERANKER_TOP_N)
+        )
+    elif USE_RERANKER:
+        node_postprocessors.append(SharedRerank(top_n=RERANKER_TOP_N))
+    return node_postprocessors
+
+
 def get_hierarchical_query_engine(
-    retriever: AutoMergingRetriever, llm: Optional[Any] = None
+    retriever: AutoMergingRetriever,
+    llm: Optional[Any] = None,
+    node_postprocessors: Optional[List[Any]] = None,
 ) -> RetrieverQueryEngine:
+    """
+    Returns a query engine over the hierarchical retriever.
+
+    Args:
+        retriever: Retriever returned by `load_hierarchical_retriever`.
+        llm: Optional LLM instance for response synthesis.
+        node_postprocessors: Postprocessors to reuse (e.g. the already loaded
+            reranker when hot-reloading). Created from the config if None.
+    """
     try:
-        from llama_index.core.postprocessor import SentenceTransformerRerank
         from llama_index.core.query_engine import RetrieverQueryEngine
 
-        from insurance_system.src.utils.config import (
-            RERANKER_MODEL,
-            RERANKER_TOP_N,
-            USE_RERANKER,
-        )
-
-        # Conditionally initialize Reranker
-        node_postprocessors = []
-        if USE_RERANKER:
-            reranker = SentenceTransformerRerank(
-                model=RERANKER_MODEL, top_n=RERANKER_TOP_N
-            )
-            node_postprocessors.append(reranker)
+        if node_postprocessors is None:
+            node_postprocessors = get_node_postprocessors()
 
         return RetrieverQueryEngine.from_args(
             retriever, llm=llm, node_postprocessors=node_postprocessors
@@ -0,0 +1,205 @@
+"""
+Precomputed, array-backed node hierarchy for auto-merging.
+
+The tree produced by HierarchicalNodeParser is known at build time, so it is
+stored next to the index as a few integer arrays (parent index, child count,
+level) keyed by sorted node IDs. Auto-merge decisions then become a vectorized
+count over the retrieved leaves; the docstore is only read for the parents
+that are actually merged in.
+"""
+
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from llama_index.core.indices.utils import truncate_text
+from llama_index.core.retrievers import AutoMergingRetriever
+from llama_index.core.schema import MetadataMode, NodeWithScore, QueryBundle
+
+HIERARCHY_FILENAME = "hierarchy.npz"
+
+logger = logging.getLogger(__name__)
+
+
+class HierarchyTable:
+    """
+    Node hierarchy as parallel arrays, indexed by position in `node_ids`.
+
+    Attributes:
+        node_ids: Sorted node IDs.
+        parent: Position of each node's parent, -1 for roots.
+        child_count: Number of children of each node.
+        level: Depth of each node, 0 for roots (the largest chunk size).
+    """
+
+    def __init__(
+        self,
+        node_ids: np.ndarray,
+        parent: np.ndarray,
+        child_count: np.ndarray,
+        level: np.ndarray,
+    ) -> None:
+        self.node_ids = node_ids
+        self.parent = parent
+        self.child_count = child_count
+        self.level = level
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[str, Optional[str]]]) -> "HierarchyTable":
+        """Builds the table from (node_id, parent_id) pairs."""
+        parent_of: Dict[str, Optional[str]] = dict(pairs)
+        node_ids = np.array(sorted(parent_of), dtype=str)
+        parent = np.full(len(node_ids), -1, dtype=np.int32)
+        if len(node_ids):
+            parent_ids = [parent_of[node_id] or "" for node_id in node_ids]
+            positions = np.searchsorted(node_ids, parent_ids)
+            positions = np.minimum(positions, len(node_ids) - 1)
+            found = node_ids[positions] == np.array(parent_ids, dtype=str)
+            parent[found] = positions[found]
+
+        child_count = np.bincount(parent[parent >= 0], minlength=len(node_ids))
+        child_count = child_count.astype(np.int32)
+
+        level = np.zeros(len(node_ids), dtype=np.int8)
+        ancestor = parent.copy()
+        while (ancestor >= 0).any():
+            has_ancestor = ancestor >= 0
+            level[has_ancestor] += 1
+            ancestor[has_ancestor] = parent[ancestor[has_ancestor]]
+        return cls(node_ids, parent, child_count, level)
+
+    @classmethod
+    def load(cls, persist_dir: str) -> Optional["HierarchyTable"]:
+        """Loads the table of a persist directory, if present."""
+        path = os.path.join(persist_dir, HIERARCHY_FILENAME)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            return cls(
+                data["node_ids"], data["parent"], data["child_count"], data["level"]
+            )
+
+    def save(self, persist_dir: str) -> None:
+        """Writes the table atomically into a persist directory."""
+        os.makedirs(persist_dir, exist_ok=True)
+        path = os.path.join(persist_dir, HIERARCHY_FILENAME)
+        tmp_path = path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            node_ids=self.node_ids,
+            parent=self.parent,
+            child_count=self.child_count,
+            level=self.level,
+        )
+        os.replace(tmp_path, path)
+
+    def positions(self, node_ids: List[str]) -> np.ndarray:
+        """Returns the positions of node IDs in the table, -1 if unknown."""
+        if not len(self.node_ids) or not node_ids:
+            return np.full(len(node_ids), -1, dtype=np.int64)
+        query = np.array(node_ids, dtype=self.node_ids.dtype)
+        positions = np.searchsorted(self.node_ids, query)
+        positions = np.minimum(positions, len(self.node_ids) - 1)
+        return np.where(self.node_ids[positions] == query, positions, -1)
+
+    def parents_to_merge(
+        self, node_ids: List[str], ratio_thresh: float
+    ) -> Dict[int, np.ndarray]:
+        """
+        Finds the parents whose share of retrieved children exceeds a threshold.
+
+        Args:
+            node_ids: IDs of the retrieved nodes.
+            ratio_thresh: Minimum share of a parent's children (exclusive).
+
+        Returns:
+            Dictionary mapping parent positions to the indices (into
+            `node_ids`) of their retrieved children.
+        """
+        positions = self.positions(node_ids)
+        parents = np.where(positions >= 0, self.parent[np.maximum(positions, 0)], -1)
+        known = np.flatnonzero(parents >= 0)
+        if not len(known):
+            return {}
+        unique_parents, inverse, counts = np.unique(
+            parents[known], return_inverse=True, return_counts=True
+        )
+        ratios = counts / np.maximum(self.child_count[unique_parents], 1)
+        merged = np.flatnonzero(ratios > ratio_thresh)
+        return {int(unique_parents[m]): known[inverse == m] for m in merged}
+
+
+class AsyncAutoMergingRetriever(AutoMergingRetriever):
+    """
+    AutoMergingRetriever whose async path awaits the vector retriever.
+
+    The base class answers `aretrieve` with its synchronous `_retrieve`, which
+    would run the query embedding and vector search on the event loop.
+    """
+
+    async def _aretrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        initial_nodes = await self._vector_retriever.aretrieve(query_bundle)
+
+        cur_nodes, is_changed = self._try_merging(initial_nodes)
+        while is_changed:
+            cur_nodes, is_changed = self._try_merging(cur_nodes)
+
+        # sort by similarity
+        cur_nodes.sort(key=lambda x: x.get_score(), reverse=True)
+        return cur_nodes
+
+
+class ArrayAutoMergingRetriever(AsyncAutoMergingRetriever):
+    """
+    AutoMergingRetriever deciding merges from a precomputed HierarchyTable.
+
+    Produces the same merges as the base class, but counts siblings with
+    array operations and only fetches parents that are merged in.
+    """
+
+    def __init__(self, *args, hierarchy: HierarchyTable, **kwargs) -> None:
+        self._hierarchy = hierarchy
+        super().__init__(*args, **kwargs)
+
+    def _get_parents_and_merge(
+        self, nodes: List[NodeWithScore]
+    ) -> Tuple[List[NodeWithScore], bool]:
+        """Get parents and merge nodes."""
+        merges = self._hierarchy.parents_to_merge(
+            [n.node.node_id for n in nodes], self._simple_ratio_thresh
+        )
+        if not merges:
+            return nodes, False
+
+        node_ids_to_delete = set()
+        nodes_to_add: List[NodeWithScore] = []
+        for parent_position, child_indices in merges.items():
+            parent_node_id = str(self._hierarchy.node_ids[parent_position])
+            parent_node = self._storage_context.docstore.get_document(parent_node_id)
+            parent_cur_children = [nodes[i] for i in child_indices]
+            node_ids_to_delete.update(n.node.node_id for n in parent_cur_children)
+
+            parent_node_text = truncate_text(
+                parent_node.get_content(metadata_mode=MetadataMode.NONE), 100
+            )
+            info_str = (
+                f"> Merging {len(parent_cur_children)} nodes into parent node.\n"
+                f"> Parent node id: {parent_node_id}.\n"
+                f"> Parent node text: {parent_node_text}\n"
+            )
+            logger.info(info_str)
+            if self._verbose:
+                print(info_str)
+
+            avg_score = sum(n.get_score() or 0.0 for n in parent_cur_children) / len(
+                parent_cur_children
+            )
+            nodes_to_add.append(NodeWithScore(node=parent_node, score=avg_score))
+
+        new_nodes = [n for n in nodes if n.node.node_id not in node_ids_to_delete]
+        new_nodes.extend(nodes_to_add)
+        return new_nodes, True
@@ -0,0 +1,242 @@
+"""
+Streaming document ingestion for index builds.
+
+Files in the data directory are loaded one at a time and yielded as bounded
+batches of pages, so parsing, chunking, embedding and upserting never need
+the whole corpus in memory. `prefetch` runs the loading stage in a background
+thread, overlapping it with the embedding of the previous batch.
+`iter_split_batches` can additionally fan parsing and node splitting out over
+a process pool, one file per task.
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import (
+    Any,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from llama_index.core import Document, SimpleDirectoryReader
+from llama_index.core.schema import BaseNode
+
+from insurance_system.src.indices.parse_cache import ParseCache, parser_fingerprint
+from insurance_system.src.indices.sharding import tag_file_claim_id
+from insurance_system.src.utils.config import (
+    INGEST_BATCH_PAGES,
+    INGEST_PREFETCH_BATCHES,
+    INGEST_WORKERS,
+)
+
+T = TypeVar("T")
+
+# Sentinel marking the end of a prefetched stream
+_DONE = object()
+
+
+def list_data_files(data_dir: str) -> List[str]:
+    """Returns the (non-hidden) files of the data directory in sorted order."""
+    return sorted(
+        os.path.join(data_dir, name)
+        for name in os.listdir(data_dir)
+        if not name.startswith(".") and os.path.isfile(os.path.join(data_dir, name))
+    )
+
+
+def load_file(
+    file_path: str,
+    file_extractor: Optional[Dict[str, Any]] = None,
+    inject_page_labels: bool = False,
+    parse_cache: Optional[ParseCache] = None,
+) -> List[Document]:
+    """
+    Loads the pages of a single file.
+
+    Args:
+        file_path: Path of the file to load.
+        file_extractor: Optional per-extension readers (e.g. LlamaParse for PDFs).
+        inject_page_labels: If True, number the pages 1..n in `page_label`
+            (LlamaParse metadata does not carry consistent page numbers).
+        parse_cache: Optional cache of parsed pages; unchanged files parsed
+            with the same settings are not parsed again.
+
+    Every page is tagged with the claim ID of the file (see `sharding`).
+    """
+    documents = None
+    if parse_cache is not None:
+        fingerprint = parser_fingerprint(file_extractor)
+        documents = parse_cache.get(file_path, fingerprint)
+    if documents is None:
+        documents = SimpleDirectoryReader(
+            input_files=[file_path], file_extractor=file_extractor
+        ).load_data()
+        if parse_cache is not None:
+            parse_cache.put(file_path, fingerprint, documents)
+    if inject_page_labels:
+        for page_number, doc in enumerate(documents, start=1):
+            doc.metadata["page_label"] = str(page_number)
+    tag_file_claim_id(documents)
+    return documents
+
+
+def iter_document_batches(
+    data_dir: str,
+    file_extractor: Optional[Dict[str, Any]] = None,
+    inject_page_labels: bool = False,
+    batch_pages: int = INGEST_BATCH_PAGES,
+    parse_cache: Optional[ParseCache] = None,
+) -> Iterator[List[Document]]:
+    """
+    Yields the pages of the data directory in batches of at most `batch_pages`.
+
+    Files are loaded lazily, one at a time; a batch never spans two files so
+    that a file's pages stay together.
+    """
+    for file_path in list_data_files(data_dir):
+        documents = load_file(
+            file_path, file_extractor, inject_page_labels, parse_cache
+        )
+        for i in range(0, len(documents), batch_pages):
+            yield documents[i : i + batch_pages]
+
+
+def load_and_split_file(
+    file_path: str,
+    file_extractor: Optional[Dict[str, Any]] = None,
+    inject_page_labels: bool = False,
+    parse_cache: Optional[ParseCache] = None,
+) -> Tuple[List[Document], Dict[str, List[BaseNode]], bool]:
+    """
+    Loads a file and splits its pages with the hierarchical node parser.
+
+    Runs in a worker process. Pages get the same stable IDs and claim tags the
+    index builder would assign, so the returned nodes are identical to those
+    it would produce itself.
+
+    Returns:
+        The pages, per page ID its hierarchical nodes, and whether the pages
+        came from the parse cache.
+    """
+    from insurance_system.src.indices.hierarchical import _get_node_parser
+    from insurance_system.src.indices.manifest import assign_stable_document_ids
+    from insurance_system.src.indices.sharding import document_claim_id
+
+    hits = parse_cache.hits if parse_cache is not None else 0
+    documents = load_file(file_path, file_extractor, inject_page_labels, parse_cache)
+    cache_hit = parse_cache is not None and parse_cache.hits > hits
+    assign_stable_document_ids(documents)
+    node_parser = _get_node_parser()
+    nodes_by_doc: Dict[str, List[BaseNode]] = {}
+    for doc in documents:
+        document_claim_id(doc)
+        nodes_by_doc[doc.doc_id] = node_parser.get_nodes_from_documents([doc])
+    return documents, nodes_by_doc, cache_hit
+
+
+def iter_split_batches(
+    data_dir: str,
+    file_extractor: Optional[Dict[str, Any]] = None,
+    inject_page_labels: bool = False,
+    batch_pages: int = INGEST_BATCH_PAGES,
+    workers: int = INGEST_WORKERS,
+    parse_cache: Optional[ParseCache] = None,
+) -> Iterator[Tuple[List[Document], Optional[Dict[str, List[BaseNode]]]]]:
+    """
+    Yields batches of pages together with their pre-split nodes.
+
+    With `workers` > 1, files are parsed and split in a process pool while
+    results are consumed strictly in file order, so batches, page IDs and node
+    IDs do not depend on the worker count. With a single worker the nodes are
+    None and the index builder splits the pages itself.
+    """
+    if workers <= 1:
+        for documents in iter_document_batches(
+            data_dir, file_extractor, inject_page_labels, batch_pages, parse_cache
+        ):
+            yield documents, None
+        return
+
+    # "spawn" keeps workers independent of threads running in this process
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        pending: Deque[Future] = deque()
+
+        def drain_one() -> Iterator[Tuple[List[Document], Dict[str, List[BaseNode]]]]:
+            documents, nodes_by_doc, cache_hit = pending.popleft().result()
+            # Workers hold copies of the cache; keep the counters in this process
+            if parse_cache is not None:
+                if cache_hit:
+                    parse_cache.hits += 1
+                else:
+                    parse_cache.misses += 1
+            for i in range(0, len(documents), batch_pages):
+                batch = documents[i : i + batch_pages]
+                yield batch, {doc.doc_id: nodes_by_doc[doc.doc_id] for doc in batch}
+
+        try:
+            for file_path in list_data_files(data_dir):
+                pending.append(
+                    executor.submit(
+                        load_and_split_file,
+                        file_path,
+                        file_extractor,
+                        inject_page_labels,
+                        parse_cache,
+                    )
+                )
+                # Keep every worker busy, but bound the number of parsed files held
+                if len(pending) >= workers * 2:
+                    yield from drain_one()
+            while pending:
+                yield from drain_one()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def prefetch(iterable: Iterable[T], depth: int = INGEST_PREFETCH_BATCHES) -> Iterator[T]:
+    """
+    Consumes an iterable in a background thread, at most `depth` items ahead.
+
+    Exceptions raised by the producer are re-raised in the consumer.
+    """
+    buffer: "queue.Queue[Any]" = queue.Queue(maxsize=max(depth, 1))
+    stop = threading.Event()
+
+    def produce() -> None:
+        try:
+            for item in iterable:
+                while not stop.is_set():
+                    try:
+                        buffer.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    return
+            buffer.put(_DONE)
+        except BaseException as e:
+            buffer.put(e)
+
+    producer = threading.Thread(target=produce, name="ingestion-prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
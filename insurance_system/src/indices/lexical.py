@@ -0,0 +1,289 @@
+"""
+BM25 inverted index over leaf nodes and hybrid (lexical + vector) retrieval.
+
+Needle queries often hinge on exact tokens (claim and policy numbers, dollar
+amounts, sensor log timestamps) that dense embeddings blur. Each claim shard
+gets a BM25 index over its leaves, built with the vector index. At query time
+lexical and vector rankings are fused with reciprocal rank fusion (RRF), so a
+small top_k still surfaces exact matches.
+
+Identifiers are kept whole: "HO-2024-8892", "$19,550.00" and "11:15:00" are
+indexed as one token each, plus their alphanumeric parts.
+"""
+
+import asyncio
+import json
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from llama_index.core.base.base_retriever import BaseRetriever
+from llama_index.core.schema import BaseNode, MetadataMode, NodeWithScore, QueryBundle
+from llama_index.core.storage.docstore.types import BaseDocumentStore
+
+from insurance_system.src.indices.sharding import shard_claim_id, shard_collection_name
+from insurance_system.src.utils.config import BM25_B, BM25_K1, RRF_K
+
+LEXICAL_DIRNAME = "lexical"
+
+# Alphanumeric runs joined by identifier / number punctuation
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-.,:/][a-z0-9]+)*")
+_PART_RE = re.compile(r"[a-z0-9]+")
+
+
+class LexicalIndexError(Exception):
+    """Base exception for lexical index errors."""
+
+    pass
+
+
+def tokenize(text: str, parts: bool = True) -> List[str]:
+    """
+    Lower-cases and splits text, keeping identifiers and amounts whole.
+
+    Args:
+        text: Text to split.
+        parts: If True, also emit the alphanumeric parts of each identifier.
+    """
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        tokens.append(token)
+        if parts and not token.isalnum():
+            tokens.extend(_PART_RE.findall(token))
+    return tokens
+
+
+class BM25Index:
+    """
+    In-memory BM25 index over the leaves of one claim shard.
+
+    Postings are kept as lists while building; adds and deletes are applied
+    lazily, and the arrays used for scoring are rebuilt on the next search.
+    """
+
+    def __init__(
+        self,
+        node_ids: Optional[List[str]] = None,
+        doc_lengths: Optional[List[int]] = None,
+        postings: Optional[Dict[str, Tuple[List[int], List[int]]]] = None,
+        k1: float = BM25_K1,
+        b: float = BM25_B,
+    ) -> None:
+        self.node_ids: List[str] = node_ids or []
+        self.doc_lengths: List[int] = doc_lengths or []
+        self.postings: Dict[str, Tuple[List[int], List[int]]] = postings or {}
+        self.k1 = k1
+        self.b = b
+        self._positions = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        self._deleted: set = set()
+        self._arrays: Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]] = None
+        self._norm: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.node_ids) - len(self._deleted)
+
+    def add(self, nodes: List[BaseNode]) -> None:
+        """Indexes nodes (replacing nodes with the same ID)."""
+        self.delete([node.node_id for node in nodes if node.node_id in self._positions])
+        self._compact()
+        for node in nodes:
+            doc = len(self.node_ids)
+            counts = Counter(tokenize(node.get_content(metadata_mode=MetadataMode.NONE)))
+            for term, tf in counts.items():
+                docs, tfs = self.postings.setdefault(term, ([], []))
+                docs.append(doc)
+                tfs.append(tf)
+            self.node_ids.append(node.node_id)
+            self.doc_lengths.append(sum(counts.values()))
+            self._positions[node.node_id] = doc
+        self._arrays = None
+
+    def delete(self, node_ids: List[str]) -> None:
+        """Removes nodes by ID (unknown IDs are ignored)."""
+        for node_id in node_ids:
+            if node_id in self._positions:
+                self._deleted.add(self._positions[node_id])
+        self._arrays = None
+
+    def _compact(self) -> None:
+        """Drops deleted documents and renumbers the rest."""
+        if not self._deleted:
+            return
+        keep = np.ones(len(self.node_ids), dtype=bool)
+        keep[list(self._deleted)] = False
+        new_position = np.cumsum(keep) - 1
+        postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        for term, (docs, tfs) in self.postings.items():
+            kept = [(int(new_position[d]), tf) for d, tf in zip(docs, tfs) if keep[d]]
+            if kept:
+                postings[term] = ([d for d, _ in kept], [tf for _, tf in kept])
+        self.postings = postings
+        self.node_ids = [n for n, k in zip(self.node_ids, keep) if k]
+        self.doc_lengths = [n for n, k in zip(self.doc_lengths, keep) if k]
+        self._positions = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        self._deleted = set()
+
+    def search(self, query: str, top_k: int) -> List[Tuple[str, float]]:
+        """Returns up to top_k (node ID, BM25 score) pairs, best first."""
+        self._compact()
+        if not self.node_ids:
+            return []
+        if self._arrays is None:
+            doc_lengths = np.array(self.doc_lengths, dtype=np.float32)
+            self._norm = self.k1 * (
+                1 - self.b + self.b * doc_lengths / max(doc_lengths.mean(), 1.0)
+            )
+            self._arrays = {
+                term: (np.array(docs, dtype=np.int32), np.array(tfs, dtype=np.float32))
+                for term, (docs, tfs) in self.postings.items()
+            }
+        norm = self._norm
+        scores = np.zeros(len(self.node_ids), dtype=np.float32)
+        for term in set(tokenize(query)):
+            if term not in self._arrays:
+                continue
+            docs, tfs = self._arrays[term]
+            idf = np.log(1 + (len(self.node_ids) - len(docs) + 0.5) / (len(docs) + 0.5))
+            scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + norm[docs])
+
+        matched = np.flatnonzero(scores)
+        if len(matched) > top_k:
+            matched = matched[np.argpartition(-scores[matched], top_k - 1)[:top_k]]
+        matched = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(self.node_ids[i], float(scores[i])) for i in matched]
+
+    def save(self, path: str) -> None:
+        """Writes the index atomically as JSON."""
+        self._compact()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "node_ids": self.node_ids,
+                    "doc_lengths": self.doc_lengths,
+                    "postings": self.postings,
+                },
+                f,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        """
+        Reads an index written by `save`.
+
+        Raises:
+            LexicalIndexError: If the file cannot be read.
+        """
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            return cls(
+                node_ids=data["node_ids"],
+                doc_lengths=data["doc_lengths"],
+                postings={term: tuple(p) for term, p in data["postings"].items()},
+            )
+        except (OSError, ValueError, KeyError) as e:
+            raise LexicalIndexError(f"Failed to load lexical index {path}: {e}") from e
+
+
+def lexical_index_path(persist_dir: str, claim_id: str) -> str:
+    """Returns the file of a claim shard's lexical index."""
+    file_name = f"{shard_collection_name(claim_id)}.json"
+    return os.path.join(persist_dir, LEXICAL_DIRNAME, file_name)
+
+
+def list_lexical_indices(persist_dir: str) -> Dict[str, str]:
+    """
+    Returns the lexical index files of a persist directory, keyed by claim ID.
+
+    Only the directory is listed; each index is read by the HybridRetriever
+    of its shard on the first query routed to it.
+    """
+    lexical_dir = os.path.join(persist_dir, LEXICAL_DIRNAME)
+    if not os.path.isdir(lexical_dir):
+        return {}
+    return {
+        shard_claim_id(name[: -len(".json")]): os.path.join(lexical_dir, name)
+        for name in sorted(os.listdir(lexical_dir))
+        if name.endswith(".json")
+    }
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Fuses a vector retriever and a BM25 index with reciprocal rank fusion.
+
+    Each node scores sum(1 / (rrf_k + rank)) over the rankings it appears in.
+    Nodes found only lexically are read from the docstore. The BM25 index is
+    loaded on the first query, so shards that are never queried cost nothing.
+    """
+
+    def __init__(
+        self,
+        vector_retriever: BaseRetriever,
+        lexical_index_path: str,
+        docstore: BaseDocumentStore,
+        similarity_top_k: int,
+        rrf_k: int = RRF_K,
+        **kwargs,
+    ) -> None:
+        self.vector_retriever = vector_retriever
+        self.lexical_index_path = lexical_index_path
+        self.docstore = docstore
+        self.similarity_top_k = similarity_top_k
+        self.rrf_k = rrf_k
+        self._lexical_index: Optional[BM25Index] = None
+        self._load_lock = threading.Lock()
+        super().__init__(**kwargs)
+
+    @property
+    def lexical_index(self) -> BM25Index:
+        """
+        The shard's BM25 index, read from disk on first use.
+
+        Raises:
+            LexicalIndexError: If the index file cannot be read.
+        """
+        if self._lexical_index is None:
+            with self._load_lock:
+                if self._lexical_index is None:
+                    self._lexical_index = BM25Index.load(self.lexical_index_path)
+        return self._lexical_index
+
+    def _fuse(
+        self, query_bundle: QueryBundle, vector_nodes: List[NodeWithScore]
+    ) -> List[NodeWithScore]:
+        lexical_hits = self.lexical_index.search(
+            query_bundle.query_str, self.similarity_top_k
+        )
+        fused: Dict[str, float] = {}
+        for ranking in ([n.node.node_id for n in vector_nodes], [h[0] for h in lexical_hits]):
+            for rank, node_id in enumerate(ranking, start=1):
+                fused[node_id] = fused.get(node_id, 0.0) + 1.0 / (self.rrf_k + rank)
+
+        best = sorted(fused, key=fused.__getitem__, reverse=True)[: self.similarity_top_k]
+        nodes_by_id = {n.node.node_id: n.node for n in vector_nodes}
+        lexical_only = [node_id for node_id in best if node_id not in nodes_by_id]
+        if lexical_only:
+            for node in self.docstore.get_nodes(lexical_only, raise_error=False):
+                nodes_by_id[node.node_id] = node
+        return [
+            NodeWithScore(node=nodes_by_id[node_id], score=fused[node_id])
+            for node_id in best
+            if node_id in nodes_by_id
+        ]
+
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        return self._fuse(query_bundle, self.vector_retriever.retrieve(query_bundle))
+
+    async def _aretrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        vector_nodes = await self.vector_retriever.aretrieve(query_bundle)
+        if self._lexical_index is None:
+            # Keep the first (disk-bound) load off the event loop
+            await asyncio.to_thread(lambda: self.lexical_index)
+        return self._fuse(query_bundle, vector_nodes)
@@ -0,0 +1,165 @@
+"""
+Build manifest for the hierarchical index.
+
+The manifest records a content hash for every source page and every node that
+was indexed from it, so rebuilds can upsert only what changed and report it.
+"""
+
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+
+from llama_index.core import Document
+from llama_index.core.schema import BaseNode, MetadataMode
+
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Namespace for deterministic document / node IDs
+_ID_NAMESPACE = uuid.UUID("6f1d3c2a-8b7e-4f5a-9c0d-2e4b6a8f1c3d")
+
+
+def hash_text(text: str) -> str:
+    """Returns the SHA-256 hex digest of a text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def document_source_key(doc: Document) -> str:
+    """
+    Returns a stable key identifying the source page of a document.
+
+    Uses the file name and page label when available (as produced by
+    SimpleDirectoryReader / LlamaParse) and falls back to the document ID.
+    """
+    file_name = doc.metadata.get("file_name")
+    if not file_name:
+        return doc.doc_id
+    page_label = doc.metadata.get("page_label")
+    return f"{file_name}#page={page_label}" if page_label else file_name
+
+
+def hash_document(doc: Document) -> str:
+    """Hashes the document text together with the metadata that ends up in nodes."""
+    return hash_text(doc.get_content(metadata_mode=MetadataMode.ALL))
+
+
+def hash_node(node: BaseNode) -> str:
+    """Hashes the content of a node as it would be embedded."""
+    return hash_text(node.get_content(metadata_mode=MetadataMode.EMBED))
+
+
+def stable_id(*parts: Any) -> str:
+    """Returns a deterministic UUID derived from the given parts."""
+    return str(uuid.uuid5(_ID_NAMESPACE, ":".join(str(p) for p in parts)))
+
+
+def stable_node_id_func(i: int, doc: BaseNode) -> str:
+    """
+    ID function for node parsers: the i-th chunk of a parent gets the same ID
+    on every build, so unchanged content maps to unchanged node IDs.
+    """
+    return stable_id(doc.node_id, i)
+
+
+def assign_stable_document_ids(
+    documents: List[Document], seen_keys: Optional[Set[str]] = None
+) -> Dict[str, Document]:
+    """
+    Assigns deterministic IDs to documents based on their source key.
+
+    Args:
+        documents: Documents to assign IDs to.
+        seen_keys: Keys already assigned in earlier batches of the same build.
+            Updated in place with the keys of this batch.
+
+    Returns:
+        Dictionary mapping source keys to documents. Duplicate keys get a
+        numeric suffix so that no document is dropped.
+    """
+    if seen_keys is None:
+        seen_keys = set()
+    by_key: Dict[str, Document] = {}
+    for doc in documents:
+        base_key = document_source_key(doc)
+        key = base_key
+        suffix = 1
+        while key in seen_keys:
+            suffix += 1
+            key = f"{base_key}~{suffix}"
+        doc.id_ = stable_id("doc", key)
+        seen_keys.add(key)
+        by_key[key] = doc
+    return by_key
+
+
+def load_manifest(persist_dir: str) -> Optional[Dict[str, Any]]:
+    """Loads the build manifest from a persist directory, if present."""
+    manifest_file = os.path.join(persist_dir, MANIFEST_FILENAME)
+    if not os.path.exists(manifest_file):
+        return None
+    try:
+        with open(manifest_file, "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def save_manifest(persist_dir: str, manifest: Dict[str, Any]) -> None:
+    """Writes the build manifest atomically into a persist directory."""
+    os.makedirs(persist_dir, exist_ok=True)
+    manifest_file = os.path.join(persist_dir, MANIFEST_FILENAME)
+    tmp_file = manifest_file + ".tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_file, manifest_file)
+
+
+def new_manifest(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Creates an empty manifest for the given build configuration."""
+    return {
+        "version": MANIFEST_VERSION,
+        "config": config,
+        "built_at": None,
+        "documents": {},
+        "changes": {},
+    }
+
+
+def stamp_manifest(manifest: Dict[str, Any]) -> None:
+    """Records the build time on a manifest."""
+    manifest["built_at"] = datetime.now(timezone.utc).isoformat()
+
+
+def format_changes(manifest: Dict[str, Any]) -> List[str]:
+    """Formats the change report of a manifest as human-readable lines."""
+    changes = manifest.get("changes", {})
+    counts = manifest.get("counts", {})
+    lines = [
+        f"Snapshot: {manifest.get('snapshot', 'unversioned')}",
+        f"Mode: {changes.get('mode', 'unknown')}",
+        f"Documents added: {len(changes.get('added_documents', []))}",
+        f"Documents changed: {len(changes.get('changed_documents', []))}",
+        f"Documents removed: {len(changes.get('removed_documents', []))}",
+        f"Documents unchanged: {changes.get('unchanged_documents', 0)}",
+        f"Leaf nodes embedded: {changes.get('upserted_leaves', 0)}",
+        f"Nodes deleted: {changes.get('deleted_nodes', 0)}",
+    ]
+    if counts:
+        lines.append(
+            f"Index size: {counts['documents']} documents, {counts['nodes']} nodes, "
+            f"{counts['leaves']} leaves, {counts.get('facts', 0)} facts"
+        )
+    for label, key in (
+        ("+", "added_documents"),
+        ("~", "changed_documents"),
+        ("-", "removed_documents"),
+    ):
+        for source_key in changes.get(key, []):
+            lines.append(f"  {label} {source_key}")
+    return lines
@@ -0,0 +1,462 @@
+"""
+In-process NumPy vector store for leaf embeddings.
+
+An alternative to Chroma for single-claim or small deployments, where the
+vectors of a claim shard fit in one matrix: no client, background threads or
+SQLite, and opening a shard is a memory map. Search is brute-force cosine
+similarity, computed in blocks of rows.
+
+Vectors can be stored as:
+
+- float32: exact, memory-mapped and paged in by the OS.
+- float16: half precision, 2 bytes per dimension.
+- int8: scalar quantization with one float32 scale per vector (absmax), 1 byte
+  per dimension.
+
+For the quantized dtypes the best `top_k * VECTOR_RESCORE_FACTOR` candidates
+are rescored against float32 copies, which stay on disk and are memory-mapped,
+so only the candidate rows are ever read. Quantization saves memory, not disk:
+with rescoring on, a shard stores the float32 copies too and is larger on disk
+than a float32 one. Scanning also costs more CPU than float32, as each block
+is upcast before the dot products.
+
+A shard is a directory holding `codes.npy` (the vectors), `scales.npy` (int8
+only), `full.npy` (float32 copies, when rescoring) and `nodes.json` (node IDs,
+serialized nodes and source document IDs).
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.schema import BaseNode
+from llama_index.core.vector_stores.types import (
+    BasePydanticVectorStore,
+    VectorStoreQuery,
+    VectorStoreQueryResult,
+)
+from llama_index.core.vector_stores.utils import (
+    metadata_dict_to_node,
+    node_to_metadata_dict,
+)
+
+from insurance_system.src.indices.sharding import shard_claim_id, shard_collection_name
+from insurance_system.src.utils.config import VECTOR_RESCORE_FACTOR
+
+VECTORS_DIRNAME = "vectors"
+NUMPY_DTYPES = ("float32", "float16", "int8")
+
+_CODES_FILENAME = "codes.npy"
+_SCALES_FILENAME = "scales.npy"
+_FULL_FILENAME = "full.npy"
+_NODES_FILENAME = "nodes.json"
+# Rows upcast to float32 at a time while scoring (small enough to stay in cache)
+_SCORE_BLOCK_ROWS = 1024
+# float16 values upcast at a time (256 rows of 1024 dims fit in L2)
+_HALF_BLOCK_VALUES = 1 << 18
+# float16 bits shifted into a float32 exponent lose this bias (2 ** (127 - 15))
+_HALF_EXPONENT_SCALE = np.float32(2.0**112)
+# Keeps the sign bit and the shifted exponent / mantissa of a float16
+_HALF_BITS_MASK = np.array(0x8FFFFFFF, dtype=np.uint32).view(np.int32)
+
+
+class NumpyVectorStoreError(Exception):
+    """Base exception for NumPy vector store errors."""
+
+    pass
+
+
+def quantize(
+    vectors: np.ndarray, dtype: str
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Encodes L2-normalized float32 vectors in a storage dtype.
+
+    Returns:
+        Tuple of the codes and the per-vector scales (int8 only, else None).
+    """
+    if dtype == "float32":
+        return vectors, None
+    if dtype == "float16":
+        return vectors.astype(np.float16), None
+    if dtype == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    raise NumpyVectorStoreError(
+        f"Unsupported vector dtype '{dtype}' (expected one of {NUMPY_DTYPES})"
+    )
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+def _save_npy(path: str, array: np.ndarray) -> None:
+    tmp_path = path + ".tmp.npy"
+    np.save(tmp_path, array)
+    os.replace(tmp_path, path)
+
+
+def _write_rows(
+    path: str, parts: List[Tuple[np.ndarray, Optional[np.ndarray]]]
+) -> np.ndarray:
+    """
+    Writes the rows of several arrays (each optionally filtered by a boolean
+    mask) to one .npy file, a block at a time, and returns it memory-mapped.
+    """
+    first = parts[0][0]
+    rows = sum(len(array) if mask is None else int(mask.sum()) for array, mask in parts)
+    tmp_path = path + ".tmp.npy"
+    out = np.lib.format.open_memmap(
+        tmp_path, mode="w+", dtype=first.dtype, shape=(rows, *first.shape[1:])
+    )
+    offset = 0
+    for array, mask in parts:
+        for start in range(0, len(array), _SCORE_BLOCK_ROWS):
+            block = np.asarray(array[start : start + _SCORE_BLOCK_ROWS])
+            if mask is not None:
+                block = block[mask[start : start + _SCORE_BLOCK_ROWS]]
+            out[offset : offset + len(block)] = block
+            offset += len(block)
+    out.flush()
+    del out
+    os.replace(tmp_path, path)
+    return np.load(path, mmap_mode="r")
+
+
+class NumpyVectorStore(BasePydanticVectorStore):
+    """
+    In-process vector store keeping one claim shard as a NumPy matrix.
+
+    Similarities are cosine similarities (higher is better). Adds and deletes
+    are buffered and applied on the next query, `flush` or `persist`. With
+    `flush_every`, buffered adds are written to the shard directory every that
+    many nodes, so a build never holds more vectors than that in memory.
+    """
+
+    stores_text: bool = True
+    flat_metadata: bool = False
+
+    path: str
+    dtype: Optional[str] = None
+    rescore_factor: int = VECTOR_RESCORE_FACTOR
+    flush_every: int = 0
+
+    _ids: List[str] = PrivateAttr(default_factory=list)
+    _nodes: List[List[str]] = PrivateAttr(default_factory=list)
+    _codes: Optional[np.ndarray] = PrivateAttr(default=None)
+    _scales: Optional[np.ndarray] = PrivateAttr(default=None)
+    _full: Optional[np.ndarray] = PrivateAttr(default=None)
+    _pending: List[BaseNode] = PrivateAttr(default_factory=list)
+    _deleted: set = PrivateAttr(default_factory=set)
+    _dirty: bool = PrivateAttr(default=False)
+
+    def __init__(
+        self,
+        path: str,
+        dtype: Optional[str] = None,
+        rescore_factor: int = VECTOR_RESCORE_FACTOR,
+        flush_every: int = 0,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Opens (or starts) the shard stored in a directory.
+
+        Args:
+            path: Shard directory (created on `persist`).
+            dtype: "float32", "float16" or "int8" for a new shard. An existing
+                shard keeps its own dtype.
+            rescore_factor: Candidates rescored at full precision per result
+                for quantized dtypes; 0 disables rescoring and the float32 copy.
+            flush_every: Buffered nodes that trigger a `flush` (0 = never; the
+                vectors stay in memory until `persist`).
+
+        Raises:
+            NumpyVectorStoreError: If the dtype is unsupported or the shard
+                files cannot be read.
+        """
+        super().__init__(
+            path=path,
+            dtype=dtype,
+            rescore_factor=rescore_factor,
+            flush_every=flush_every,
+            **kwargs,
+        )
+        if os.path.exists(os.path.join(path, _NODES_FILENAME)):
+            self._load()
+        elif dtype not in NUMPY_DTYPES:
+            raise NumpyVectorStoreError(
+                f"Unsupported vector dtype '{dtype}' (expected one of {NUMPY_DTYPES})"
+            )
+
+    def _load(self) -> None:
+        try:
+            with open(os.path.join(self.path, _NODES_FILENAME), "r") as f:
+                data = json.load(f)
+            self.dtype = data["dtype"]
+            self._ids = data["ids"]
+            self._nodes = data["nodes"]
+            # Opening is a memory map; the OS pages vectors in on first search
+            self._codes = np.load(os.path.join(self.path, _CODES_FILENAME), mmap_mode="r")
+            scales_path = os.path.join(self.path, _SCALES_FILENAME)
+            if os.path.exists(scales_path):
+                self._scales = np.load(scales_path)
+            full_path = os.path.join(self.path, _FULL_FILENAME)
+            if self._rescores and os.path.exists(full_path):
+                # Only the rescored candidate rows are paged in
+                self._full = np.load(full_path, mmap_mode="r")
+        except (OSError, ValueError, KeyError) as e:
+            raise NumpyVectorStoreError(
+                f"Failed to load vectors from {self.path}: {e}"
+            ) from e
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "NumpyVectorStore"
+
+    @property
+    def _rescores(self) -> bool:
+        return self.rescore_factor > 0 and self.dtype != "float32"
+
+    @property
+    def client(self) -> Any:
+        """No external client; the vectors live in this process."""
+        return None
+
+    def count(self) -> int:
+        """Returns the number of stored vectors."""
+        self._consolidate()
+        return len(self._ids)
+
+    def add(self, nodes: List[BaseNode], **add_kwargs: Any) -> List[str]:
+        """Adds nodes with embeddings (replacing nodes with the same ID)."""
+        self._pending.extend(nodes)
+        self._deleted.difference_update(node.node_id for node in nodes)
+        self._dirty = True
+        if self.flush_every and len(self._pending) >= self.flush_every:
+            self.flush()
+        return [node.node_id for node in nodes]
+
+    def delete(self, ref_doc_id: str, **delete_kwargs: Any) -> None:
+        """Deletes the nodes of a source document."""
+        self._consolidate()
+        node_ids = [
+            node_id
+            for node_id, (_, _, node_ref_doc_id) in zip(self._ids, self._nodes)
+            if node_ref_doc_id == ref_doc_id
+        ]
+        self.delete_nodes(node_ids)
+
+    def delete_nodes(
+        self, node_ids: Optional[List[str]] = None, filters: Optional[Any] = None, **kwargs: Any
+    ) -> None:
+        """Deletes nodes by ID."""
+        if filters is not None:
+            raise NumpyVectorStoreError("Metadata filters are not supported")
+        node_ids = set(node_ids or [])
+        self._pending = [node for node in self._pending if node.node_id not in node_ids]
+        self._deleted.update(node_ids)
+        self._dirty = True
+
+    def _consolidate(self, to_disk: bool = False) -> None:
+        """
+        Applies buffered adds and deletes to the arrays.
+
+        Args:
+            to_disk: Write the vectors to the shard directory a block at a time
+                and memory-map them, instead of concatenating them in memory.
+
+        Raises:
+            NumpyVectorStoreError: If the shard rescores but its stored rows
+                have no float32 copy (it was written with rescoring disabled).
+        """
+        if not self._pending and not self._deleted:
+            return
+        if self._rescores and self._ids and self._full is None:
+            # The copy cannot be rebuilt from the quantized codes
+            raise NumpyVectorStoreError(
+                f"Shard {self.path} has no float32 copy to rescore with; open it "
+                "with rescore_factor=0 or rebuild it"
+            )
+        # A re-added node replaces its previous row
+        replaced = self._deleted | {node.node_id for node in self._pending}
+        keep = np.array([node_id not in replaced for node_id in self._ids], dtype=bool)
+        ids = [node_id for node_id, k in zip(self._ids, keep) if k]
+        nodes = [node for node, k in zip(self._nodes, keep) if k]
+
+        latest: Dict[str, BaseNode] = {node.node_id: node for node in self._pending}
+        added = list(latest.values())
+        vectors = added_codes = added_scales = None
+        if added:
+            vectors = _normalize(np.array([n.get_embedding() for n in added], dtype=np.float32))
+            added_codes, added_scales = quantize(vectors, self.dtype)
+            for node in added:
+                metadata = node_to_metadata_dict(node, remove_text=False)
+                ids.append(node.node_id)
+                nodes.append(
+                    [metadata["_node_content"], metadata["_node_type"], metadata["ref_doc_id"]]
+                )
+
+        def combine(
+            old: Optional[np.ndarray], new: Optional[np.ndarray], filename: Optional[str]
+        ) -> Optional[np.ndarray]:
+            parts = [(old, keep)] if old is not None else []
+            if new is not None:
+                parts.append((new, None))
+            if not parts:
+                return None
+            if to_disk and filename is not None:
+                return _write_rows(os.path.join(self.path, filename), parts)
+            return np.concatenate([a if m is None else np.asarray(a[m]) for a, m in parts])
+
+        self._ids = ids
+        self._nodes = nodes
+        self._codes = combine(self._codes, added_codes, _CODES_FILENAME)
+        self._scales = combine(self._scales, added_scales, None)
+        self._full = (
+            combine(self._full, vectors, _FULL_FILENAME) if self._rescores else None
+        )
+        self._pending = []
+        self._deleted = set()
+
+    def flush(self) -> None:
+        """Applies buffered adds and deletes, writing the vectors to the shard directory."""
+        os.makedirs(self.path, exist_ok=True)
+        self._consolidate(to_disk=True)
+
+    def _scores(self, query: np.ndarray) -> np.ndarray:
+        """Cosine similarities of all rows (approximate for quantized dtypes)."""
+        if self.dtype == "float16":
+            return self._half_scores(query)
+        scores = np.empty(len(self._ids), dtype=np.float32)
+        for start in range(0, len(self._ids), _SCORE_BLOCK_ROWS):
+            block = np.asarray(self._codes[start : start + _SCORE_BLOCK_ROWS])
+            if block.dtype != np.float32:
+                block = block.astype(np.float32)
+            scores[start : start + len(block)] = block @ query
+        if self._scales is not None:
+            scores *= self._scales
+        return scores
+
+    def _half_scores(self, query: np.ndarray) -> np.ndarray:
+        """
+        Cosine similarities of float16 rows, upcast a block at a time.
+
+        NumPy's float16 cast is not vectorized, so the bits are widened with
+        integer operations instead: a float16 shifted left by 13 bits is the
+        float32 of the same value divided by 2 ** 112 (exact, subnormals
+        included; normalized vectors hold no inf or NaN). The factor is folded
+        into the query.
+        """
+        rows = max(1, _HALF_BLOCK_VALUES // self._codes.shape[1])
+        scores = np.empty(len(self._ids), dtype=np.float32)
+        buffer = np.empty((min(rows, len(self._ids)), self._codes.shape[1]), dtype=np.int32)
+        scaled_query = query * _HALF_EXPONENT_SCALE
+        for start in range(0, len(self._ids), rows):
+            block = np.asarray(self._codes[start : start + rows]).view(np.int16)
+            bits = buffer[: len(block)]
+            np.copyto(bits, block)
+            bits <<= 13
+            bits &= _HALF_BITS_MASK
+            np.matmul(bits.view(np.float32), scaled_query, out=scores[start : start + len(block)])
+        return scores
+
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        """Returns the top-k nodes by cosine similarity."""
+        if query.filters is not None:
+            raise NumpyVectorStoreError("Metadata filters are not supported")
+        self._consolidate()
+        if not self._ids or query.query_embedding is None:
+            return VectorStoreQueryResult(nodes=[], similarities=[], ids=[])
+
+        q = _normalize(np.array([query.query_embedding], dtype=np.float32))[0]
+        top_k = min(query.similarity_top_k, len(self._ids))
+        scores = self._scores(q)
+
+        if self._full is not None and self._rescores:
+            n_candidates = min(top_k * self.rescore_factor, len(self._ids))
+            candidates = np.argpartition(-scores, n_candidates - 1)[:n_candidates]
+            candidates.sort()  # sequential reads from the memory map
+            scores = np.asarray(self._full[candidates]) @ q
+        else:
+            candidates = np.arange(len(self._ids))
+
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+
+        nodes, similarities, ids = [], [], []
+        for i in best:
+            row = int(candidates[i])
+            content, node_type, _ = self._nodes[row]
+            nodes.append(
+                metadata_dict_to_node({"_node_content": content, "_node_type": node_type})
+            )
+            similarities.append(float(scores[i]))
+            ids.append(self._ids[row])
+        return VectorStoreQueryResult(nodes=nodes, similarities=similarities, ids=ids)
+
+    def persist(self, persist_path: Optional[str] = None, fs: Optional[Any] = None) -> None:
+        """
+        Writes the shard to its directory.
+
+        The vectors always live in `path`; the `persist_path` StorageContext
+        passes for a JSON file is ignored.
+        """
+        nodes_path = os.path.join(self.path, _NODES_FILENAME)
+        if not self._dirty and os.path.exists(nodes_path):
+            return
+        self.flush()
+        codes_path = os.path.join(self.path, _CODES_FILENAME)
+        if self._codes is None:
+            _save_npy(codes_path, np.zeros((0, 0), self.dtype))
+        elif not isinstance(self._codes, np.memmap):
+            # Consolidated in memory (by a query) since the last flush
+            _save_npy(codes_path, self._codes)
+            self._codes = np.load(codes_path, mmap_mode="r")
+        if self._scales is not None:
+            _save_npy(os.path.join(self.path, _SCALES_FILENAME), self._scales)
+        full_path = os.path.join(self.path, _FULL_FILENAME)
+        if self._full is not None:
+            if not isinstance(self._full, np.memmap):
+                _save_npy(full_path, self._full)
+                self._full = np.load(full_path, mmap_mode="r")
+        elif os.path.exists(full_path):
+            os.remove(full_path)
+
+        with open(nodes_path + ".tmp", "w") as f:
+            json.dump({"dtype": self.dtype, "ids": self._ids, "nodes": self._nodes}, f)
+        os.replace(nodes_path + ".tmp", nodes_path)
+        self._dirty = False
+
+    def memory_bytes(self) -> int:
+        """Bytes of vector data scanned by every search (rescoring copies excluded)."""
+        self._consolidate()
+        total = self._codes.nbytes if self._codes is not None else 0
+        if self._scales is not None:
+            total += self._scales.nbytes
+        if self._full is not None and not isinstance(self._full, np.memmap):
+            total += self._full.nbytes
+        return total
+
+
+def numpy_shard_dir(persist_dir: str, claim_id: str) -> str:
+    """Returns the directory of a claim shard's NumPy vectors."""
+    return os.path.join(persist_dir, VECTORS_DIRNAME, shard_collection_name(claim_id))
+
+
+def list_numpy_shards(persist_dir: str) -> List[str]:
+    """Returns the claim IDs with NumPy vectors in a persist directory."""
+    vectors_dir = os.path.join(persist_dir, VECTORS_DIRNAME)
+    if not os.path.isdir(vectors_dir):
+        return []
+    return sorted(
+        shard_claim_id(name)
+        for name in os.listdir(vectors_dir)
+        if os.path.exists(os.path.join(vectors_dir, name, _NODES_FILENAME))
+    )
@@ -0,0 +1,195 @@
+"""
+Content-addressed cache of parsed document pages.
+
+Parsing (LlamaParse premium mode in particular) is the slowest and most
+expensive step of a build. Parsed pages are stored on disk under the SHA-256
+of the file bytes plus a fingerprint of the parser settings, so unchanged
+files are never sent to the parser again. Any reader can be cached, including
+local stand-ins for LlamaParse.
+
+Invalidate entries explicitly with:
+
+    python -m insurance_system.src.indices.parse_cache invalidate [FILE ...]
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+from llama_index.core import Document
+
+from insurance_system.src.utils.config import PARSE_CACHE_DIR
+
+# Reader settings that do not change the parsed output
+_IGNORED_SETTINGS = {
+    "api_key",
+    "base_url",
+    "verbose",
+    "show_progress",
+    "invalidate_cache",
+    "num_workers",
+    "max_timeout",
+    "check_interval",
+    "custom_client",
+}
+
+
+def hash_file(file_path: str) -> str:
+    """Returns the SHA-256 hex digest of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def parser_fingerprint(file_extractor: Optional[Dict[str, Any]]) -> str:
+    """
+    Returns a short hash identifying the parsers and their output-relevant settings.
+
+    Readers can define `cache_fingerprint()` to control this; pydantic readers
+    (such as LlamaParse) are fingerprinted by their fields, anything else by
+    its class.
+    """
+    description: Dict[str, Any] = {}
+    for extension, reader in sorted((file_extractor or {}).items()):
+        # Spawned workers import the main script as "__mp_main__"
+        module = type(reader).__module__.replace("__mp_main__", "__main__")
+        reader_class = f"{module}.{type(reader).__qualname__}"
+        if hasattr(reader, "cache_fingerprint"):
+            settings: Any = reader.cache_fingerprint()
+        elif hasattr(reader, "model_dump"):
+            settings = {
+                k: v
+                for k, v in reader.model_dump().items()
+                if k not in _IGNORED_SETTINGS
+            }
+        else:
+            settings = None
+        description[extension] = [reader_class, settings]
+    encoded = json.dumps(description, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+class ParseCache:
+    """
+    Directory of parsed pages, one JSON file per (file content, parser settings).
+
+    Entries are named `<file sha256>_<parser fingerprint>.json` and written
+    atomically, so the cache can be shared by worker processes.
+    """
+
+    def __init__(self, cache_dir: str = PARSE_CACHE_DIR, refresh: bool = False) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the entries (created on first write).
+            refresh: If True, ignore existing entries and overwrite them with
+                fresh parses.
+        """
+        self.cache_dir = cache_dir
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, file_hash: str, fingerprint: str) -> str:
+        return os.path.join(self.cache_dir, f"{file_hash}_{fingerprint}.json")
+
+    def get(self, file_path: str, fingerprint: str) -> Optional[List[Document]]:
+        """Returns the cached pages of a file, or None on a miss."""
+        if self.refresh:
+            self.misses += 1
+            return None
+        entry_path = self._entry_path(hash_file(file_path), fingerprint)
+        try:
+            with open(entry_path, "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        documents = []
+        for data in entry["documents"]:
+            doc = Document.from_dict(data)
+            # The same content may have been cached under another path
+            if "file_path" in doc.metadata:
+                doc.metadata["file_path"] = file_path
+            if "file_name" in doc.metadata:
+                doc.metadata["file_name"] = os.path.basename(file_path)
+            documents.append(doc)
+        return documents
+
+    def put(self, file_path: str, fingerprint: str, documents: List[Document]) -> None:
+        """Stores the parsed pages of a file."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry_path = self._entry_path(hash_file(file_path), fingerprint)
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "source": os.path.basename(file_path),
+                    "fingerprint": fingerprint,
+                    "documents": [doc.to_dict() for doc in documents],
+                },
+                f,
+            )
+        os.replace(tmp_path, entry_path)
+
+    def invalidate(self, file_path: Optional[str] = None) -> int:
+        """
+        Removes cached entries.
+
+        Args:
+            file_path: Only remove the entries of this file (current content,
+                any parser settings). Removes everything if None.
+
+        Returns:
+            Number of removed entries.
+        """
+        prefix = hash_file(file_path) if file_path else ""
+        removed = 0
+        for entry_path in glob.glob(os.path.join(self.cache_dir, f"{prefix}*.json")):
+            os.remove(entry_path)
+            removed += 1
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters and the number of entries on disk."""
+        entries = glob.glob(os.path.join(self.cache_dir, "*.json"))
+        return {"hits": self.hits, "misses": self.misses, "entries": len(entries)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the parsed-page cache")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    invalidate_parser = subparsers.add_parser(
+        "invalidate", help="Remove cached pages (all, or of the given files)"
+    )
+    invalidate_parser.add_argument("files", nargs="*", help="Files to re-parse")
+    subparsers.add_parser("stats", help="Show the number of cached files")
+    args = parser.parse_args()
+
+    cache = ParseCache()
+    if args.command == "invalidate":
+        if args.files:
+            removed = 0
+            for file_path in args.files:
+                if not os.path.exists(file_path):
+                    print(f"❌ Error: File '{file_path}' not found.")
+                    sys.exit(1)
+                removed += cache.invalidate(file_path)
+        else:
+            removed = cache.invalidate()
+        print(f"🗑️  Removed {removed} cached parse(s) from {cache.cache_dir}")
+    else:
+        print(f"🗄️  {cache.stats()['entries']} cached parse(s) in {cache.cache_dir}")
+
+
+if __name__ == "__main__":
+    main()
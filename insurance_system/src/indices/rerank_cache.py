@@ -0,0 +1,170 @@
+"""
+Cache of cross-encoder scores for repeated (query, passage) pairs.
+
+Adjusters ask the same questions about the same claim many times, and each
+time the reranker would re-score the same retrieved passages. Scores are kept
+in a bounded in-memory LRU (and optionally in SQLite, so they survive
+restarts), keyed by the reranker model, the normalized query and the SHA-256
+of the passage text. The cache belongs to one index snapshot: when a
+different snapshot is loaded, every entry is dropped.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from insurance_system.src.utils.config import (
+    RERANK_CACHE_DISK,
+    RERANK_CACHE_PATH,
+    RERANK_CACHE_SIZE,
+)
+
+# Keep SQLite "IN (...)" clauses well below the variable limit
+_SQL_CHUNK = 500
+
+_shared_cache: Optional["RerankScoreCache"] = None
+_shared_lock = threading.Lock()
+
+
+class RerankCacheError(Exception):
+    """Base exception for rerank cache errors."""
+
+    pass
+
+
+def normalize_query(query: str) -> str:
+    """Lower-cases a query and collapses whitespace and trailing punctuation."""
+    return " ".join(query.lower().split()).rstrip("?!. ")
+
+
+class RerankScoreCache:
+    """LRU of reranker scores for the live index snapshot, optionally backed by SQLite."""
+
+    def __init__(
+        self, max_entries: int = RERANK_CACHE_SIZE, path: Optional[str] = None
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Scores kept in memory.
+            path: Optional SQLite database file for scores to outlive the process.
+
+        Raises:
+            RerankCacheError: If the database cannot be opened.
+        """
+        self.max_entries = max_entries
+        self.path = path
+        self.snapshot: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if path is not None:
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                self._conn = sqlite3.connect(
+                    path, check_same_thread=False, isolation_level=None, timeout=30
+                )
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS scores ("
+                    "key TEXT PRIMARY KEY, snapshot TEXT NOT NULL, score REAL NOT NULL)"
+                )
+            except sqlite3.Error as e:
+                raise RerankCacheError(f"Rerank cache initialization failed: {e}") from e
+
+    @staticmethod
+    def make_key(model: str, query: str, passage: str) -> str:
+        """Returns the cache key of a (query, passage) pair for a reranker model."""
+        passage_hash = hashlib.sha256(passage.encode("utf-8")).hexdigest()
+        return hashlib.sha256(
+            f"{model}\x00{normalize_query(query)}\x00{passage_hash}".encode("utf-8")
+        ).hexdigest()
+
+    def set_snapshot(self, snapshot: str) -> bool:
+        """
+        Binds the cache to an index snapshot, dropping the scores of any other.
+
+        Returns:
+            True if the snapshot changed (and the cache was cleared).
+        """
+        with self._lock:
+            if snapshot == self.snapshot:
+                return False
+            self.snapshot = snapshot
+            self._entries.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM scores WHERE snapshot != ?", (snapshot,))
+            return True
+
+    def get_many(self, keys: List[str]) -> Dict[str, float]:
+        """Returns the cached scores of the given keys (misses are left out)."""
+        found: Dict[str, float] = {}
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+            missing = [key for key in keys if key not in found]
+            if missing and self._conn is not None and self.snapshot is not None:
+                for i in range(0, len(missing), _SQL_CHUNK):
+                    chunk = missing[i : i + _SQL_CHUNK]
+                    rows = self._conn.execute(
+                        f"SELECT key, score FROM scores WHERE snapshot = ? AND key IN "
+                        f"({','.join('?' * len(chunk))})",
+                        [self.snapshot, *chunk],
+                    ).fetchall()
+                    for key, score in rows:
+                        found[key] = score
+                        self._remember(key, score)
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, scores: Dict[str, float]) -> None:
+        """Stores scores for the current snapshot."""
+        with self._lock:
+            for key, score in scores.items():
+                self._remember(key, score)
+            if self._conn is not None and self.snapshot is not None:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO scores (key, snapshot, score) VALUES (?, ?, ?)",
+                    [(key, self.snapshot, score) for key, score in scores.items()],
+                )
+
+    def _remember(self, key: str, score: float) -> None:
+        self._entries[key] = score
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters and the number of scores in memory."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+        }
+
+
+def get_score_cache() -> RerankScoreCache:
+    """Returns the process-wide score cache (on disk if RERANK_CACHE_DISK is set)."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = RerankScoreCache(
+                path=RERANK_CACHE_PATH if RERANK_CACHE_DISK else None
+            )
+        return _shared_cache
@@ -0,0 +1,394 @@
+"""
+Process-wide cross-encoder reranking service.
+
+The cross-encoder is loaded once per process and shared by every query engine
+(including each chunking-analysis configuration), optionally as an ONNX
+export that can be dynamically quantized to int8 for CPU inference.
+
+Scoring requests of concurrent queries are collected for up to
+RERANKER_BATCH_WINDOW_MS and scored together by one worker thread. The pairs
+of a batch are sorted by length first, so each forward pass pads its inputs to
+a similar length. Pairs already in the score cache (see `rerank_cache`) are not
+scored again. The service reports its queue depth, batch sizes and latencies.
+"""
+
+import asyncio
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from llama_index.core.bridge.pydantic import Field
+from llama_index.core.callbacks import CBEventType, EventPayload
+from llama_index.core.postprocessor.types import BaseNodePostprocessor
+from llama_index.core.schema import MetadataMode, NodeWithScore, QueryBundle
+
+from insurance_system.src.indices.rerank_cache import RerankScoreCache, get_score_cache
+from insurance_system.src.utils.config import (
+    RERANK_CACHE_ENABLED,
+    RERANKER_BACKEND,
+    RERANKER_BATCH_SIZE,
+    RERANKER_BATCH_WINDOW_MS,
+    RERANKER_EXPORT_DIR,
+    RERANKER_MAX_BATCH_PAIRS,
+    RERANKER_MODEL,
+    RERANKER_ONNX_QUANTIZATION,
+    RERANKER_TOP_N,
+)
+
+RERANKER_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+# One service (model + worker thread) per model, backend and process
+_shared_services: Dict[Tuple[str, str], "CrossEncoderService"] = {}
+_shared_lock = threading.Lock()
+
+
+class RerankerError(Exception):
+    """Base exception for reranker errors."""
+
+    pass
+
+
+def _load_quantized(model_name: str) -> Any:
+    """Loads the int8 ONNX export of a model, exporting it on first use."""
+    from sentence_transformers import CrossEncoder, export_dynamic_quantized_onnx_model
+
+    export_dir = os.path.join(RERANKER_EXPORT_DIR, model_name.replace("/", "__"))
+    file_name = os.path.join("onnx", f"model_qint8_{RERANKER_ONNX_QUANTIZATION}.onnx")
+    if not os.path.exists(os.path.join(export_dir, file_name)):
+        print(f"  ⚙️  Exporting {model_name} to int8 ONNX for {RERANKER_ONNX_QUANTIZATION}...")
+        model = CrossEncoder(model_name, backend="onnx")
+        model.save_pretrained(export_dir)
+        export_dynamic_quantized_onnx_model(model, RERANKER_ONNX_QUANTIZATION, export_dir)
+    return CrossEncoder(export_dir, backend="onnx", model_kwargs={"file_name": file_name})
+
+
+def load_cross_encoder(
+    model_name: str = RERANKER_MODEL, backend: str = RERANKER_BACKEND
+) -> Any:
+    """
+    Loads a sentence-transformers CrossEncoder.
+
+    Args:
+        model_name: Hugging Face model name or local path.
+        backend: "torch", "onnx" or "onnx-int8".
+
+    Raises:
+        RerankerError: If the backend is unknown or the model cannot be loaded.
+    """
+    if backend not in RERANKER_BACKENDS:
+        raise RerankerError(
+            f"Unknown reranker backend '{backend}' (expected one of {RERANKER_BACKENDS})"
+        )
+    try:
+        from sentence_transformers import CrossEncoder
+
+        if backend == "onnx-int8":
+            return _load_quantized(model_name)
+        if backend == "onnx":
+            return CrossEncoder(model_name, backend="onnx")
+        return CrossEncoder(model_name)
+    except Exception as e:
+        raise RerankerError(f"Failed to load reranker {model_name} ({backend}): {e}") from e
+
+
+class _Request:
+    """The pairs of one scoring call, waiting for their scores."""
+
+    __slots__ = ("pairs", "future", "enqueued")
+
+    def __init__(self, pairs: List[Tuple[str, str]]) -> None:
+        self.pairs = pairs
+        self.future: Future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class CrossEncoderService:
+    """
+    Shared cross-encoder that batches scoring calls across concurrent queries.
+
+    Use `get_reranker_service` rather than creating instances, so that the
+    model is loaded once per process.
+    """
+
+    def __init__(
+        self,
+        model_name: str = RERANKER_MODEL,
+        backend: str = RERANKER_BACKEND,
+        model: Optional[Any] = None,
+        batch_size: int = RERANKER_BATCH_SIZE,
+        max_batch_pairs: int = RERANKER_MAX_BATCH_PAIRS,
+        window_ms: float = RERANKER_BATCH_WINDOW_MS,
+        cache: Optional[RerankScoreCache] = None,
+    ) -> None:
+        """
+        Initialize the service and load the model.
+
+        Args:
+            model_name: Cross-encoder model name.
+            backend: "torch", "onnx" or "onnx-int8".
+            model: Already loaded model with a CrossEncoder-style
+                `predict(pairs, batch_size=...)` (loaded from model_name if None).
+            batch_size: Pairs per forward pass.
+            max_batch_pairs: Most pairs collected into one service batch.
+            window_ms: How long a batch waits for further requests.
+            cache: Optional score cache consulted before scoring.
+
+        Raises:
+            RerankerError: If the model cannot be loaded.
+        """
+        self.model_name = model_name
+        self.backend = backend
+        self.model = model if model is not None else load_cross_encoder(model_name, backend)
+        self.batch_size = batch_size
+        self.max_batch_pairs = max_batch_pairs
+        self.window = window_ms / 1000
+        self.cache = cache
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # Metrics
+        self.requests = 0
+        self.pairs = 0
+        self.batches = 0
+        self._latencies_ms: Deque[float] = deque(maxlen=1000)
+        self._batch_pairs: Deque[int] = deque(maxlen=1000)
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="reranker", daemon=True
+                )
+                self._thread.start()
+
+    def _cached(self, query: str, passages: Sequence[str]) -> Tuple[List[Any], List[str]]:
+        """Returns the cached scores (None for misses) and the cache keys."""
+        if self.cache is None:
+            return [None] * len(passages), []
+        model_id = f"{self.model_name}:{self.backend}"
+        keys = [self.cache.make_key(model_id, query, p) for p in passages]
+        cached = self.cache.get_many(keys)
+        return [cached.get(key) for key in keys], keys
+
+    def _submit(self, pairs: List[Tuple[str, str]]) -> _Request:
+        request = _Request(pairs)
+        self._ensure_worker()
+        self._queue.put(request)
+        return request
+
+    def _fill(
+        self, scores: List[Any], keys: List[str], missing: List[int], new: List[float]
+    ) -> List[float]:
+        for i, score in zip(missing, new):
+            scores[i] = score
+        if self.cache is not None:
+            self.cache.put_many({keys[i]: scores[i] for i in missing})
+        return scores
+
+    def score(self, query: str, passages: Sequence[str]) -> List[float]:
+        """
+        Scores passages against a query (blocking until the batch is done).
+
+        Raises:
+            RerankerError: If the model fails on the batch.
+        """
+        if not passages:
+            return []
+        scores, keys = self._cached(query, passages)
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if not missing:
+            return scores
+        request = self._submit([(query, passages[i]) for i in missing])
+        return self._fill(scores, keys, missing, request.future.result())
+
+    async def ascore(self, query: str, passages: Sequence[str]) -> List[float]:
+        """
+        Scores passages against a query, awaiting the batch without blocking
+        the event loop (the model runs on the service's worker thread).
+
+        Raises:
+            RerankerError: If the model fails on the batch.
+        """
+        if not passages:
+            return []
+        scores, keys = self._cached(query, passages)
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if not missing:
+            return scores
+        request = self._submit([(query, passages[i]) for i in missing])
+        return self._fill(scores, keys, missing, await asyncio.wrap_future(request.future))
+
+    def _collect(self) -> List[_Request]:
+        """Waits for a request, then for more until the window or batch is full."""
+        requests = [self._queue.get()]
+        pairs = len(requests[0].pairs)
+        deadline = time.perf_counter() + self.window
+        while pairs < self.max_batch_pairs:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            requests.append(request)
+            pairs += len(request.pairs)
+        return requests
+
+    def _score_batch(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        # Similar lengths share a forward pass, so little padding is computed
+        order = sorted(range(len(pairs)), key=lambda i: len(pairs[i][0]) + len(pairs[i][1]))
+        sorted_scores = self.model.predict(
+            [pairs[i] for i in order], batch_size=self.batch_size, show_progress_bar=False
+        )
+        scores = [0.0] * len(pairs)
+        for position, i in enumerate(order):
+            scores[i] = float(sorted_scores[position])
+        return scores
+
+    def _run(self) -> None:
+        while True:
+            requests = self._collect()
+            pairs = [pair for request in requests for pair in request.pairs]
+            try:
+                scores = self._score_batch(pairs)
+            except Exception as e:
+                for request in requests:
+                    request.future.set_exception(RerankerError(f"Reranking failed: {e}"))
+                continue
+
+            done = time.perf_counter()
+            offset = 0
+            with self._lock:
+                self.requests += len(requests)
+                self.pairs += len(pairs)
+                self.batches += 1
+                self._batch_pairs.append(len(pairs))
+                for request in requests:
+                    self._latencies_ms.append((done - request.enqueued) * 1000)
+            for request in requests:
+                request.future.set_result(scores[offset : offset + len(request.pairs)])
+                offset += len(request.pairs)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the queue depth, totals, mean batch size, the p50 / p99
+        request latency (queueing plus scoring) over the last 1000 requests,
+        and the score cache counters.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies_ms)
+            batch_pairs = list(self._batch_pairs)
+            totals = {
+                "requests": self.requests,
+                "pairs": self.pairs,
+                "batches": self.batches,
+            }
+
+        def percentile(q: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(int(len(latencies) * q), len(latencies) - 1)]
+
+        return {
+            "backend": self.backend,
+            "queue_depth": self._queue.qsize(),
+            **totals,
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "mean_batch_pairs": sum(batch_pairs) / len(batch_pairs) if batch_pairs else 0.0,
+            "p50_ms": percentile(0.5),
+            "p99_ms": percentile(0.99),
+        }
+
+
+def get_reranker_service(
+    model_name: str = RERANKER_MODEL, backend: str = RERANKER_BACKEND
+) -> CrossEncoderService:
+    """
+    Returns the process-wide reranking service, loading the model on first use.
+
+    Raises:
+        RerankerError: If the model cannot be loaded.
+    """
+    with _shared_lock:
+        key = (model_name, backend)
+        if key not in _shared_services:
+            _shared_services[key] = CrossEncoderService(
+                model_name,
+                backend,
+                cache=get_score_cache() if RERANK_CACHE_ENABLED else None,
+            )
+        return _shared_services[key]
+
+
+class SharedRerank(BaseNodePostprocessor):
+    """
+    Drop-in replacement for SentenceTransformerRerank that scores through the
+    shared CrossEncoderService instead of loading its own model.
+    """
+
+    model: str = Field(default=RERANKER_MODEL, description="Cross-encoder model name.")
+    backend: str = Field(default=RERANKER_BACKEND, description="Inference backend.")
+    top_n: int = Field(default=RERANKER_TOP_N, description="Number of nodes to return.")
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "SharedRerank"
+
+    def _event(self, nodes: List[NodeWithScore], query_bundle: QueryBundle) -> Any:
+        return self.callback_manager.event(
+            CBEventType.RERANKING,
+            payload={
+                EventPayload.NODES: nodes,
+                EventPayload.MODEL_NAME: self.model,
+                EventPayload.QUERY_STR: query_bundle.query_str,
+                EventPayload.TOP_K: self.top_n,
+            },
+        )
+
+    @staticmethod
+    def _passages(nodes: List[NodeWithScore]) -> List[str]:
+        return [n.node.get_content(metadata_mode=MetadataMode.EMBED) for n in nodes]
+
+    def _rank(self, nodes: List[NodeWithScore], scores: List[float]) -> List[NodeWithScore]:
+        for node, score in zip(nodes, scores):
+            node.score = score
+        return sorted(nodes, key=lambda n: n.score or 0.0, reverse=True)[: self.top_n]
+
+    def _postprocess_nodes(
+        self,
+        nodes: List[NodeWithScore],
+        query_bundle: Optional[QueryBundle] = None,
+    ) -> List[NodeWithScore]:
+        if query_bundle is None:
+            raise ValueError("Missing query bundle in extra info.")
+        if not nodes:
+            return []
+
+        service = get_reranker_service(self.model, self.backend)
+        with self._event(nodes, query_bundle) as event:
+            scores = service.score(query_bundle.query_str, self._passages(nodes))
+            new_nodes = self._rank(nodes, scores)
+            event.on_end(payload={EventPayload.NODES: new_nodes})
+        return new_nodes
+
+    async def _apostprocess_nodes(
+        self,
+        nodes: List[NodeWithScore],
+        query_bundle: Optional[QueryBundle] = None,
+    ) -> List[NodeWithScore]:
+        if query_bundle is None:
+            raise ValueError("Missing query bundle in extra info.")
+        if not nodes:
+            return []
+
+        service = get_reranker_service(self.model, self.backend)
+        with self._event(nodes, query_bundle) as event:
+            scores = await service.ascore(query_bundle.query_str, self._passages(nodes))
+            new_nodes = self._rank(nodes, scores)
+            event.on_end(payload={EventPayload.NODES: new_nodes})
+        return new_nodes
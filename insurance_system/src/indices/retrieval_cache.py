@@ -0,0 +1,225 @@
+"""
+Two-tier query cache in front of the vector search of each shard.
+
+Repeated and follow-up questions would otherwise embed the query over the
+network and run the ANN search again. The first tier maps the query text to
+its embedding; the second maps (embedding hash, top-k, index version) to the
+ranked node IDs and scores, whose nodes are then read from the docstore. Both
+tiers are in-memory LRUs whose entries also expire after
+RETRIEVAL_CACHE_TTL_SECONDS. Results are keyed by the snapshot they were
+searched in, so a reload never serves results of an older index.
+"""
+
+import hashlib
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from llama_index.core import Settings
+from llama_index.core.base.base_retriever import BaseRetriever
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.schema import NodeWithScore, QueryBundle
+from llama_index.core.storage.docstore.types import BaseDocumentStore
+
+from insurance_system.src.utils.config import (
+    QUERY_EMBEDDING_CACHE_SIZE,
+    RETRIEVAL_CACHE_SIZE,
+    RETRIEVAL_CACHE_TTL_SECONDS,
+)
+
+_shared_cache: Optional["RetrievalCache"] = None
+_shared_lock = threading.Lock()
+
+
+class TTLCache:
+    """Thread-safe LRU whose entries also expire, with hit/miss counters."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Entries kept before the least recently used is evicted.
+            ttl_seconds: Age after which an entry is no longer served (0 = never).
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returns the cached value of a key, or None if missing or expired."""
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and self.ttl_seconds:
+                if time.monotonic() - item[0] > self.ttl_seconds:
+                    del self._entries[key]
+                    item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters and the number of entries."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+        }
+
+
+class RetrievalCache:
+    """The query-embedding tier and the search-result tier."""
+
+    def __init__(
+        self,
+        embedding_entries: int = QUERY_EMBEDDING_CACHE_SIZE,
+        result_entries: int = RETRIEVAL_CACHE_SIZE,
+        ttl_seconds: float = RETRIEVAL_CACHE_TTL_SECONDS,
+    ) -> None:
+        self.embeddings = TTLCache(embedding_entries, ttl_seconds)
+        self.results = TTLCache(result_entries, ttl_seconds)
+
+    def clear(self) -> None:
+        self.embeddings.clear()
+        self.results.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"embeddings": self.embeddings.stats(), "results": self.results.stats()}
+
+
+def get_retrieval_cache() -> RetrievalCache:
+    """Returns the process-wide retrieval cache."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = RetrievalCache()
+        return _shared_cache
+
+
+def embedding_hash(embedding: List[float]) -> str:
+    """Returns the SHA-256 of an embedding's float32 bytes."""
+    return hashlib.sha256(array("f", embedding).tobytes()).hexdigest()
+
+
+class CachedVectorRetriever(BaseRetriever):
+    """
+    Vector retriever that serves repeated queries from a RetrievalCache.
+
+    Wraps the VectorIndexRetriever of one shard. The query embedding it
+    computes (or finds) is set on the query bundle, so the wrapped retriever
+    and the other shards of a fan-out do not embed the query again.
+    """
+
+    def __init__(
+        self,
+        vector_retriever: BaseRetriever,
+        docstore: BaseDocumentStore,
+        index_version: str,
+        similarity_top_k: int,
+        cache: Optional[RetrievalCache] = None,
+        embed_model: Optional[BaseEmbedding] = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Initialize the retriever.
+
+        Args:
+            vector_retriever: Retriever running the vector search.
+            docstore: Docstore holding the nodes of the index.
+            index_version: Identifies the searched index (snapshot and shard).
+            similarity_top_k: Top-k of the wrapped retriever (part of the key).
+            cache: Cache to use (the process-wide one if None).
+            embed_model: Query embedding model (`Settings.embed_model` if None).
+        """
+        self.vector_retriever = vector_retriever
+        self.docstore = docstore
+        self.index_version = index_version
+        self.similarity_top_k = similarity_top_k
+        self.cache = cache or get_retrieval_cache()
+        self.embed_model = embed_model or Settings.embed_model
+        super().__init__(**kwargs)
+
+    def _embedding_key(self, query_bundle: QueryBundle) -> Tuple[str, ...]:
+        return (self.embed_model.model_name, *query_bundle.embedding_strs)
+
+    def _result_key(self, embedding: List[float]) -> Tuple[str, int, str]:
+        return (embedding_hash(embedding), self.similarity_top_k, self.index_version)
+
+    def _cached_nodes(self, embedding: List[float]) -> Optional[List[NodeWithScore]]:
+        """Returns the cached ranking of an embedding, read from the docstore."""
+        hits = self.cache.results.get(self._result_key(embedding))
+        if hits is None:
+            return None
+        nodes = {
+            node.node_id: node
+            for node in self.docstore.get_nodes([h[0] for h in hits], raise_error=False)
+            if node is not None
+        }
+        if len(nodes) < len(hits):
+            return None
+        return [NodeWithScore(node=nodes[node_id], score=score) for node_id, score in hits]
+
+    def _store(self, embedding: List[float], nodes: List[NodeWithScore]) -> None:
+        self.cache.results.put(
+            self._result_key(embedding), [(n.node.node_id, n.score) for n in nodes]
+        )
+
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        if query_bundle.embedding is None:
+            key = self._embedding_key(query_bundle)
+            query_bundle.embedding = self.cache.embeddings.get(key)
+            if query_bundle.embedding is None:
+                query_bundle.embedding = self.embed_model.get_agg_embedding_from_queries(
+                    query_bundle.embedding_strs
+                )
+                self.cache.embeddings.put(key, query_bundle.embedding)
+
+        nodes = self._cached_nodes(query_bundle.embedding)
+        if nodes is None:
+            nodes = self.vector_retriever.retrieve(query_bundle)
+            self._store(query_bundle.embedding, nodes)
+        return nodes
+
+    async def _aretrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        if query_bundle.embedding is None:
+            key = self._embedding_key(query_bundle)
+            query_bundle.embedding = self.cache.embeddings.get(key)
+            if query_bundle.embedding is None:
+                query_bundle.embedding = (
+                    await self.embed_model.aget_agg_embedding_from_queries(
+                        query_bundle.embedding_strs
+                    )
+                )
+                self.cache.embeddings.put(key, query_bundle.embedding)
+
+        nodes = self._cached_nodes(query_bundle.embedding)
+        if nodes is None:
+            nodes = await self.vector_retriever.aretrieve(query_bundle)
+            self._store(query_bundle.embedding, nodes)
+        return nodes
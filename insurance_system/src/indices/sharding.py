@@ -0,0 +1,261 @@
+"""
+Per-claim sharding and claim-ID routing.
+
+Every claim (keyed by its claim ID, e.g. "HO-2024-8892") gets its own Chroma
+collection. Pages without a recognizable claim ID go to the default
+`hierarchical_claims` collection. At query time the claim ID is detected in the
+query (or remembered from earlier in the session) and only that shard is
+searched; without a claim the search fans out over all shards. The claim is
+remembered per conversation (see `claim_session`).
+"""
+
+import asyncio
+import contextvars
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from llama_index.core import Document
+from llama_index.core.base.base_retriever import BaseRetriever
+from llama_index.core.schema import NodeWithScore, QueryBundle
+
+from insurance_system.src.utils.config import (
+    CLAIM_ID_PATTERN,
+    CLAIM_ROUTER_MAX_SESSIONS,
+    SHARD_FANOUT_WORKERS,
+)
+
+DEFAULT_SHARD = "unassigned"
+COLLECTION_PREFIX = "hierarchical_claims"
+# Conversation of queries made outside any `claim_session`
+DEFAULT_SESSION = "default"
+
+_CLAIM_ID_RE = re.compile(CLAIM_ID_PATTERN, re.IGNORECASE)
+
+# Conversation (thread ID) the current query belongs to
+_session_id: ContextVar[str] = ContextVar("claim_session", default=DEFAULT_SESSION)
+
+_fanout_pool: Optional[ThreadPoolExecutor] = None
+_fanout_lock = threading.Lock()
+
+
+def _get_fanout_pool() -> ThreadPoolExecutor:
+    """Returns the process-wide pool searching shards in parallel, started on first use."""
+    global _fanout_pool
+    with _fanout_lock:
+        if _fanout_pool is None:
+            _fanout_pool = ThreadPoolExecutor(
+                max_workers=SHARD_FANOUT_WORKERS, thread_name_prefix="shard-fanout"
+            )
+        return _fanout_pool
+
+
+@contextmanager
+def claim_session(session_id: Optional[str]) -> Iterator[None]:
+    """Makes routers remember claims for one conversation within the block."""
+    token = _session_id.set(session_id or DEFAULT_SESSION)
+    try:
+        yield
+    finally:
+        _session_id.reset(token)
+
+
+def detect_claim_id(text: str) -> Optional[str]:
+    """Returns the first claim ID found in a text, normalized to upper case."""
+    match = _CLAIM_ID_RE.search(text or "")
+    return match.group(1).upper() if match else None
+
+
+def document_claim_id(doc: Document) -> str:
+    """
+    Returns (and records in metadata) the claim ID a document belongs to.
+
+    Pages loaded from files are already tagged with their file's claim (see
+    `tag_file_claim_id`). Otherwise looks at the file name, then the page
+    text. The claim ID is excluded from embedding / LLM metadata so that
+    tagging does not change node content.
+    """
+    claim_id = doc.metadata.get("claim_id")
+    if not claim_id:
+        claim_id = (
+            detect_claim_id(doc.metadata.get("file_name", ""))
+            or detect_claim_id(doc.text[:4000])
+            or DEFAULT_SHARD
+        )
+        doc.metadata["claim_id"] = claim_id
+    for excluded in (doc.excluded_embed_metadata_keys, doc.excluded_llm_metadata_keys):
+        if "claim_id" not in excluded:
+            excluded.append("claim_id")
+    return claim_id
+
+
+def tag_file_claim_id(documents: List[Document]) -> str:
+    """
+    Tags every page of one file with the file's claim ID.
+
+    The claim is resolved once per file, from a page already tagged, then the
+    file name, then the first claim ID mentioned in the file, so pages that do
+    not mention the claim stay in the same shard as the rest of the file.
+
+    Returns:
+        The file's claim ID.
+    """
+    claim_id = next(
+        (doc.metadata["claim_id"] for doc in documents if doc.metadata.get("claim_id")),
+        None,
+    )
+    if claim_id is None and documents:
+        claim_id = detect_claim_id(documents[0].metadata.get("file_name", ""))
+    if claim_id is None:
+        claim_id = next(
+            (c for c in (detect_claim_id(doc.text) for doc in documents) if c), DEFAULT_SHARD
+        )
+    for doc in documents:
+        doc.metadata.setdefault("claim_id", claim_id)
+        document_claim_id(doc)
+    return claim_id
+
+
+def shard_collection_name(claim_id: str) -> str:
+    """Returns the Chroma collection name of a claim shard."""
+    if claim_id == DEFAULT_SHARD:
+        return COLLECTION_PREFIX
+    return f"{COLLECTION_PREFIX}_{re.sub(r'[^A-Za-z0-9_-]', '_', claim_id)}"
+
+
+def shard_claim_id(collection_name: str) -> str:
+    """Returns the claim ID of a shard collection (inverse of shard_collection_name)."""
+    if collection_name == COLLECTION_PREFIX:
+        return DEFAULT_SHARD
+    return collection_name[len(COLLECTION_PREFIX) + 1 :]
+
+
+def list_shard_collections(chroma_client: Any) -> List[str]:
+    """Returns the names of all shard collections in a Chroma client."""
+    names = [getattr(c, "name", c) for c in chroma_client.list_collections()]
+    return sorted(n for n in names if n.startswith(COLLECTION_PREFIX))
+
+
+class ClaimRouter:
+    """
+    Resolves which claim shard a query should search.
+
+    Remembers the last claim mentioned in each conversation (see
+    `claim_session`), so follow-up questions ("and the deductible?") stay on
+    the same claim without affecting other conversations.
+    """
+
+    def __init__(self, max_sessions: int = CLAIM_ROUTER_MAX_SESSIONS) -> None:
+        """
+        Initialize the router.
+
+        Args:
+            max_sessions: Conversations remembered before the least recently
+                active one is forgotten.
+        """
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def active_claim_id(self) -> Optional[str]:
+        """The claim remembered for the current conversation, if any."""
+        with self._lock:
+            return self._sessions.get(_session_id.get())
+
+    def resolve(self, query_str: str, available: List[str]) -> Optional[str]:
+        """
+        Returns the claim ID to search, or None to search every shard.
+
+        Args:
+            query_str: The user query.
+            available: Claim IDs that have a shard.
+        """
+        claim_id = detect_claim_id(query_str)
+        session_id = _session_id.get()
+        with self._lock:
+            if claim_id is not None:
+                self._sessions[session_id] = claim_id
+                self._sessions.move_to_end(session_id)
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                claim_id = self._sessions.get(session_id)
+        if claim_id in available:
+            return claim_id
+        if len(available) == 1:
+            return available[0]
+        return None
+
+    def reset(self, session_id: Optional[str] = None) -> None:
+        """Forgets the claim of a conversation (the current one by default)."""
+        with self._lock:
+            self._sessions.pop(session_id or _session_id.get(), None)
+
+
+class ShardedRetriever(BaseRetriever):
+    """
+    Vector retriever over per-claim shards.
+
+    Routes each query to a single shard via the ClaimRouter, or fans out to
+    all shards and merges the results by score when no claim is identified.
+    Sync fan-outs search the shards on a bounded, process-wide thread pool
+    (SHARD_FANOUT_WORKERS); async ones gather the shards' `aretrieve`.
+    """
+
+    def __init__(
+        self,
+        shard_retrievers: Dict[str, BaseRetriever],
+        router: Optional[ClaimRouter] = None,
+        similarity_top_k: Optional[int] = None,
+        **kwargs: Any,
+    ) -> None:
+        self.shard_retrievers = shard_retrievers
+        self.router = router or ClaimRouter()
+        self.similarity_top_k = similarity_top_k
+        super().__init__(**kwargs)
+
+    def _select(self, query_bundle: QueryBundle) -> List[str]:
+        claim_id = self.router.resolve(
+            query_bundle.query_str, list(self.shard_retrievers)
+        )
+        return [claim_id] if claim_id else list(self.shard_retrievers)
+
+    def _merge(self, results: List[List[NodeWithScore]]) -> List[NodeWithScore]:
+        if len(results) == 1:
+            return results[0]
+        merged = sorted(
+            (n for nodes in results for n in nodes),
+            key=lambda n: n.score or 0.0,
+            reverse=True,
+        )
+        return merged[: self.similarity_top_k] if self.similarity_top_k else merged
+
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        shards = self._select(query_bundle)
+        if len(shards) == 1:
+            return self._merge([self.shard_retrievers[shards[0]].retrieve(query_bundle)])
+        pool = _get_fanout_pool()
+        # Each search runs in a copy of the caller's context (session, tracing)
+        futures = [
+            pool.submit(
+                contextvars.copy_context().run,
+                self.shard_retrievers[shard].retrieve,
+                query_bundle,
+            )
+            for shard in shards
+        ]
+        return self._merge([future.result() for future in futures])
+
+    async def _aretrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        results = await asyncio.gather(
+            *(
+                self.shard_retrievers[shard].aretrieve(query_bundle)
+                for shard in self._select(query_bundle)
+            )
+        )
+        return self._merge(list(results))
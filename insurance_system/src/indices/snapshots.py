@@ -0,0 +1,152 @@
+"""
+Versioned, atomically published index snapshots.
+
+An index root (e.g. `storage/hierarchical`) holds immutable snapshot
+directories under `snapshots/<version>/` plus a `CURRENT` pointer file naming
+the live one. Builds write into a fresh snapshot and publish it by replacing
+the pointer with `os.replace`, so readers always see either the previous or
+the new complete index, never a half-built one. Old snapshots are removed
+under a retention policy.
+
+Roots written before snapshots existed (index files directly in the root) are
+still readable: they resolve to the root itself.
+"""
+
+import os
+import shutil
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from insurance_system.src.utils.config import SNAPSHOT_RETENTION
+
+SNAPSHOTS_DIRNAME = "snapshots"
+POINTER_FILENAME = "CURRENT"
+
+
+class SnapshotError(Exception):
+    """Base exception for snapshot errors."""
+
+    pass
+
+
+def _snapshots_dir(root: str) -> str:
+    return os.path.join(root, SNAPSHOTS_DIRNAME)
+
+
+def current_version(root: str) -> Optional[str]:
+    """Returns the version the pointer of an index root names, if any."""
+    try:
+        with open(os.path.join(root, POINTER_FILENAME), "r") as f:
+            version = f.read().strip()
+    except OSError:
+        return None
+    return version or None
+
+
+def live_snapshot(root: str) -> Tuple[Optional[str], str]:
+    """
+    Returns the live version of an index root and its directory.
+
+    Both come from one read of the pointer, so a loader that opens the
+    directory knows exactly which version it serves. Unversioned (legacy or
+    temporary) roots resolve to (None, root).
+
+    Raises:
+        SnapshotError: If the pointer names a snapshot that does not exist.
+    """
+    version = current_version(root)
+    if version is None:
+        return None, root
+    snapshot_dir = os.path.join(_snapshots_dir(root), version)
+    if not os.path.isdir(snapshot_dir):
+        raise SnapshotError(f"Snapshot '{version}' named by {root} does not exist")
+    return version, snapshot_dir
+
+
+def resolve_snapshot_dir(root: str) -> str:
+    """
+    Returns the directory of the live snapshot of an index root.
+
+    Falls back to the root itself for unversioned (legacy or temporary) roots.
+
+    Raises:
+        SnapshotError: If the pointer names a snapshot that does not exist.
+    """
+    return live_snapshot(root)[1]
+
+
+def list_snapshots(root: str) -> List[str]:
+    """Returns the snapshot versions of an index root, oldest first."""
+    snapshots_dir = _snapshots_dir(root)
+    if not os.path.isdir(snapshots_dir):
+        return []
+    return sorted(
+        name
+        for name in os.listdir(snapshots_dir)
+        if not name.startswith(".") and os.path.isdir(os.path.join(snapshots_dir, name))
+    )
+
+
+def create_snapshot(root: str, base_dir: Optional[str] = None) -> str:
+    """
+    Creates a new, unpublished snapshot directory.
+
+    Args:
+        root: Index root.
+        base_dir: Optional snapshot to copy as the starting point (for
+            incremental builds). It is not modified.
+
+    Returns:
+        Path of the new snapshot directory.
+    """
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    version = f"{timestamp}-{uuid.uuid4().hex[:6]}"
+    snapshot_dir = os.path.join(_snapshots_dir(root), version)
+    if base_dir is not None and os.path.isdir(base_dir):
+        # Never copy a legacy root into itself
+        ignore = shutil.ignore_patterns(SNAPSHOTS_DIRNAME, POINTER_FILENAME, "*.tmp")
+        shutil.copytree(base_dir, snapshot_dir, ignore=ignore)
+    else:
+        os.makedirs(snapshot_dir)
+    return snapshot_dir
+
+
+def publish_snapshot(root: str, snapshot_dir: str) -> None:
+    """Makes a snapshot the live one by atomically replacing the pointer."""
+    version = os.path.basename(os.path.normpath(snapshot_dir))
+    if os.path.normpath(os.path.dirname(snapshot_dir)) != os.path.normpath(
+        _snapshots_dir(root)
+    ):
+        raise SnapshotError(f"{snapshot_dir} is not a snapshot of {root}")
+    pointer_file = os.path.join(root, POINTER_FILENAME)
+    tmp_file = f"{pointer_file}.{os.getpid()}.tmp"
+    with open(tmp_file, "w") as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, pointer_file)
+
+
+def discard_snapshot(snapshot_dir: str) -> None:
+    """Removes an unpublished snapshot (e.g. after a failed build)."""
+    shutil.rmtree(snapshot_dir, ignore_errors=True)
+
+
+def gc_snapshots(root: str, keep: int = SNAPSHOT_RETENTION) -> List[str]:
+    """
+    Removes old snapshots, keeping the live one and the `keep` newest.
+
+    Returns:
+        The removed versions.
+    """
+    live = current_version(root)
+    versions = list_snapshots(root)
+    retained = set(versions[-keep:]) if keep > 0 else set()
+    removed = []
+    for version in versions:
+        if version == live or version in retained:
+            continue
+        shutil.rmtree(os.path.join(_snapshots_dir(root), version), ignore_errors=True)
+        removed.append(version)
+    return removed
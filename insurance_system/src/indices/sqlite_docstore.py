@@ -0,0 +1,286 @@
+"""
+SQLite-backed docstore for the hierarchical index.
+
+`SimpleDocumentStore` keeps every node in one JSON file that has to be parsed
+in full before the first query. This docstore keeps nodes in a SQLite file
+instead and reads them one by one on demand, so cold-start time and resident
+memory do not grow with the corpus. A separate table indexes the parent/child
+links used by auto-merging.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import urllib.parse
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from llama_index.core.schema import BaseNode, NodeRelationship
+from llama_index.core.storage.docstore import SimpleDocumentStore
+from llama_index.core.storage.docstore.keyval_docstore import KVDocumentStore
+from llama_index.core.storage.docstore.types import BaseDocumentStore
+from llama_index.core.storage.kvstore.types import DEFAULT_COLLECTION, BaseKVStore
+
+DOCSTORE_FILENAME = "docstore.sqlite"
+LEGACY_DOCSTORE_FILENAME = "docstore.json"
+
+# Rows written per transaction when adding nodes
+_WRITE_BATCH_SIZE = 500
+
+
+class SqliteDocstoreError(Exception):
+    """Base exception for SQLite docstore errors."""
+
+    pass
+
+
+class SqliteKVStore(BaseKVStore):
+    """Key-value store keeping JSON values in a single SQLite table."""
+
+    def __init__(self, path: str, read_only: bool = False) -> None:
+        """
+        Initialize the store.
+
+        Args:
+            path: SQLite database file (created if missing, unless read-only).
+            read_only: Open an existing database without write access.
+
+        Raises:
+            SqliteDocstoreError: If the database cannot be opened.
+        """
+        try:
+            if read_only:
+                uri = f"file:{urllib.parse.quote(os.path.abspath(path))}?mode=ro"
+                self._conn = sqlite3.connect(
+                    uri, uri=True, check_same_thread=False, isolation_level=None, timeout=30
+                )
+            else:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                self._conn = sqlite3.connect(
+                    path, check_same_thread=False, isolation_level=None, timeout=30
+                )
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS kv ("
+                    "collection TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                    "PRIMARY KEY (collection, key))"
+                )
+        except sqlite3.Error as e:
+            raise SqliteDocstoreError(f"Docstore initialization failed: {e}") from e
+
+        self.path = path
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        return self._conn
+
+    @property
+    def lock(self) -> threading.Lock:
+        return self._lock
+
+    def put(self, key: str, val: dict, collection: str = DEFAULT_COLLECTION) -> None:
+        self.put_all([(key, val)], collection=collection)
+
+    async def aput(
+        self, key: str, val: dict, collection: str = DEFAULT_COLLECTION
+    ) -> None:
+        self.put(key, val, collection=collection)
+
+    def put_all(
+        self,
+        kv_pairs: List[Tuple[str, dict]],
+        collection: str = DEFAULT_COLLECTION,
+        batch_size: int = _WRITE_BATCH_SIZE,
+    ) -> None:
+        rows = [(collection, key, json.dumps(val)) for key, val in kv_pairs]
+        step = max(batch_size, _WRITE_BATCH_SIZE)
+        with self._lock:
+            for i in range(0, len(rows), step):
+                self._conn.execute("BEGIN")
+                try:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO kv (collection, key, value) "
+                        "VALUES (?, ?, ?)",
+                        rows[i : i + step],
+                    )
+                    self._conn.execute("COMMIT")
+                except sqlite3.Error:
+                    self._conn.execute("ROLLBACK")
+                    raise
+
+    async def aput_all(
+        self,
+        kv_pairs: List[Tuple[str, dict]],
+        collection: str = DEFAULT_COLLECTION,
+        batch_size: int = _WRITE_BATCH_SIZE,
+    ) -> None:
+        self.put_all(kv_pairs, collection=collection, batch_size=batch_size)
+
+    def get(self, key: str, collection: str = DEFAULT_COLLECTION) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM kv WHERE collection = ? AND key = ?",
+                (collection, key),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    async def aget(
+        self, key: str, collection: str = DEFAULT_COLLECTION
+    ) -> Optional[dict]:
+        return self.get(key, collection=collection)
+
+    def get_all(self, collection: str = DEFAULT_COLLECTION) -> Dict[str, dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM kv WHERE collection = ?", (collection,)
+            ).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    async def aget_all(self, collection: str = DEFAULT_COLLECTION) -> Dict[str, dict]:
+        return self.get_all(collection=collection)
+
+    def delete(self, key: str, collection: str = DEFAULT_COLLECTION) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM kv WHERE collection = ? AND key = ?", (collection, key)
+            )
+        return cursor.rowcount > 0
+
+    async def adelete(self, key: str, collection: str = DEFAULT_COLLECTION) -> bool:
+        return self.delete(key, collection=collection)
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class SqliteDocumentStore(KVDocumentStore):
+    """
+    Docstore reading nodes lazily from SQLite, with a parent/child index.
+
+    Drop-in replacement for SimpleDocumentStore in a StorageContext: writes go
+    straight to disk, so `persist` has nothing left to do.
+    """
+
+    def __init__(
+        self, path: str, namespace: Optional[str] = None, read_only: bool = False
+    ) -> None:
+        """
+        Initialize the docstore.
+
+        Args:
+            path: SQLite database file (created if missing, unless read-only).
+            namespace: Optional namespace of the KVDocumentStore collections.
+            read_only: Open an existing docstore without write access.
+        """
+        self._sqlite = SqliteKVStore(path, read_only=read_only)
+        if not read_only:
+            with self._sqlite.lock:
+                self._sqlite.connection.execute(
+                    "CREATE TABLE IF NOT EXISTS hierarchy ("
+                    "node_id TEXT PRIMARY KEY, parent_id TEXT)"
+                )
+                self._sqlite.connection.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_parent ON hierarchy(parent_id)"
+                )
+        super().__init__(self._sqlite, namespace=namespace, batch_size=_WRITE_BATCH_SIZE)
+        self.path = path
+
+    @classmethod
+    def from_persist_dir(
+        cls, persist_dir: str, namespace: Optional[str] = None
+    ) -> "SqliteDocumentStore":
+        """Opens (or creates) the docstore of a persist directory."""
+        return cls(os.path.join(persist_dir, DOCSTORE_FILENAME), namespace=namespace)
+
+    def add_documents(
+        self,
+        docs: Sequence[BaseNode],
+        allow_update: bool = True,
+        batch_size: Optional[int] = None,
+        store_text: bool = True,
+    ) -> None:
+        super().add_documents(
+            docs, allow_update=allow_update, batch_size=batch_size, store_text=store_text
+        )
+        rows = []
+        for node in docs:
+            parent = node.relationships.get(NodeRelationship.PARENT)
+            rows.append((node.node_id, parent.node_id if parent else None))
+        with self._sqlite.lock:
+            self._sqlite.connection.executemany(
+                "INSERT OR REPLACE INTO hierarchy (node_id, parent_id) VALUES (?, ?)",
+                rows,
+            )
+
+    def delete_document(self, doc_id: str, raise_error: bool = True) -> None:
+        super().delete_document(doc_id, raise_error=raise_error)
+        with self._sqlite.lock:
+            self._sqlite.connection.execute(
+                "DELETE FROM hierarchy WHERE node_id = ?", (doc_id,)
+            )
+
+    def get_parent_id(self, node_id: str) -> Optional[str]:
+        """Returns the ID of a node's parent, or None for root nodes."""
+        with self._sqlite.lock:
+            row = self._sqlite.connection.execute(
+                "SELECT parent_id FROM hierarchy WHERE node_id = ?", (node_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_child_ids(self, node_id: str) -> List[str]:
+        """Returns the IDs of a node's children."""
+        with self._sqlite.lock:
+            rows = self._sqlite.connection.execute(
+                "SELECT node_id FROM hierarchy WHERE parent_id = ?", (node_id,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_hierarchy(self) -> List[Tuple[str, Optional[str]]]:
+        """Returns (node_id, parent_id) for every stored node."""
+        with self._sqlite.lock:
+            return self._sqlite.connection.execute(
+                "SELECT node_id, parent_id FROM hierarchy"
+            ).fetchall()
+
+    def count(self) -> int:
+        """Returns the number of stored nodes."""
+        with self._sqlite.lock:
+            (count,) = self._sqlite.connection.execute(
+                "SELECT COUNT(*) FROM hierarchy"
+            ).fetchone()
+        return count
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        self._sqlite.close()
+
+
+def load_docstore(persist_dir: str) -> BaseDocumentStore:
+    """
+    Opens the docstore of a persisted hierarchical index.
+
+    The SQLite docstore is opened read-only. Falls back to a legacy
+    `docstore.json` (SimpleDocumentStore) for indexes built before the SQLite
+    docstore existed.
+
+    Raises:
+        SqliteDocstoreError: If the directory holds no docstore.
+    """
+    sqlite_path = os.path.join(persist_dir, DOCSTORE_FILENAME)
+    legacy_path = os.path.join(persist_dir, LEGACY_DOCSTORE_FILENAME)
+    if os.path.exists(sqlite_path):
+        return SqliteDocumentStore(sqlite_path, read_only=True)
+    if os.path.exists(legacy_path):
+        return SimpleDocumentStore.from_persist_path(legacy_path)
+    raise SqliteDocstoreError(f"No docstore found in {persist_dir}")
+
+
+def docstore_exists(persist_dir: str) -> bool:
+    """Returns True if a persist directory holds a docstore of either kind."""
+    return any(
+        os.path.exists(os.path.join(persist_dir, name))
+        for name in (DOCSTORE_FILENAME, LEGACY_DOCSTORE_FILENAME)
+    )
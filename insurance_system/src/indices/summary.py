@@ -1,4 +1,9 @@
+import asyncio
+import json
 import os
+import shutil
+import threading
+import time
 from typing import Any, Dict, List, Optional
 
 from llama_index.core import (
@@ -10,7 +15,39 @@ from llama_index.core import (
 from llama_index.core.base.base_query_engine import BaseQueryEngine
 from llama_index.core.schema import MetadataMode, NodeWithScore
 
-from insurance_system.src.utils.config import LLM_MODEL, SUMMARY_STORAGE_DIR
+from insurance_system.src.indices.sharding import DEFAULT_SHARD, document_claim_id
+from insurance_system.src.indices.snapshots import (
+    create_snapshot,
+    discard_snapshot,
+    gc_snapshots,
+    publish_snapshot,
+    resolve_snapshot_dir,
+)
+from insurance_system.src.indices.sqlite_docstore import SqliteDocumentStore, load_docstore
+from insurance_system.src.utils.config import (
+    LLM_MODEL,
+    SUMMARY_MAX_CONCURRENCY,
+    SUMMARY_MAX_RETRIES,
+    SUMMARY_REDUCE_TOKEN_BUDGET,
+    SUMMARY_RETRY_BACKOFF,
+    SUMMARY_STORAGE_DIR,
+)
+
+
+# Key prefix of intermediate reduce outputs in mapreduce_summaries.json
+LEVEL_KEY_PREFIX = "_level_"
+
+# Key prefix of the per-claim root summaries in a multi-claim mapreduce_summaries.json
+CLAIM_KEY_PREFIX = "_claim_"
+
+# Sub-directory holding one mapreduce_summaries file per claim
+CLAIM_SUMMARIES_DIR = "claim_summaries"
+
+# Chunk summaries of an unfinished build, one JSON-lines file per claim
+_CHUNK_SUMMARIES_DIR = "chunk_summaries"
+
+_shared_loop: Optional[asyncio.AbstractEventLoop] = None
+_shared_lock = threading.Lock()
 
 
 class SummaryIndexError(Exception):
@@ -19,37 +56,118 @@ class SummaryIndexError(Exception):
     pass
 
 
-def _precompute_mapreduce_summaries(
-    documents: List[Document], llm: Optional[Any] = None
-) -> Dict[str, str]:
+class _RateLimitGate:
+    """Shared cool-down: once any call is rate limited, all callers wait."""
+
+    def __init__(self) -> None:
+        self._resume_at = 0.0
+
+    async def wait(self) -> None:
+        delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def block_for(self, seconds: float) -> None:
+        self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    """Detects HTTP 429 / rate limit errors from OpenAI-compatible clients."""
+    if getattr(error, "status_code", None) == 429:
+        return True
+    if type(error).__name__ == "RateLimitError":
+        return True
+    return "rate limit" in str(error).lower()
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Reads the Retry-After header of a rate limit error, if present."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+async def _acomplete_with_retry(
+    llm: Any,
+    prompt: str,
+    semaphore: asyncio.Semaphore,
+    gate: _RateLimitGate,
+    max_retries: int = SUMMARY_MAX_RETRIES,
+    backoff: float = SUMMARY_RETRY_BACKOFF,
+) -> str:
     """
-    Pre-compute summaries using MapReduce strategy.
+    Calls `llm.acomplete` under a concurrency limit, retrying with backoff.
 
-    Map Phase: Summarize each document chunk individually.
-    Reduce Phase: Combine chunk summaries hierarchically.
+    Rate limit errors pause every caller sharing the gate (honouring
+    Retry-After when the provider sends it). Raises the last error once
+    retries are exhausted.
+    """
+    attempt = 0
+    while True:
+        await gate.wait()
+        try:
+            async with semaphore:
+                response = await llm.acomplete(prompt)
+            return str(response).strip()
+        except Exception as e:
+            if attempt >= max_retries:
+                raise
+            delay = backoff * (2**attempt)
+            if _is_rate_limit_error(e):
+                delay = max(delay, _retry_after_seconds(e) or 0.0)
+                gate.block_for(delay)
+            await asyncio.sleep(delay)
+            attempt += 1
 
-    Args:
-        documents: List of documents to summarize.
-        llm: Optional LLM instance for summarization.
 
-    Returns:
-        Dictionary mapping document IDs to their summaries.
+def _get_build_loop() -> asyncio.AbstractEventLoop:
     """
-    from llama_index.core import Settings
-    from llama_index.llms.openai import OpenAI
+    Returns the process-wide event loop of summary builds, started on first use.
+
+    The LLM caches its async HTTP client, which binds to the loop it first
+    ran on. Every map and reduce call therefore runs on this one long-lived
+    loop (on its own thread) instead of a new `asyncio.run` loop per batch.
+    """
+    global _shared_loop
+    with _shared_lock:
+        if _shared_loop is None:
+            _shared_loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_shared_loop.run_forever, name="summary-build", daemon=True
+            ).start()
+        return _shared_loop
 
-    if llm is None:
-        llm = OpenAI(model=LLM_MODEL) if not Settings.llm else Settings.llm
 
-    # Map Phase: Summarize each document chunk
-    chunk_summaries: Dict[str, str] = {}
+def _run_async(coro: Any) -> Any:
+    """Runs a coroutine on the build loop from sync code, even inside a running loop."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_build_loop()).result()
+
+
+async def _amap_chunk_summaries(
+    documents: List[Document],
+    llm: Any,
+    max_concurrency: int = SUMMARY_MAX_CONCURRENCY,
+) -> Dict[str, str]:
+    """
+    Map Phase: summarizes every document chunk with bounded concurrency.
+
+    Returns:
+        Dictionary mapping document IDs to chunk summaries, in document order.
+        Chunks that still fail after retries fall back to their first 500 chars.
+    """
     map_prompt_template = (
         "Summarize the following document chunk, focusing on key events, "
         "dates, entities, and important details:\n\n{text}\n\nSummary:"
     )
+    semaphore = asyncio.Semaphore(max_concurrency)
+    gate = _RateLimitGate()
+    completed = 0
 
-    print("  📝 Map Phase: Summarizing document chunks...")
-    for i, doc in enumerate(documents):
+    async def summarize(i: int, doc: Document) -> str:
+        nonlocal completed
         doc_id = doc.doc_id or f"doc_{i}"
         doc_text = doc.get_content(metadata_mode=MetadataMode.NONE)
 
@@ -58,50 +176,404 @@ def _precompute_mapreduce_summaries(
 
         try:
             # Generate chunk summary using LLM
-            response = llm.complete(summary_prompt)
-            chunk_summaries[doc_id] = str(response).strip()
-            if (i + 1) % 5 == 0:
-                print(f"    Processed {i + 1}/{len(documents)} chunks...")
+            summary = await _acomplete_with_retry(llm, summary_prompt, semaphore, gate)
         except Exception as e:
             # Fallback: use first 500 chars if summarization fails
-            chunk_summaries[doc_id] = doc_text[:500] + "..."
             print(f"    Warning: Failed to summarize chunk {doc_id}: {e}")
+            summary = doc_text[:500] + "..."
+
+        completed += 1
+        if completed % 5 == 0:
+            print(f"    Processed {completed}/{len(documents)} chunks...")
+        return summary
+
+    summaries = await asyncio.gather(
+        *(summarize(i, doc) for i, doc in enumerate(documents))
+    )
+    return {
+        doc.doc_id or f"doc_{i}": summary
+        for i, (doc, summary) in enumerate(zip(documents, summaries))
+    }
+
+
+def _resolve_llm(llm: Optional[Any]) -> Any:
+    """Returns the given LLM, Settings.llm, or a default OpenAI LLM."""
+    from llama_index.core import Settings
+    from llama_index.llms.openai import OpenAI
+
+    if llm is None:
+        llm = OpenAI(model=LLM_MODEL) if not Settings.llm else Settings.llm
+    return llm
+
+
+def _reduce_chunk_summaries(chunk_summaries: Dict[str, str], llm: Any) -> Dict[str, str]:
+    """
+    Reduce Phase: combines the summaries of one claim (or the claim roots).
 
-    # Reduce Phase: Combine chunk summaries hierarchically
+    Returns:
+        Dictionary with the `_combined` summary, the intermediate reduce
+        outputs (`_level_<n>_<i>`) and the input summaries keyed by ID.
+    """
+    # Reduce Phase: Combine chunk summaries level by level
     print("  🔄 Reduce Phase: Combining summaries...")
     if len(chunk_summaries) == 0:
         return {}
 
-    # If only one document, return its summary
-    if len(chunk_summaries) == 1:
-        return chunk_summaries
+    levels = _run_async(_areduce_tree(list(chunk_summaries.values()), llm))
 
-    # Combine all chunk summaries into a single document-level summary
-    all_summaries = "\n\n".join(
-        [f"Chunk {i+1}:\n{summary}" for i, summary in enumerate(chunk_summaries.values())]
-    )
+    # Store combined summary with a special key, then every intermediate level
+    # (coarsest first), then the individual chunk summaries for reference
+    top = levels[-1] if levels else list(chunk_summaries.values())
+    result: Dict[str, str] = {"_combined": top[0]}
+    for level in range(len(levels) - 1, 0, -1):
+        for i, summary in enumerate(levels[level - 1]):
+            result[f"{LEVEL_KEY_PREFIX}{level}_{i}"] = summary
+    result.update(chunk_summaries)
+    return result
+
+
+def _group_by_token_budget(
+    summaries: List[str], token_budget: int, tokenizer: Any
+) -> List[List[str]]:
+    """
+    Packs consecutive summaries into groups of at most `token_budget` tokens.
+
+    Every group holds at least two summaries (when available) so that each
+    reduce level at least halves the number of summaries. Single summaries
+    longer than half the budget are truncated to keep prompts bounded.
+    """
+    item_budget = max(token_budget // 2, 1)
+    groups: List[List[str]] = []
+    current: List[str] = []
+    current_tokens = 0
+    for summary in summaries:
+        tokens = tokenizer(summary)
+        if len(tokens) > item_budget:
+            summary = _truncate_tokens(summary, item_budget, tokenizer)
+            tokens = tokens[:item_budget]
+        if len(current) >= 2 and current_tokens + len(tokens) > token_budget:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(summary)
+        current_tokens += len(tokens)
+    if current:
+        if len(current) == 1 and groups:
+            groups[-1].append(current[0])
+        else:
+            groups.append(current)
+    return groups
+
+
+def _truncate_tokens(text: str, max_tokens: int, tokenizer: Any) -> str:
+    """Cuts text down to roughly `max_tokens` tokens by characters."""
+    tokens = tokenizer(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return text[: int(len(text) * max_tokens / len(tokens))]
+
+
+async def _areduce_tree(
+    summaries: List[str],
+    llm: Any,
+    token_budget: int = SUMMARY_REDUCE_TOKEN_BUDGET,
+    max_concurrency: int = SUMMARY_MAX_CONCURRENCY,
+) -> List[List[str]]:
+    """
+    Reduce Phase: combines summaries in a tree until a single one is left.
+
+    Groups at the same level are reduced in parallel. Groups that still fail
+    after retries fall back to their concatenated text (truncated).
+
+    Returns:
+        The reduced summaries of each level, from the first reduce level up to
+        the root level (which holds exactly one summary). Empty if there was
+        only one summary to begin with.
+    """
+    from llama_index.core.utils import get_tokenizer
 
     reduce_prompt_template = (
         "Combine the following document chunk summaries into a coherent, "
         "high-level summary of the entire document. Focus on the overall narrative, "
         "key timeline, and main themes:\n\n{summaries}\n\nCombined Summary:"
     )
+    tokenizer = get_tokenizer()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    gate = _RateLimitGate()
+
+    async def reduce_group(level: int, group: List[str]) -> str:
+        all_summaries = "\n\n".join(
+            [f"Chunk {i+1}:\n{summary}" for i, summary in enumerate(group)]
+        )
+        reduce_prompt = reduce_prompt_template.format(summaries=all_summaries)
+        try:
+            return await _acomplete_with_retry(llm, reduce_prompt, semaphore, gate)
+        except Exception as e:
+            # Fallback: concatenate summaries
+            print(f"    Warning: Failed to combine summaries at level {level}: {e}")
+            return "\n\n".join(group)[:2000]
+
+    levels: List[List[str]] = []
+    current = summaries
+    while len(current) > 1:
+        level = len(levels) + 1
+        groups = _group_by_token_budget(current, token_budget, tokenizer)
+        print(f"    Level {level}: reducing {len(current)} summaries in {len(groups)} groups...")
+        current = list(
+            await asyncio.gather(*(reduce_group(level, group) for group in groups))
+        )
+        levels.append(current)
+    return levels
+
+
+def get_summary_levels(summaries: Dict[str, str]) -> List[List[str]]:
+    """
+    Splits persisted MapReduce summaries into granularity levels.
 
-    try:
-        reduce_prompt = reduce_prompt_template.format(summaries=all_summaries[:8000])
-        response = llm.complete(reduce_prompt)
-        combined_summary = str(response).strip()
-
-        # Store combined summary with a special key
-        result: Dict[str, str] = {"_combined": combined_summary}
-        # Also keep individual chunk summaries for reference
-        result.update(chunk_summaries)
-        return result
-    except Exception as e:
-        # Fallback: concatenate summaries
-        print(f"    Warning: Failed to combine summaries: {e}")
-        combined = "\n\n".join(chunk_summaries.values())[:2000]
-        return {"_combined": combined, **chunk_summaries}
+    Returns:
+        List of levels, finest first: level 0 holds the chunk summaries, then
+        the per-claim root summaries (multi-claim corpora only), the
+        intermediate reduce outputs, and last the single `_combined` summary.
+    """
+    chunk_level = [v for k, v in summaries.items() if not k.startswith("_")]
+    claim_level = [v for k, v in summaries.items() if k.startswith(CLAIM_KEY_PREFIX)]
+    intermediate: Dict[int, Dict[int, str]] = {}
+    for key, value in summaries.items():
+        if key.startswith(LEVEL_KEY_PREFIX):
+            level, position = key[len(LEVEL_KEY_PREFIX) :].split("_")
+            intermediate.setdefault(int(level), {})[int(position)] = value
+    levels = [level for level in (chunk_level, claim_level) if level]
+    for level in sorted(intermediate):
+        levels.append([intermediate[level][i] for i in sorted(intermediate[level])])
+    if "_combined" in summaries:
+        levels.append([summaries["_combined"]])
+    return levels
+
+
+def _summary_level_text(
+    levels: List[List[str]],
+    summary_level: int,
+    token_budget: int = SUMMARY_REDUCE_TOKEN_BUDGET,
+) -> str:
+    """
+    Joins the summaries of a granularity level into one prompt context.
+
+    Levels whose joined summaries exceed `token_budget` fall back to the next
+    coarser level, so fine levels of large claims do not overflow the prompt.
+
+    Args:
+        levels: Levels returned by `get_summary_levels`, finest first.
+        summary_level: Requested level (clamped to the available ones).
+        token_budget: Maximum tokens of the joined summaries.
+    """
+    from llama_index.core.utils import get_tokenizer
+
+    tokenizer = get_tokenizer()
+    requested = level = min(max(summary_level, 0), len(levels) - 1)
+    text = "\n\n".join(levels[level])
+    while level < len(levels) - 1 and len(tokenizer(text)) > token_budget:
+        level += 1
+        text = "\n\n".join(levels[level])
+    if level != requested:
+        print(f"  ℹ️  Summary level {requested} exceeds the token budget; using level {level}")
+    return _truncate_tokens(text, token_budget, tokenizer)
+
+
+class SummaryIndexBuilder:
+    """
+    Builds the summary index batch by batch.
+
+    Each batch of documents is inserted into the SummaryIndex and run through
+    the MapReduce map phase as it arrives. Nodes go straight to a SQLite
+    docstore and chunk summaries to per-claim files in the new snapshot, so
+    memory does not grow with the corpus. `finish` runs the reduce tree per
+    claim, combines the claim summaries and publishes the snapshot of
+    `persist_dir` (see `snapshots`).
+    """
+
+    def __init__(
+        self,
+        persist_dir: str = SUMMARY_STORAGE_DIR,
+        llm: Optional[Any] = None,
+        use_mapreduce: bool = True,
+    ) -> None:
+        """
+        Initialize the builder.
+
+        Args:
+            persist_dir: Index root holding the snapshots.
+            llm: Optional LLM instance for summarization.
+            use_mapreduce: If True, pre-compute summaries using MapReduce strategy.
+        """
+        self.root_dir = persist_dir
+        self.use_mapreduce = use_mapreduce
+        self.llm = _resolve_llm(llm) if use_mapreduce else llm
+        # Readers keep using the live snapshot until this one is published
+        self.persist_dir = create_snapshot(persist_dir)
+        self._published = False
+        storage_context = StorageContext.from_defaults(
+            docstore=SqliteDocumentStore.from_persist_dir(self.persist_dir)
+        )
+        self.index = SummaryIndex(nodes=[], storage_context=storage_context)
+        self.document_count = 0
+        # Claim ID -> number of chunk summaries spilled to its file
+        self._claim_chunks: Dict[str, int] = {}
+
+    def _chunk_file(self, claim_id: str) -> str:
+        return os.path.join(self.persist_dir, _CHUNK_SUMMARIES_DIR, f"{claim_id}.jsonl")
+
+    def add_documents(self, documents: List[Document]) -> None:
+        """Inserts one batch of documents and summarizes its chunks (map phase)."""
+        chunk_claims = {}
+        for doc in documents:
+            chunk_claims[doc.doc_id] = document_claim_id(doc)
+            self.index.insert(doc)
+        self.document_count += len(documents)
+
+        if self.use_mapreduce and documents:
+            if not self._claim_chunks:
+                print("  🗺️  Pre-computing summaries using MapReduce strategy...")
+                print("  📝 Map Phase: Summarizing document chunks...")
+            summaries = _run_async(_amap_chunk_summaries(documents, self.llm))
+            by_claim: Dict[str, List[str]] = {}
+            for chunk_id, summary in summaries.items():
+                claim_id = chunk_claims.get(chunk_id, DEFAULT_SHARD)
+                by_claim.setdefault(claim_id, []).append(json.dumps([chunk_id, summary]))
+            # Spilled to disk; only read back by the reduce phase in `finish`
+            os.makedirs(os.path.join(self.persist_dir, _CHUNK_SUMMARIES_DIR), exist_ok=True)
+            for claim_id, lines in by_claim.items():
+                with open(self._chunk_file(claim_id), "a") as f:
+                    f.write("\n".join(lines) + "\n")
+                self._claim_chunks[claim_id] = self._claim_chunks.get(claim_id, 0) + len(lines)
+
+    def _read_chunk_summaries(self, claim_id: str) -> Dict[str, str]:
+        """Reads back the chunk summaries of one claim, in the order they were produced."""
+        with open(self._chunk_file(claim_id), "r") as f:
+            return dict(json.loads(line) for line in f)
+
+    def finish(self, publish: bool = True) -> SummaryIndex:
+        """
+        Runs the reduce phase, stores the summaries and persists the index.
+
+        Args:
+            publish: If False, the snapshot is left staged until `publish` is
+                called (e.g. to publish it together with the hierarchical index).
+
+        Raises:
+            SummaryIndexError: If persistence fails.
+            ValueError: If no documents were added.
+        """
+        if not self.document_count:
+            raise ValueError("Documents list cannot be empty")
+
+        try:
+            self._write_snapshot(self.index, self.persist_dir)
+        except BaseException:
+            self.abort()
+            raise
+
+        if publish:
+            self.publish()
+        return self.index
+
+    def publish(self) -> None:
+        """Makes the finished snapshot live and garbage-collects old ones."""
+        try:
+            publish_snapshot(self.root_dir, self.persist_dir)
+        except Exception as e:
+            raise SummaryIndexError(f"Snapshot publication failed: {e}") from e
+        self._published = True
+        for version in gc_snapshots(self.root_dir):
+            print(f"  🧹 Removed old snapshot {version}")
+
+    def abort(self) -> None:
+        """Discards the unpublished snapshot of a failed build."""
+        if not self._published:
+            discard_snapshot(self.persist_dir)
+
+    def _write_snapshot(self, index: SummaryIndex, persist_dir: str) -> None:
+        """Writes the summaries and the index into an unpublished snapshot."""
+        # Pre-compute summaries using MapReduce if requested
+        if self.use_mapreduce and self._claim_chunks:
+            count = self._reduce_per_claim()
+            shutil.rmtree(os.path.join(persist_dir, _CHUNK_SUMMARIES_DIR), ignore_errors=True)
+            print(f"  ✅ Stored {count} pre-computed summaries")
+
+        try:
+            index.storage_context.persist(persist_dir=persist_dir)
+        except Exception as e:
+            raise SummaryIndexError(f"Index persistence failed: {e}") from e
+
+    def _annotate(self, summaries: Dict[str, str]) -> None:
+        """Stores summaries in the metadata of the docstore nodes they belong to."""
+        docstore = self.index.storage_context.docstore
+        for doc_id, summary in summaries.items():
+            if docstore.document_exists(doc_id):
+                node = docstore.get_document(doc_id)
+                node.metadata["precomputed_summary"] = summary
+                docstore.add_documents([node], allow_update=True)
+
+    def _reduce_per_claim(self) -> int:
+        """
+        Reduces the chunk summaries of every claim separately, writes them to
+        `claim_summaries/<claim_id>.json` and writes the global summaries to
+        `mapreduce_summaries.json`: with a single claim its own summaries,
+        otherwise a reduce over the per-claim `_combined` summaries, those
+        claim summaries (as `_claim_<claim_id>`) and all chunk summaries. Only
+        one claim's summaries are in memory at a time.
+
+        Returns:
+            The number of global summaries written.
+        """
+        claims_dir = os.path.join(self.persist_dir, CLAIM_SUMMARIES_DIR)
+        os.makedirs(claims_dir, exist_ok=True)
+        combined: Dict[str, str] = {}
+        summaries: Dict[str, str] = {}
+        for claim_id, count in self._claim_chunks.items():
+            if len(self._claim_chunks) > 1:
+                print(f"  📁 Claim {claim_id}: {count} chunks")
+            chunk_summaries = self._read_chunk_summaries(claim_id)
+            summaries = _reduce_chunk_summaries(chunk_summaries, self.llm)
+            with open(os.path.join(claims_dir, f"{claim_id}.json"), "w") as f:
+                json.dump(summaries, f, indent=2)
+            self._annotate(chunk_summaries)
+            combined[claim_id] = summaries["_combined"]
+
+        metadata_file = os.path.join(self.persist_dir, "mapreduce_summaries.json")
+        if len(combined) == 1:
+            with open(metadata_file, "w") as f:
+                json.dump(summaries, f, indent=2)
+            return len(summaries)
+
+        # The claim files are authoritative for each claim's summaries; the
+        # global file keeps a copy of every claim root under its own key so
+        # they are not mistaken for chunk summaries
+        reduced = _reduce_chunk_summaries(combined, self.llm)
+        summaries = {k: v for k, v in reduced.items() if k not in combined}
+        summaries.update(
+            {f"{CLAIM_KEY_PREFIX}{claim_id}": root for claim_id, root in combined.items()}
+        )
+        count = len(summaries)
+        # Written entry by entry: the chunk summaries are streamed from the claim files
+        with open(metadata_file, "w") as f:
+            f.write("{" + json.dumps(summaries)[1:-1])
+            for claim_id in combined:
+                chunk_summaries = self._read_chunk_summaries(claim_id)
+                if chunk_summaries:
+                    f.write(", " + json.dumps(chunk_summaries)[1:-1])
+                count += len(chunk_summaries)
+            f.write("}")
+        return count
+
+
+def list_summary_claims(persist_dir: str = SUMMARY_STORAGE_DIR) -> List[str]:
+    """Returns the claim IDs that have their own pre-computed summaries."""
+    persist_dir = resolve_snapshot_dir(persist_dir)
+    claims_dir = os.path.join(persist_dir, CLAIM_SUMMARIES_DIR)
+    if not os.path.isdir(claims_dir):
+        return []
+    return sorted(
+        name[: -len(".json")] for name in os.listdir(claims_dir) if name.endswith(".json")
+    )
 
 
 def create_summary_index(
@@ -130,45 +602,13 @@ def create_summary_index(
         raise ValueError("Documents list cannot be empty")
 
     try:
-        # Create index from documents
-        index = SummaryIndex.from_documents(documents)
-
-        # Pre-compute summaries using MapReduce if requested
-        if use_mapreduce:
-            print("  🗺️  Pre-computing summaries using MapReduce strategy...")
-            summaries = _precompute_mapreduce_summaries(documents, llm=llm)
-
-            # Store summaries in index metadata
-            if summaries:
-                # Store in docstore metadata
-                docstore = index.storage_context.docstore
-                for doc_id, summary in summaries.items():
-                    if doc_id in docstore.docs:
-                        node = docstore.docs[doc_id]
-                        if hasattr(node, "metadata"):
-                            node.metadata["precomputed_summary"] = summary
-                        elif isinstance(node, dict):
-                            node["metadata"] = node.get("metadata", {})
-                            node["metadata"]["precomputed_summary"] = summary
-
-                # Also store in a separate metadata file for easy access
-                import json
-
-                metadata_file = os.path.join(persist_dir, "mapreduce_summaries.json")
-                os.makedirs(os.path.dirname(metadata_file), exist_ok=True)
-                with open(metadata_file, "w") as f:
-                    json.dump(summaries, f, indent=2)
-                print(f"  ✅ Stored {len(summaries)} pre-computed summaries")
-
-        if not os.path.exists(persist_dir):
-            os.makedirs(persist_dir, exist_ok=True)
-
+        builder = SummaryIndexBuilder(persist_dir, llm=llm, use_mapreduce=use_mapreduce)
         try:
-            index.storage_context.persist(persist_dir=persist_dir)
-        except Exception as e:
-            raise SummaryIndexError(f"Index persistence failed: {e}") from e
-
-        return index
+            builder.add_documents(documents)
+            return builder.finish()
+        except BaseException:
+            builder.abort()
+            raise
     except ValueError:
         raise
     except Exception as e:
@@ -179,6 +619,8 @@ def get_summary_query_engine(
     persist_dir: str = SUMMARY_STORAGE_DIR,
     llm: Optional[Any] = None,
     use_precomputed: bool = True,
+    summary_level: Optional[int] = None,
+    claim_id: Optional[str] = None,
 ) -> BaseQueryEngine:
     """
     Returns a query engine that uses pre-computed MapReduce summaries or tree summarization.
@@ -187,6 +629,11 @@ def get_summary_query_engine(
         persist_dir: Directory path for summary index storage.
         llm: Optional LLM instance for query engine.
         use_precomputed: If True, use pre-computed summaries when available.
+        summary_level: Granularity of the pre-computed summaries to answer from
+            (0 = chunk summaries, higher = coarser reduce levels). Defaults to
+            the single `_combined` summary.
+        claim_id: Answer from the summaries of a single claim instead of the
+            whole corpus (see `list_summary_claims`).
 
     Returns:
         BaseQueryEngine instance.
@@ -196,22 +643,32 @@ def get_summary_query_engine(
         raise FileNotFoundError(error_msg)
 
     try:
-        storage_context = StorageContext.from_defaults(persist_dir=persist_dir)
+        # Read from the live snapshot; later builds publish new ones beside it
+        persist_dir = resolve_snapshot_dir(persist_dir)
+        storage_context = StorageContext.from_defaults(
+            persist_dir=persist_dir, docstore=load_docstore(persist_dir)
+        )
         index = load_index_from_storage(storage_context)
 
         # Check if pre-computed summaries exist
         summaries_file = os.path.join(persist_dir, "mapreduce_summaries.json")
+        if claim_id is not None:
+            claim_file = os.path.join(persist_dir, CLAIM_SUMMARIES_DIR, f"{claim_id}.json")
+            if os.path.exists(claim_file):
+                summaries_file = claim_file
         has_precomputed = use_precomputed and os.path.exists(summaries_file)
 
         if has_precomputed:
             # Use pre-computed summaries with a simple wrapper
-            import json
-
             with open(summaries_file, "r") as f:
                 summaries = json.load(f)
 
-            # Get combined summary
+            # Get combined summary (or the requested reduce level)
             combined_summary = summaries.get("_combined", "")
+            if summary_level is not None:
+                levels = get_summary_levels(summaries)
+                if levels:
+                    combined_summary = _summary_level_text(levels, summary_level)
 
             if combined_summary:
                 # Get LLM
@@ -237,13 +694,9 @@ def get_summary_query_engine(
                         self.llm = llm_instance
                         self.fallback_engine = fallback_engine
 
-                    def _query(self, query_bundle: Any) -> Any:
-                        """Internal query method (abstract method implementation)."""
-                        # Extract query string
-                        query_str = str(query_bundle.query_str) if hasattr(query_bundle, 'query_str') else str(query_bundle)
-
+                    def _prompt(self, query_str: str) -> str:
                         # Use LLM to answer query based on pre-computed summary
-                        prompt = (
+                        return (
                             f"Based on the following pre-computed document summary, "
                             f"answer the query.\n\n"
                             f"Summary:\n{self.summary_text}\n\n"
@@ -251,36 +704,32 @@ def get_summary_query_engine(
                             f"Answer:"
                         )
 
+                    def _source_nodes(self) -> List[NodeWithScore]:
+                        source_node = TextNode(
+                            text=self.summary_text, metadata={"type": "mapreduce_summary"}
+                        )
+                        return [NodeWithScore(node=source_node)]
+
+                    def _query(self, query_bundle: Any) -> Any:
+                        """Internal query method (abstract method implementation)."""
+                        # Extract query string
+                        query_str = str(query_bundle.query_str) if hasattr(query_bundle, 'query_str') else str(query_bundle)
+
                         try:
-                            response_text = str(self.llm.complete(prompt))
-                            source_node = TextNode(
-                                text=self.summary_text, metadata={"type": "mapreduce_summary"}
-                            )
-                            return Response(response=response_text, source_nodes=[source_node])
+                            response_text = str(self.llm.complete(self._prompt(query_str)))
+                            return Response(response=response_text, source_nodes=self._source_nodes())
                         except Exception:
                             # Fallback to tree_summarize if LLM call fails
                             return self.fallback_engine.query(query_str)
 
                     async def _aquery(self, query_bundle: Any) -> Any:
-                        """Internal async query method (abstract method implementation)."""
+                        """Internal async query method; awaits the LLM without blocking the event loop."""
                         # Extract query string
                         query_str = str(query_bundle.query_str) if hasattr(query_bundle, 'query_str') else str(query_bundle)
 
-                        # Use LLM to answer query based on pre-computed summary
-                        prompt = (
-                            f"Based on the following pre-computed document summary, "
-                            f"answer the query.\n\n"
-                            f"Summary:\n{self.summary_text}\n\n"
-                            f"Query: {query_str}\n\n"
-                            f"Answer:"
-                        )
-
                         try:
-                            response_text = str(self.llm.complete(prompt))
-                            source_node = TextNode(
-                                text=self.summary_text, metadata={"type": "mapreduce_summary"}
-                            )
-                            return Response(response=response_text, source_nodes=[source_node])
+                            response_text = str(await self.llm.acomplete(self._prompt(query_str)))
+                            return Response(response=response_text, source_nodes=self._source_nodes())
                         except Exception:
                             # Fallback to tree_summarize if LLM call fails
                             return await self.fallback_engine.aquery(query_str)
@@ -299,12 +748,12 @@ def get_summary_query_engine(
                     combined_summary, llm, fallback_engine
                 )
                 return query_engine
-        else:
-            # Fallback to tree_summarize (on-demand MapReduce)
-            query_engine = index.as_query_engine(
-                response_mode="tree_summarize", use_async=True, llm=llm
-            )
-            return query_engine
+
+        # Fallback to tree_summarize (on-demand MapReduce)
+        query_engine = index.as_query_engine(
+            response_mode="tree_summarize", use_async=True, llm=llm
+        )
+        return query_engine
     except FileNotFoundError:
         raise
     except Exception as e:
@@ -19,7 +19,6 @@ from llama_index.core import Document, Settings, SimpleDirectoryReader
 from llama_index.core.node_parser import HierarchicalNodeParser, get_leaf_nodes
 from llama_index.core.retrievers import AutoMergingRetriever
 from llama_index.core.schema import NodeWithScore
-from llama_index.embeddings.openai import OpenAIEmbedding
 from llama_index.llms.openai import OpenAI
 
 from insurance_system.src.indices.hierarchical import (
@@ -33,6 +32,7 @@ from insurance_system.src.utils.config import (
     LLM_MODEL,
     PROJECT_ROOT,
 )
+from insurance_system.src.utils.embedding_cache import get_cache_stats, get_embed_model
 
 
 class ChunkingAnalysisResult:
@@ -257,6 +257,10 @@ def run_chunking_analysis(
             f"Latency: {result.avg_latency:.2f}s, Chunks: {result.total_chunks}\n"
         )
 
+    cache_stats = get_cache_stats(Settings.embed_model)
+    if cache_stats:
+        print(f"🗄️  Embedding cache hit rate: {cache_stats['hit_rate']:.1%}")
+
     # Save results
     if output_file:
         results_dict = [r.to_dict() for r in results]
@@ -345,6 +349,9 @@ if __name__ == "__main__":
     )
     output_file = os.path.join(project_root, "chunking_analysis_results.json")
 
+    # Share cached embeddings across all configurations
+    Settings.embed_model = get_embed_model(EMBEDDING_MODEL)
+
     # Load documents
     documents = SimpleDirectoryReader(data_dir).load_data()
 
@@ -3,13 +3,74 @@ Central configuration for the Insurance Retrieval System.
 """
 
 import os
-from typing import List
+from typing import Dict, List, Optional
 
 # Indexing Configuration
 CHUNK_SIZES: List[int] = [2048, 512, 128]  # [Root, Intermediate, Leaf]
 CHUNK_OVERLAP: int = 20  # Default overlap between chunks
 SIMILARITY_TOP_K: int = 80  # Increased to capture deep table nodes
 
+# Hybrid Retrieval (BM25 over leaves + vector, fused with reciprocal rank fusion)
+# Off until the eval dataset shows a gain over vector-only retrieval
+HYBRID_RETRIEVAL: bool = os.getenv("HYBRID_RETRIEVAL", "false").lower() == "true"
+HYBRID_TOP_K: int = 30  # Per-ranking candidates and fused results (replaces SIMILARITY_TOP_K)
+RRF_K: int = 60  # Rank offset in 1 / (RRF_K + rank)
+BM25_K1: float = 1.2  # Term frequency saturation
+BM25_B: float = 0.75  # Document length normalization
+
+# Retrieval Cache (query text -> embedding, (embedding, top-k, snapshot) -> ranked node IDs)
+RETRIEVAL_CACHE_ENABLED: bool = os.getenv("RETRIEVAL_CACHE", "true").lower() == "true"
+QUERY_EMBEDDING_CACHE_SIZE: int = 4096  # Query embeddings kept in memory
+RETRIEVAL_CACHE_SIZE: int = 8192  # Ranked results kept in memory (per shard and top-k)
+RETRIEVAL_CACHE_TTL_SECONDS: float = 3600.0  # Entries older than this are recomputed
+
+# Fact Lookup (typed key/value facts extracted from tables and "Key: Value" lines at build time)
+FACT_LOOKUP: bool = os.getenv("FACT_LOOKUP", "true").lower() == "true"
+FACT_MIN_SCORE: float = 0.5  # Share of a fact's label words the query must contain
+
+# Semantic Answer Cache (paraphrased tool queries answered from earlier answers)
+ANSWER_CACHE_ENABLED: bool = os.getenv("ANSWER_CACHE", "true").lower() == "true"
+# Cosine similarity to an answered query (same claim and snapshot) needed per tool
+ANSWER_CACHE_THRESHOLDS: Dict[str, float] = {"needle_expert": 0.93, "summary_expert": 0.9}
+ANSWER_CACHE_SIZE: int = 2000  # Answers kept in memory (least recently used evicted)
+ANSWER_CACHE_TTL_SECONDS: float = 86400.0  # Answers older than this are recomputed
+
+# Vector Storage Configuration
+# "chroma", or "numpy" for in-process memory-mapped matrices (small deployments)
+VECTOR_STORE_BACKEND: str = os.getenv("VECTOR_STORE_BACKEND", "chroma")
+# "float32", or "float16" / "int8" to store leaf embeddings quantized (implies "numpy")
+VECTOR_DTYPE: str = os.getenv("VECTOR_DTYPE", "float32")
+VECTOR_RESCORE_FACTOR: int = 4  # Quantized candidates rescored in float32 per result (0 = off)
+VECTOR_FLUSH_NODES: int = 10000  # Leaf vectors buffered per NumPy shard before writing to disk
+
+# Claim Sharding Configuration
+# Claim IDs such as "HO-2024-8892"; each claim gets its own Chroma collection
+CLAIM_ID_PATTERN: str = r"(?<![A-Za-z0-9])([A-Z]{2,4}-\d{4}-\d{3,6})(?![A-Za-z0-9])"
+CLAIM_ROUTER_MAX_SESSIONS: int = 1024  # Conversations whose last claim is remembered
+SHARD_FANOUT_WORKERS: int = 8  # Threads searching shards of a query without a claim (sync path)
+
+# Embedding Pipeline Configuration (index construction)
+EMBED_BATCH_SIZE: int = 64  # Texts per embedding request
+EMBED_MAX_CONCURRENCY: int = 4  # Embedding requests in flight at once
+EMBED_MAX_RETRIES: int = 3  # Retries per batch before the build fails
+EMBED_RETRY_BACKOFF: float = 1.0  # Base seconds for exponential backoff
+
+# Ingestion Pipeline Configuration (build_index.py)
+INGEST_BATCH_PAGES: int = 32  # Pages parsed, chunked and embedded per batch
+INGEST_PREFETCH_BATCHES: int = 2  # Batches loaded ahead while the current one embeds
+INGEST_WORKERS: int = 1  # Processes parsing and splitting files (build_index.py --workers)
+
+# Summary Precomputation (MapReduce) Configuration
+SUMMARY_MAX_CONCURRENCY: int = 8  # LLM calls in flight during the map phase
+SUMMARY_MAX_RETRIES: int = 3  # Retries per chunk before falling back to raw text
+SUMMARY_RETRY_BACKOFF: float = 2.0  # Base seconds for exponential backoff
+SUMMARY_REDUCE_TOKEN_BUDGET: int = 6000  # Max input tokens per reduce call
+# Reduce level the Summary Expert answers from (0 = chunk summaries, higher = coarser);
+# unset answers from the single top-level summary
+SUMMARY_LEVEL: Optional[int] = (
+    int(os.environ["SUMMARY_LEVEL"]) if os.getenv("SUMMARY_LEVEL") else None
+)
+
 # Model Configuration - Configurable via environment variables
 EMBEDDING_MODEL: str = "text-embedding-3-small"
 LLM_MODEL: str = "gpt-4o"
@@ -20,6 +81,22 @@ EVALUATOR_MODEL: str = "gpt-4o"
 RERANKER_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-12-v2"
 RERANKER_TOP_N: int = 40  # Increased to ensure table nodes survive reranking
 USE_RERANKER: bool = True
+# "torch", "onnx", or "onnx-int8" (dynamically quantized ONNX export, fastest on CPU)
+RERANKER_BACKEND: str = os.getenv("RERANKER_BACKEND", "torch")
+RERANKER_BATCH_SIZE: int = 32  # (query, passage) pairs per forward pass
+RERANKER_MAX_BATCH_PAIRS: int = 256  # Most pairs collected into one service batch
+RERANKER_BATCH_WINDOW_MS: float = 5.0  # Wait for concurrent queries to join a batch
+RERANKER_ONNX_QUANTIZATION: str = "avx2"  # Int8 target: "arm64", "avx2", "avx512", "avx512_vnni"
+# Score cache: skips re-scoring repeated (query, passage) pairs until the index changes
+RERANK_CACHE_ENABLED: bool = os.getenv("RERANK_CACHE", "true").lower() == "true"
+RERANK_CACHE_SIZE: int = 100000  # Scores kept in memory (least recently used evicted)
+RERANK_CACHE_DISK: bool = os.getenv("RERANK_CACHE_DISK", "false").lower() == "true"
+
+# Adaptive Top-K (rerank candidates in growing windows, stop early at a clear score gap)
+ADAPTIVE_TOP_K: bool = os.getenv("ADAPTIVE_TOP_K", "false").lower() == "true"
+ADAPTIVE_TOP_K_STEPS: List[int] = [10, 20, 40]  # Candidates reranked before each stop check
+ADAPTIVE_MIN_SCORE: float = 0.5  # Reranker score the best node needs to stop early
+ADAPTIVE_SCORE_GAP: float = 0.3  # Neighbour score drop (relative to the best) ending the answers
 
 
 # Paths Configuration
@@ -36,6 +113,24 @@ PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..
 STORAGE_DIR = os.path.join(PROJECT_ROOT, "storage")
 HIERARCHICAL_STORAGE_DIR = os.path.join(STORAGE_DIR, "hierarchical")
 SUMMARY_STORAGE_DIR = os.path.join(STORAGE_DIR, "summary")
+RERANKER_EXPORT_DIR = os.path.join(STORAGE_DIR, "reranker")  # ONNX exports of RERANKER_MODEL
+SNAPSHOT_RETENTION: int = 3  # Newest index snapshots kept on disk (the live one always is)
+INDEX_HOT_RELOAD: bool = os.getenv("INDEX_HOT_RELOAD", "true").lower() == "true"
+INDEX_RELOAD_INTERVAL: float = 5.0  # Seconds between checks for a newly published snapshot
+# Load indices, reranker and MCP tools concurrently in the background (ready once tools are known)
+STARTUP_PARALLEL: bool = os.getenv("STARTUP_PARALLEL", "true").lower() == "true"
+
+# Embedding Cache (content-addressed, shared by build, analysis and query paths)
+EMBEDDING_CACHE_ENABLED: bool = os.getenv("EMBEDDING_CACHE", "true").lower() == "true"
+EMBEDDING_CACHE_PATH = os.path.join(STORAGE_DIR, "embedding_cache.sqlite")
+EMBEDDING_CACHE_MAX_MB: int = 512  # Least-recently-used entries are evicted beyond this
+
+# Reranker Score Cache (per index snapshot, keyed by normalized query + passage hash)
+RERANK_CACHE_PATH = os.path.join(STORAGE_DIR, "rerank_cache.sqlite")  # Used if RERANK_CACHE_DISK
+
+# Parse Cache (parsed pages keyed by file hash + parser settings)
+PARSE_CACHE_ENABLED: bool = os.getenv("PARSE_CACHE", "true").lower() == "true"
+PARSE_CACHE_DIR = os.path.join(STORAGE_DIR, "parse_cache")
 
 MCP_SERVER_PATH = os.path.join(PROJECT_ROOT, "mcp_server.py")
 
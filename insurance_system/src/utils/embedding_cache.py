@@ -0,0 +1,322 @@
+"""
+Persistent, content-addressed embedding cache.
+
+Embeddings are stored in SQLite keyed by (model, SHA-256 of the text), so
+identical texts are embedded once across index builds, chunking analysis
+configurations and query-time retrieval. The least-recently-used entries are
+evicted once the cache grows beyond its size budget.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.bridge.pydantic import PrivateAttr
+
+from insurance_system.src.utils.config import (
+    EMBEDDING_CACHE_ENABLED,
+    EMBEDDING_CACHE_MAX_MB,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_MODEL,
+)
+
+# Keep SQLite "IN (...)" clauses well below the variable limit
+_SQL_CHUNK = 500
+# Cache hits whose LRU timestamps are buffered before they are written
+_TOUCH_BATCH = 4096
+
+# One cache (connection + counters) per database file and process
+_shared_caches: Dict[str, "EmbeddingCache"] = {}
+_shared_lock = threading.Lock()
+
+
+class EmbeddingCacheError(Exception):
+    """Base exception for embedding cache errors."""
+
+    pass
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed embedding store with LRU eviction and hit/miss counters.
+
+    Lookups only read: the last-used times of hits are buffered in memory and
+    written with the next `put_many` (or every _TOUCH_BATCH hits), so the
+    query path does not contend for the write lock.
+    """
+
+    def __init__(
+        self,
+        path: str = EMBEDDING_CACHE_PATH,
+        max_bytes: int = EMBEDDING_CACHE_MAX_MB * 1024 * 1024,
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite database file (created if missing).
+            max_bytes: Size budget for stored vectors before eviction kicks in.
+        """
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(
+                path, check_same_thread=False, isolation_level=None, timeout=30
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_last_used ON embeddings(last_used)"
+            )
+            (self._size,) = self._conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+            ).fetchone()
+        except sqlite3.Error as e:
+            raise EmbeddingCacheError(f"Embedding cache initialization failed: {e}") from e
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Key -> last-used time of cache hits not yet written
+        self._touched: Dict[str, float] = {}
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        """Returns the content address of a text for a given model."""
+        return hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """Looks up embeddings for texts, returning None for misses."""
+        keys = [self.make_key(model, text) for text in texts]
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            for i in range(0, len(keys), _SQL_CHUNK):
+                chunk = list(set(keys[i : i + _SQL_CHUNK]))
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+            now = time.time()
+            self._touched.update((key, now) for key in found)
+            if len(self._touched) >= _TOUCH_BATCH:
+                self._conn.execute("BEGIN")
+                try:
+                    self._write_touches()
+                    self._conn.execute("COMMIT")
+                except sqlite3.Error:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            results = [found.get(key) for key in keys]
+            hit_count = sum(1 for r in results if r is not None)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+        return results
+
+    def _write_touches(self) -> None:
+        """Writes the buffered last-used times (inside the caller's transaction)."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                [(last_used, key) for key, last_used in self._touched.items()],
+            )
+            self._touched = {}
+
+    def put_many(
+        self, model: str, texts: List[str], embeddings: List[List[float]]
+    ) -> None:
+        """Stores embeddings for texts and evicts old entries if over budget."""
+        now = time.time()
+        rows = [
+            (self.make_key(model, text), array("f", embedding).tobytes(), now)
+            for text, embedding in zip(texts, embeddings)
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for key, blob, last_used in rows:
+                    old = self._conn.execute(
+                        "SELECT LENGTH(vector) FROM embeddings WHERE key = ?", (key,)
+                    ).fetchone()
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO embeddings (key, vector, last_used) "
+                        "VALUES (?, ?, ?)",
+                        (key, blob, last_used),
+                    )
+                    self._size += len(blob) - (old[0] if old else 0)
+                    self._touched.pop(key, None)
+                # Eviction below must see the recent hits
+                self._write_touches()
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                raise
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Drops least-recently-used entries until the cache is at 90% of its budget."""
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute(
+            "SELECT key, LENGTH(vector) FROM embeddings ORDER BY last_used ASC"
+        )
+        victims: List[str] = []
+        for key, size in rows:
+            if self._size <= target:
+                break
+            victims.append(key)
+            self._size -= size
+        for i in range(0, len(victims), _SQL_CHUNK):
+            chunk = victims[i : i + _SQL_CHUNK]
+            self._conn.execute(
+                f"DELETE FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters and size information."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+            "size_bytes": self._size,
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self) -> None:
+        """Removes every cached embedding."""
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._size = 0
+            self._touched = {}
+
+
+def get_shared_cache(path: str = EMBEDDING_CACHE_PATH) -> EmbeddingCache:
+    """Returns the process-wide EmbeddingCache for a database file."""
+    with _shared_lock:
+        if path not in _shared_caches:
+            _shared_caches[path] = EmbeddingCache(path)
+        return _shared_caches[path]
+
+
+class CachedEmbedding(BaseEmbedding):
+    """
+    Embedding model wrapper that serves repeated texts from an EmbeddingCache.
+
+    Drop-in replacement for the wrapped model wherever `Settings.embed_model`
+    is used; only cache misses reach the underlying provider.
+    """
+
+    _base_model: BaseEmbedding = PrivateAttr()
+    _cache: EmbeddingCache = PrivateAttr()
+
+    def __init__(
+        self,
+        base_model: BaseEmbedding,
+        cache: Optional[EmbeddingCache] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(
+            model_name=base_model.model_name,
+            embed_batch_size=base_model.embed_batch_size,
+            **kwargs,
+        )
+        self._base_model = base_model
+        self._cache = cache or get_shared_cache()
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedEmbedding"
+
+    @property
+    def cache(self) -> EmbeddingCache:
+        return self._cache
+
+    def _lookup(
+        self, kind: str, texts: List[str]
+    ) -> Tuple[str, List[Optional[List[float]]], List[str]]:
+        """Returns (cache model key, cached results, unique texts to embed)."""
+        model_key = f"{self.model_name}:{kind}"
+        cached = self._cache.get_many(model_key, texts)
+        missing = list(
+            dict.fromkeys(t for t, e in zip(texts, cached) if e is None)
+        )
+        return model_key, cached, missing
+
+    def _merge(
+        self,
+        model_key: str,
+        texts: List[str],
+        cached: List[Optional[List[float]]],
+        missing: List[str],
+        new_embeddings: List[List[float]],
+    ) -> List[List[float]]:
+        """Stores new embeddings and fills the gaps of the cached results."""
+        self._cache.put_many(model_key, missing, new_embeddings)
+        by_text = dict(zip(missing, new_embeddings))
+        return [e if e is not None else by_text[t] for t, e in zip(texts, cached)]
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        model_key, cached, missing = self._lookup("query", [query])
+        new = [self._base_model.get_query_embedding(query)] if missing else []
+        return self._merge(model_key, [query], cached, missing, new)[0]
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        model_key, cached, missing = self._lookup("query", [query])
+        new = [await self._base_model.aget_query_embedding(query)] if missing else []
+        return self._merge(model_key, [query], cached, missing, new)[0]
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._get_text_embeddings([text])[0]
+
+    async def _aget_text_embedding(self, text: str) -> List[float]:
+        return (await self._aget_text_embeddings([text]))[0]
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        model_key, cached, missing = self._lookup("text", texts)
+        new = self._base_model.get_text_embedding_batch(missing) if missing else []
+        return self._merge(model_key, texts, cached, missing, new)
+
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        model_key, cached, missing = self._lookup("text", texts)
+        new = (
+            await self._base_model.aget_text_embedding_batch(missing) if missing else []
+        )
+        return self._merge(model_key, texts, cached, missing, new)
+
+
+def get_embed_model(model: str = EMBEDDING_MODEL) -> BaseEmbedding:
+    """
+    Returns the OpenAI embedding model, wrapped in the persistent cache if enabled.
+
+    Use this wherever `Settings.embed_model` is configured.
+    """
+    from llama_index.embeddings.openai import OpenAIEmbedding
+
+    base_model = OpenAIEmbedding(model=model)
+    if not EMBEDDING_CACHE_ENABLED:
+        return base_model
+    return CachedEmbedding(base_model)
+
+
+def get_cache_stats(embed_model: Any) -> Optional[Dict[str, Any]]:
+    """Returns cache statistics if the given model is a CachedEmbedding."""
+    if isinstance(embed_model, CachedEmbedding):
+        return embed_model.cache.stats()
+    return None
@@ -12,16 +12,18 @@ MANAGER_SYSTEM_PROMPT = PromptTemplate(
     You have access to the following tools:
 
     RETRIEVAL TOOLS:
-    1. 'needle_expert': For specific facts, costs, dates, names, log entries, financial details, or finding LOCATIONS of events.
-    2. 'summary_expert': For broad high-level questions that require synthesizing the entire document.
+    1. 'fact_lookup': For a single named field of the claim file (policy number, adjuster, date of loss, deductible, total payout, status) or one table value. Falls back to 'needle_expert' by itself.
+    2. 'needle_expert': For specific facts, costs, dates, names, log entries, financial details, or finding LOCATIONS of events.
+    3. 'summary_expert': For broad high-level questions that require synthesizing the entire document.
 
     UTILITY TOOLS:
-    3. 'get_current_time': Get current time in a specific timezone (default UTC).
-    4. 'convert_time': Convert time between timezones.
-    5. 'get_historical_weather': Get weather for a specific location and date.
+    4. 'get_current_time': Get current time in a specific timezone (default UTC).
+    5. 'convert_time': Convert time between timezones.
+    6. 'get_historical_weather': Get weather for a specific location and date.
 
     GUIDELINES:
     - TIMELINE Queries: If the user asks for a "timeline" or "sequence of events", use 'summary_expert'.
+    - SINGLE FIELDS: If the user asks for one named field ("What is the policy number?", "Who is the adjuster?"), use 'fact_lookup'.
     - SPECIFIC FACTS: If the user asks "how much", "who", "what date", or "what happened at [time]", use 'needle_expert'.
     - TIME CONVERSION:
         - ALWAYS use 'needle_expert' FIRST to retrieve the time and location/timezone from documents.
@@ -44,8 +46,8 @@ MANAGER_SYSTEM_PROMPT = PromptTemplate(
     Tool: summary_expert
 
     User: "Who is the adjuster?"
-    Thought: User is asking for a specific name. This is a fact retrieval.
-    Tool: needle_expert
+    Thought: User is asking for one named field of the claim file. This is a fact lookup.
+    Tool: fact_lookup
 
     User: "What was the time in Berlin when the incident occurred?"
     Thought: This is a multi-step problem. I MUST retrieve information from documents first.